@@ -0,0 +1,214 @@
+"""
+Compares the symbol-aware chunker with the legacy 800-char splitter.
+
+For each repository it reports chunk counts, embedding tokens, how many
+Python functions/classes end up cut across chunks, and a retrieval hit rate:
+for every indexed function/class, a query built from its name and docstring
+should retrieve (in the top k) the chunk containing its definition. Retrieval
+uses a local TF-IDF ranking by default so the benchmark is free and
+deterministic; --embeddings uses text-embedding-3-small instead.
+
+Usage:
+    python scripts/benchmark_chunker.py --repos-dir data/repositories
+
+    # A single repository, hit@3, with real embeddings
+    python scripts/benchmark_chunker.py --repo data/repositories/<repo> --top-k 3 --embeddings
+"""
+
+import argparse
+import ast
+import math
+import os
+import re
+import sys
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion.utils.file_scanner import IGNORE_DIRS
+from src.ingestion.utils.symbol_index import build_symbol_index
+from src.utils.tokens import count_tokens
+from src.vector_store.store import READABLE_EXTENSIONS, split_file
+
+CHUNKERS = ["legacy", "symbol"]
+
+
+def read_repo_files(repo_path: str, max_files: int) -> dict[str, str]:
+    files = {}
+    for root, dirs, names in os.walk(repo_path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORE_DIRS)
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() not in READABLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            try:
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    text = f.read()
+            except OSError:
+                continue
+            if text.strip():
+                files[os.path.relpath(path, repo_path).replace(os.sep, "/")] = text
+            if len(files) >= max_files:
+                return files
+    return files
+
+
+def chunk_repo(files: dict[str, str], chunker: str) -> list[dict]:
+    """Chunks every file; split_file gives every chunk its line range."""
+    chunks = []
+    for path, text in files.items():
+        for doc in split_file(path, text, {"source": path}, chunker=chunker):
+            meta = doc.metadata
+            chunks.append({"source": path, "content": doc.page_content,
+                           "start_line": meta["start_line"], "end_line": meta["end_line"]})
+    return chunks
+
+
+def python_symbol_spans(files: dict[str, str]) -> list[tuple[str, int, int]]:
+    """(file, start, end) of every Python function, method and class."""
+    spans = []
+    for path, text in files.items():
+        if not path.endswith(".py"):
+            continue
+        try:
+            tree = ast.parse(text)
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                spans.append((path, node.lineno, node.end_lineno))
+    return spans
+
+
+def cut_fraction(chunks: list[dict], spans: list[tuple[str, int, int]]) -> float:
+    """Fraction of symbols not contained whole in any single chunk."""
+    by_source = {}
+    for chunk in chunks:
+        by_source.setdefault(chunk["source"], []).append(chunk)
+    cut = 0
+    for path, start, end in spans:
+        if not any(c["start_line"] <= start and end <= c["end_line"] for c in by_source.get(path, [])):
+            cut += 1
+    return cut / len(spans) if spans else 0.0
+
+
+def _terms(text: str) -> list[str]:
+    # Split identifiers: parseArgs / parse_args -> parse, args
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return [t for t in re.split(r"[^A-Za-z0-9]+", text.lower()) if len(t) > 1]
+
+
+class TfidfRanker:
+    def __init__(self, docs: list[str]):
+        self.vectors = [Counter(_terms(d)) for d in docs]
+        df = Counter(term for vec in self.vectors for term in vec)
+        n = len(docs)
+        self.idf = {term: math.log((n + 1) / (count + 1)) + 1 for term, count in df.items()}
+        self.norms = [math.sqrt(sum((tf * self.idf[t]) ** 2 for t, tf in vec.items())) or 1.0 for vec in self.vectors]
+
+    def rank(self, query: str, k: int) -> list[int]:
+        q = Counter(_terms(query))
+        scores = []
+        for i, vec in enumerate(self.vectors):
+            dot = sum(q[t] * self.idf.get(t, 0) * vec[t] * self.idf.get(t, 0) for t in q if t in vec)
+            scores.append((dot / self.norms[i], i))
+        return [i for _, i in sorted(scores, reverse=True)[:k]]
+
+
+class EmbeddingRanker:
+    def __init__(self, docs: list[str]):
+        import numpy as np
+        from langchain_openai import OpenAIEmbeddings
+
+        self.np = np
+        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        self.matrix = np.array(self.embeddings.embed_documents(docs))
+        self.matrix /= np.linalg.norm(self.matrix, axis=1, keepdims=True)
+
+    def rank(self, query: str, k: int) -> list[int]:
+        q = self.np.array(self.embeddings.embed_query(query))
+        scores = self.matrix @ (q / self.np.linalg.norm(q))
+        return list(self.np.argsort(-scores)[:k])
+
+
+def hit_rate(chunks: list[dict], queries: list[tuple[str, str, int]], k: int, use_embeddings: bool) -> float:
+    if not queries or not chunks:
+        return 0.0
+    ranker = (EmbeddingRanker if use_embeddings else TfidfRanker)([c["content"] for c in chunks])
+    hits = 0
+    for query, path, line in queries:
+        for i in ranker.rank(query, k):
+            chunk = chunks[i]
+            if chunk["source"] == path and chunk["start_line"] <= line <= chunk["end_line"]:
+                hits += 1
+                break
+    return hits / len(queries)
+
+
+def symbol_queries(repo_path: str) -> list[tuple[str, str, int]]:
+    index = build_symbol_index(repo_path)
+    queries = []
+    for entry in index["functions"] + index["classes"]:
+        words = " ".join(_terms(entry["name"]))
+        queries.append((f"{words} {entry.get('doc', '')}".strip(), entry["file"], entry["line"]))
+    return queries
+
+
+def benchmark_repo(repo_path: str, args) -> list[dict]:
+    files = read_repo_files(repo_path, args.max_files)
+    spans = python_symbol_spans(files)
+    queries = symbol_queries(repo_path)
+    queries = [q for q in queries if q[1] in files]
+    rows = []
+    for chunker in CHUNKERS:
+        chunks = chunk_repo(files, chunker)
+        tokens = [count_tokens(c["content"]) for c in chunks]
+        rows.append({
+            "chunker": chunker,
+            "chunks": len(chunks),
+            "tokens": sum(tokens),
+            "mean": sum(tokens) / len(tokens) if tokens else 0,
+            "cut": cut_fraction(chunks, spans),
+            "hit": hit_rate(chunks, queries, args.top_k, args.embeddings),
+            "queries": len(queries),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the symbol-aware chunker against the legacy splitter.")
+    parser.add_argument("--repos-dir", type=str, default=os.path.join(os.getcwd(), "data", "repositories"),
+                        help="Directory containing repositories (default: ./data/repositories)")
+    parser.add_argument("--repo", type=str, help="Benchmark a single repository instead")
+    parser.add_argument("--top-k", type=int, default=5, help="Retrieval depth for the hit rate (default: 5)")
+    parser.add_argument("--max-files", type=int, default=500, help="Files read per repository (default: 500)")
+    parser.add_argument("--embeddings", action="store_true", help="Rank with OpenAI embeddings instead of TF-IDF")
+    args = parser.parse_args()
+
+    if args.repo:
+        repos = [args.repo]
+    else:
+        repos = [os.path.join(args.repos_dir, d) for d in sorted(os.listdir(args.repos_dir))
+                 if os.path.isdir(os.path.join(args.repos_dir, d))]
+
+    totals = {chunker: Counter() for chunker in CHUNKERS}
+    print(f"{'repository':<30}{'chunker':<9}{'chunks':>8}{'tokens':>10}{'mean':>8}{'cut':>8}{f'hit@{args.top_k}':>8}")
+    for repo_path in repos:
+        for row in benchmark_repo(repo_path, args):
+            print(f"{os.path.basename(repo_path)[:29]:<30}{row['chunker']:<9}{row['chunks']:>8}{row['tokens']:>10}"
+                  f"{row['mean']:>8.0f}{row['cut']:>8.1%}{row['hit']:>8.1%}")
+            total = totals[row["chunker"]]
+            total.update({"chunks": row["chunks"], "tokens": row["tokens"], "queries": row["queries"],
+                          "hits": round(row["hit"] * row["queries"])})
+
+    print(f"\n{'=' * 50}")
+    for chunker, total in totals.items():
+        hit = total["hits"] / total["queries"] if total["queries"] else 0.0
+        print(f"{chunker:<9} chunks {total['chunks']:>7}  embedding tokens {total['tokens']:>9}  hit@{args.top_k} {hit:.1%}")
+    legacy, symbol = totals["legacy"], totals["symbol"]
+    if legacy["tokens"]:
+        print(f"Embedding tokens: {symbol['tokens'] / legacy['tokens'] - 1:+.1%} with the symbol chunker.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Startup benchmark and import-time audit for the CLI entry points.
+
+Runs each entry point with `python -X importtime` (default: `--help`), measures
+wall-clock startup over several runs and lists the heaviest top-level imports
+reported by the interpreter.
+
+Usage:
+    python scripts/benchmark_startup.py
+
+    # More runs, show the 20 heaviest imports per entry point
+    python scripts/benchmark_startup.py --runs 5 --top 20
+
+    # Also time plan validation for a Dev-Plan file
+    python scripts/benchmark_startup.py --plan my_plan.json
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = {
+    "mas": ["src/workflows/main.py", "--help"],
+    "ingestion": ["src/ingestion/ingest_repos.py", "--help"],
+    "evaluation": ["src/evaluation/evaluate_readme.py", "--help"],
+    "single_agent": ["single-agent/baseline_single_agent.py", "--help"],
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, str]]:
+    """
+    Parses `-X importtime` output into (cumulative_us, module) pairs for
+    top-level imports (those the entry point itself triggered).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        _, cumulative_us, name = parts
+        try:
+            cumulative = int(cumulative_us.strip())
+        except ValueError:
+            continue
+        # Nesting is encoded as two spaces per level after the separator
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 0:
+            rows.append((cumulative, name.strip()))
+    return sorted(rows, reverse=True)
+
+
+def time_entry_point(cmd: list[str], runs: int) -> tuple[list[float], str]:
+    """Runs the command `runs` times; returns wall times and the last stderr."""
+    timings = []
+    stderr = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *cmd],
+            capture_output=True,
+            text=True,
+            cwd=os.getcwd(),
+        )
+        timings.append(time.perf_counter() - start)
+        stderr = result.stderr
+        if result.returncode != 0:
+            print(f"  ! exited with {result.returncode}: {cmd}")
+    return timings, stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time and audit imports.")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per entry point (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list (default: 10)")
+    parser.add_argument("--plan", type=str, help="Also benchmark `main.py --validate-plan --plan <file>`")
+    args = parser.parse_args()
+
+    entry_points = dict(ENTRY_POINTS)
+    if args.plan:
+        entry_points["validate_plan"] = ["src/workflows/main.py", "--validate-plan", "--plan", args.plan]
+
+    summary = []
+    for label, cmd in entry_points.items():
+        print(f"\n[{label}] {' '.join(cmd)}")
+        timings, stderr = time_entry_point(cmd, args.runs)
+        median = statistics.median(timings)
+        summary.append((label, median, max(timings)))
+        print(f"  wall: median {median:.3f}s, max {max(timings):.3f}s over {args.runs} runs")
+        for cumulative, module in parse_importtime(stderr)[:args.top]:
+            print(f"  {cumulative / 1e6:8.3f}s  {module}")
+
+    print(f"\n{'=' * 50}")
+    print(f"{'entry point':<20}{'median (s)':>14}{'max (s)':>14}")
+    for label, median, worst in summary:
+        print(f"{label:<20}{median:>14.3f}{worst:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
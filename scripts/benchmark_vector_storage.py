@@ -0,0 +1,143 @@
+"""
+Compares reduced vector storage (--embedding-dims / --rescore at ingestion)
+with full precision for an ingested repository.
+
+The vectors, documents and metadata of the repo's full-precision collection
+are copied into one on-disk collection per variant: every --dims truncation,
+each without rescoring and with a full-dimension rescoring copy at every
+--precisions. For each variant it reports:
+  - disk: bytes of the collection directory (index, sqlite, rescoring file)
+  - open: cold open time (client, collection, rescoring file, first query)
+  - p50 / p95 latency of an MMR search with the repo's retriever parameters
+  - overlap: share of the full-precision search results it returns
+
+Queries are a sample of the stored chunk vectors (free) or, with
+--queries sections, the canonical bundle queries (embedded in one call;
+needs OPENAI_API_KEY).
+
+Usage:
+    python scripts/benchmark_vector_storage.py --repo_name <repo>
+
+    # Other truncations and precisions, JSON report
+    python scripts/benchmark_vector_storage.py --repo_name <repo> --dims 128 512 --precisions int8 --output storage.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.vector_store.compact import compact_mmr, load_rescore_vectors, save_rescore_vectors, truncate
+from src.vector_store.evaluation import COLLECTION_NAME, open_collection, percentile, query_vectors
+from src.vector_store.store import RESCORE_FILE, RESCORE_PRECISIONS, collection_metadata, saved_retrieval_config
+
+
+def load_collection(repo_name: str) -> dict:
+    collection = open_collection(repo_name)
+    if saved_retrieval_config(repo_name)["storage"]["dimensions"]:
+        raise ValueError(f"{repo_name} was ingested with reduced storage; re-ingest it at full precision to compare")
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    data["embeddings"] = np.asarray(data["embeddings"], dtype=np.float32)
+    return data
+
+
+def disk_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def write_variant(path: str, data: dict, index_params: dict, dimensions, precision):
+    """Stores the collection the way ingest_repo would for these storage settings."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection(COLLECTION_NAME, metadata=collection_metadata(index_params))
+    vectors = truncate(data["embeddings"], dimensions)
+    batch = client.get_max_batch_size()
+    for i in range(0, len(data["ids"]), batch):
+        collection.add(ids=data["ids"][i:i + batch], embeddings=vectors[i:i + batch],
+                       documents=data["documents"][i:i + batch], metadatas=data["metadatas"][i:i + batch])
+    if precision:
+        save_rescore_vectors(os.path.join(path, RESCORE_FILE), data["ids"], data["embeddings"], precision)
+
+
+def measure(path: str, queries: np.ndarray, search: dict, dimensions, precision) -> tuple[dict, list[list[str]]]:
+    import chromadb
+
+    start = time.perf_counter()
+    collection = chromadb.PersistentClient(path=path).get_collection(COLLECTION_NAME)
+    rescore = load_rescore_vectors(os.path.join(path, RESCORE_FILE)) if precision else None
+    compact_mmr(collection, queries[0], search["k"], search["fetch_k"], search["lambda_mult"], dimensions, rescore)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        picked = compact_mmr(collection, q, search["k"], search["fetch_k"], search["lambda_mult"], dimensions, rescore)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(picked["ids"])
+    return {"disk_bytes": disk_bytes(path), "open_ms": open_ms,
+            "p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95)}, results
+
+
+def overlap(results: list[list[str]], baseline: list[list[str]]) -> float:
+    shares = [len(set(r) & set(b)) / len(b) for r, b in zip(results, baseline) if b]
+    return sum(shares) / len(shares) if shares else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare reduced vector storage with full precision for an ingested repository.")
+    parser.add_argument("--repo_name", type=str, required=True, help="Repository ingested (at full precision) into knowledge_base/")
+    parser.add_argument("--dims", nargs="+", type=int, default=[256, 512, 1024], help="Truncations to compare (default: 256 512 1024)")
+    parser.add_argument("--precisions", nargs="+", choices=RESCORE_PRECISIONS, default=["float16", "int8"],
+                        help="Rescoring precisions to compare with every truncation (default: float16 int8)")
+    parser.add_argument("--queries", choices=["chunks", "sections"], default="chunks",
+                        help="Stored chunk vectors (free, default) or canonical bundle queries (embedded)")
+    parser.add_argument("--sample", type=int, default=100, help="Maximum number of queries (default: 100)")
+    parser.add_argument("--output", type=str, help="Also write the rows to this JSON file")
+    args = parser.parse_args()
+
+    data = load_collection(args.repo_name)
+    if not data["ids"]:
+        print(f"Collection of {args.repo_name} is empty.")
+        return
+    config = saved_retrieval_config(args.repo_name)
+    full_dims = data["embeddings"].shape[1]
+    queries = query_vectors(data["embeddings"], args.queries, args.sample)
+    print(f"{args.repo_name}: {len(data['ids'])} chunks, {full_dims} dimensions, {len(queries)} {args.queries} queries")
+
+    variants = [(None, None)] + [(d, p) for d in args.dims if d < full_dims for p in [None] + args.precisions]
+    work_dir = tempfile.mkdtemp(prefix="vector_storage_")
+    rows, baseline = [], None
+    try:
+        for n, (dimensions, precision) in enumerate(variants):
+            path = os.path.join(work_dir, str(n))
+            write_variant(path, data, config["index"], dimensions, precision)
+            row, results = measure(path, queries, config["search"], dimensions, precision)
+            baseline = baseline or results
+            row.update(dimensions=dimensions or full_dims, rescore=precision or "-", overlap=overlap(results, baseline))
+            rows.append(row)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    full = rows[0]
+    print(f"{'dims':>6}{'rescore':>9}{'disk KB':>10}{'disk':>8}{'open ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'overlap':>9}")
+    for r in rows:
+        print(f"{r['dimensions']:>6}{r['rescore']:>9}{r['disk_bytes'] / 1000:>10.0f}{r['disk_bytes'] / full['disk_bytes']:>8.0%}"
+              f"{r['open_ms']:>10.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['overlap']:>9.1%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"repo_name": args.repo_name, "chunks": len(data["ids"]), "queries": len(queries),
+                       "search": config["search"], "rows": rows}, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
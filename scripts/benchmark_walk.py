@@ -0,0 +1,94 @@
+"""
+Times the repository walk used by the file tree, ingestion and indexing.
+
+For each repository it compares the old os.walk over the hardcoded ignore
+sets with the snapshot walker (.gitignore and tracked-file aware, pruning
+excluded subtrees), cold (every file hashed) and warm (hashes reused from
+the previous snapshot), and reports how many files each one lists.
+
+Usage:
+    python scripts/benchmark_walk.py --repos-dir data/repositories
+
+    # A single repository, best of 5 runs
+    python scripts/benchmark_walk.py --repo data/repositories/<repo> --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion.utils.file_scanner import IGNORE_DIRS
+from src.ingestion.utils.ignore_matcher import IgnoreMatcher
+from src.ingestion.utils.snapshot import scan_repo
+
+
+def legacy_walk(repo_path: str) -> int:
+    """The pre-snapshot walk: prune IGNORE_DIRS by name, descend into everything else."""
+    count = 0
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+        count += len(files)
+    return count
+
+
+def best_of(repeat: int, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_repo(repo_path: str, repeat: int) -> dict:
+    legacy_time, legacy_files = best_of(repeat, legacy_walk, repo_path)
+    matcher_time, matcher = best_of(repeat, IgnoreMatcher, repo_path)
+    cold_time, snapshot = best_of(repeat, lambda: scan_repo(repo_path, matcher=matcher, hashes=True))
+    warm_time, _ = best_of(repeat, lambda: scan_repo(repo_path, previous=snapshot, matcher=matcher, hashes=True))
+    return {
+        "legacy": legacy_time,
+        "matcher": matcher_time,
+        "cold": cold_time,
+        "warm": warm_time,
+        "legacy_files": legacy_files,
+        "files": len([e for e in snapshot.entries if not e["is_dir"]]),
+        "tracked": len(matcher.tracked) if matcher.tracked is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the repository walk.")
+    parser.add_argument("--repos-dir", type=str, default=os.path.join(os.getcwd(), "data", "repositories"),
+                        help="Directory containing repositories (default: ./data/repositories)")
+    parser.add_argument("--repo", type=str, help="Benchmark a single repository instead")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported (default: 3)")
+    args = parser.parse_args()
+
+    if args.repo:
+        repos = [args.repo]
+    else:
+        repos = [os.path.join(args.repos_dir, d) for d in sorted(os.listdir(args.repos_dir))
+                 if os.path.isdir(os.path.join(args.repos_dir, d))]
+
+    print(f"{'repository':<30}{'legacy ms':>10}{'files':>8}{'git ms':>8}{'cold ms':>9}{'warm ms':>9}{'files':>8}{'tracked':>9}")
+    totals = {"legacy": 0.0, "matcher": 0.0, "cold": 0.0, "warm": 0.0, "legacy_files": 0, "files": 0}
+    for repo_path in repos:
+        row = benchmark_repo(repo_path, args.repeat)
+        tracked = "-" if row["tracked"] is None else row["tracked"]
+        print(f"{os.path.basename(repo_path)[:29]:<30}{row['legacy'] * 1000:>10.1f}{row['legacy_files']:>8}"
+              f"{row['matcher'] * 1000:>8.1f}{row['cold'] * 1000:>9.1f}{row['warm'] * 1000:>9.1f}"
+              f"{row['files']:>8}{tracked:>9}")
+        for key in totals:
+            totals[key] += row[key]
+
+    print(f"\n{'=' * 50}")
+    print(f"Legacy walk: {totals['legacy'] * 1000:.0f} ms, {totals['legacy_files']} files")
+    print(f"Snapshot walk: {(totals['matcher'] + totals['warm']) * 1000:.0f} ms warm "
+          f"({(totals['matcher'] + totals['cold']) * 1000:.0f} ms cold), {totals['files']} files")
+
+
+if __name__ == "__main__":
+    main()
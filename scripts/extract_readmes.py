@@ -8,10 +8,16 @@ Usage:
 """
 
 import argparse
+import os
 import shutil
+import sys
 from pathlib import Path
 from typing import List, Optional
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion.utils.snapshot import get_snapshot
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extract README.md files from repositories.")
@@ -29,9 +35,9 @@ def parse_args() -> argparse.Namespace:
 def find_readme(repo_dir: Path, filenames: List[str]) -> Optional[Path]:
     candidates: List[Path] = []
     wanted = {name.lower() for name in filenames}
-    for path in repo_dir.rglob("*"):
-        if path.is_file() and path.name.lower() in wanted:
-            candidates.append(path)
+    for entry in get_snapshot(str(repo_dir)).files(include_ignored=True):
+        if os.path.basename(entry["path"]).lower() in wanted:
+            candidates.append(repo_dir / entry["path"])
     if not candidates:
         return None
     # Prefer the most top-level README (shortest relative path), then alphabetical
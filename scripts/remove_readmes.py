@@ -13,9 +13,14 @@ would be deleted without modifying the filesystem.
 
 import argparse
 import os
+import sys
 from pathlib import Path
 from typing import List, Set
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion.utils.snapshot import get_snapshot
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Remove README files from repositories.")
@@ -32,10 +37,9 @@ def parse_args() -> argparse.Namespace:
 
 def find_readmes(repo_dir: Path, targets: Set[str]) -> List[Path]:
     matches: List[Path] = []
-    for root, _, files in os.walk(repo_dir):
-        for fname in files:
-            if fname.lower() in targets:
-                matches.append(Path(root) / fname)
+    for entry in get_snapshot(str(repo_dir)).files(include_ignored=True):
+        if os.path.basename(entry["path"]).lower() in targets:
+            matches.append(repo_dir / entry["path"])
     return matches
 
 
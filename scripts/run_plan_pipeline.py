@@ -20,6 +20,9 @@ Usage:
 
     # Skip evaluation
     python scripts/run_plan_pipeline.py --start 1 --end 20 --skip-eval
+
+    # Cap LLM spend per repo (graceful degradation, then deterministic finish)
+    python scripts/run_plan_pipeline.py --start 1 --end 20 --token-budget 200000
 """
 
 import os
@@ -49,7 +52,7 @@ def run_step(label: str, cmd: list[str]) -> bool:
     return True
 
 
-def run_repo(repo_name: str, skip_eval: bool) -> dict:
+def run_repo(repo_name: str, skip_eval: bool, generation_args: list[str]) -> dict:
     status = {"generation": "skipped", "evaluation": "skipped"}
 
     # --- Generation with plan ---
@@ -62,7 +65,8 @@ def run_repo(repo_name: str, skip_eval: bool) -> dict:
     ok = run_step("generation", [
         "python", "src/workflows/main.py",
         "--repo_name", repo_name,
-        "--plan", plan_path
+        "--plan", plan_path,
+        *generation_args
     ])
     status["generation"] = "ok" if ok else "failed"
     if not ok:
@@ -102,12 +106,34 @@ def main():
                         help="Path to repo names file, one per line. Default: data/plan_repo_names.txt")
     parser.add_argument("--skip-eval", action="store_true",
                         help="Skip evaluation step for all repos")
+    parser.add_argument("--token-budget", type=int, default=None,
+                        help="Per-repo LLM token budget passed to the generation step")
+    parser.add_argument("--cost-budget", type=float, default=None,
+                        help="Per-repo LLM cost budget (USD) passed to the generation step")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Per-repo wall-clock deadline (seconds) passed to the generation step")
+    parser.add_argument("--batch-writing", action="store_true",
+                        help="Pass --batch-writing to the generation step")
+    parser.add_argument("--batch-review", action="store_true",
+                        help="Pass --batch-review to the generation step")
     args = parser.parse_args()
 
     if not os.path.exists(args.repos):
         print(f"Error: {args.repos} not found.", file=sys.stderr)
         sys.exit(1)
 
+    generation_args = []
+    if args.token_budget:
+        generation_args += ["--token-budget", str(args.token_budget)]
+    if args.cost_budget:
+        generation_args += ["--cost-budget", str(args.cost_budget)]
+    if args.deadline:
+        generation_args += ["--deadline", str(args.deadline)]
+    if args.batch_writing:
+        generation_args.append("--batch-writing")
+    if args.batch_review:
+        generation_args.append("--batch-review")
+
     all_repos = load_repos(args.repos)
     total = len(all_repos)
 
@@ -132,7 +158,7 @@ def main():
     for i, repo_name in enumerate(selected, start=args.start):
         print(f"\n[{i}/{args.end or total}] {repo_name}")
         print(f"  {'-'*50}")
-        repo_status = run_repo(repo_name, args.skip_eval)
+        repo_status = run_repo(repo_name, args.skip_eval, generation_args)
         results[repo_name] = repo_status
 
     elapsed = time.time() - t0
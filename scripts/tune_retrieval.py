@@ -0,0 +1,185 @@
+"""
+Sweeps the HNSW index and retriever parameters of an ingested repository and
+recommends settings.
+
+The vectors of the repo's collection are copied into in-memory collections,
+one per (space, M, construction_ef, search_ef), so nothing is re-embedded.
+After a few warm-up queries, for every fetch_k it measures, over a set of
+query vectors:
+  - recall: how many of the exact fetch_k nearest chunks (brute force, same
+    distance) the index returns; these are the candidates MMR picks k from
+  - p50 / p95 latency of one query
+The recommendation is the cheapest setting whose recall reaches
+--target-recall and whose p95 is within 10% of the fastest such setting.
+lambda_mult is kept as configured: it trades relevance for diversity and
+does not affect recall against exact search or latency.
+
+Queries are the canonical bundle queries (embedded in one call; needs
+OPENAI_API_KEY) or, with --queries chunks, a sample of the stored chunk
+vectors (free).
+
+Usage:
+    python scripts/tune_retrieval.py --repo_name <repo>
+
+    # Free run on stored vectors, stricter target, save the recommendation
+    # to data/retrieval_config/<repo>.json (applied on the next ingestion)
+    python scripts/tune_retrieval.py --repo_name <repo> --queries chunks --target-recall 0.99 --save
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.vector_store.evaluation import open_collection, percentile, query_vectors
+from src.vector_store.store import RETRIEVAL_CONFIG_DIR, collection_metadata, retrieval_config, search_kwargs
+
+# p95 latencies within this fraction of the fastest are treated as equal
+LATENCY_TOLERANCE = 0.1
+
+# Untimed queries run on each new index first (caches, lazy index loading)
+WARMUP_QUERIES = 5
+
+
+def load_vectors(repo_name: str) -> tuple[list[str], np.ndarray, dict]:
+    """Ids, vectors and HNSW configuration of the repo's persisted collection."""
+    collection = open_collection(repo_name)
+    data = collection.get(include=["embeddings"])
+    return data["ids"], np.asarray(data["embeddings"], dtype=np.float32), collection.configuration.get("hnsw") or {}
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, space: str, n: int) -> np.ndarray:
+    """Indices of the n nearest vectors per query by brute force, with Chroma's distances."""
+    if space == "l2":
+        distances = (queries ** 2).sum(1)[:, None] - 2 * queries @ vectors.T + (vectors ** 2).sum(1)[None, :]
+    elif space == "ip":
+        distances = 1 - queries @ vectors.T
+    else:
+        norms = np.linalg.norm(queries, axis=1)[:, None] * np.linalg.norm(vectors, axis=1)[None, :]
+        distances = 1 - (queries @ vectors.T) / np.maximum(norms, 1e-12)
+    return np.argsort(distances, axis=1, kind="stable")[:, :n]
+
+
+def build_index(client, ids: list[str], vectors: np.ndarray, index_params: dict):
+    """In-memory collection over the vectors with the given HNSW parameters; returns (collection, seconds)."""
+    name = "tune-{space}-{M}-{construction_ef}-{search_ef}".format(**index_params)
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+    start = time.perf_counter()
+    collection = client.create_collection(name, metadata=collection_metadata(index_params))
+    batch = client.get_max_batch_size()
+    for i in range(0, len(ids), batch):
+        collection.add(ids=ids[i:i + batch], embeddings=vectors[i:i + batch])
+    seconds = time.perf_counter() - start
+    ef_search = (collection.configuration.get("hnsw") or {}).get("ef_search")
+    if ef_search != index_params["search_ef"]:
+        raise RuntimeError(f"Collection {name} has ef_search {ef_search}, expected {index_params['search_ef']}")
+    return collection, seconds
+
+
+def sweep(ids, vectors, queries, args, k: int) -> list[dict]:
+    import chromadb
+
+    client = chromadb.EphemeralClient()
+    fetch_ks = sorted({max(f, k) for f in args.fetch_k})
+    rows = []
+    for space in args.space:
+        exact = exact_neighbours(vectors, queries, space, max(fetch_ks))
+        for m in args.M:
+            for construction_ef in args.construction_ef:
+                for search_ef in args.search_ef:
+                    # Changing ef_search on a built collection does not reach
+                    # the loaded index, so every search_ef gets its own build
+                    index = {"space": space, "M": m, "construction_ef": construction_ef, "search_ef": search_ef}
+                    collection, build_seconds = build_index(client, ids, vectors, index)
+                    for q in queries[:WARMUP_QUERIES]:
+                        collection.query(query_embeddings=[q], n_results=min(max(fetch_ks), len(ids)), include=[])
+                    for fetch_k in fetch_ks:
+                        n = min(fetch_k, len(ids))
+                        latencies, hits = [], 0
+                        for q, truth in zip(queries, exact):
+                            start = time.perf_counter()
+                            found = collection.query(query_embeddings=[q], n_results=n, include=[])["ids"][0]
+                            latencies.append((time.perf_counter() - start) * 1000)
+                            hits += len(set(found) & {ids[i] for i in truth[:n]})
+                        rows.append({
+                            **index, "fetch_k": fetch_k,
+                            "recall": hits / (n * len(queries)),
+                            "p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95),
+                            "build_s": build_seconds,
+                        })
+                    client.delete_collection(collection.name)
+    return rows
+
+
+def recommend(rows: list[dict], target: float) -> dict:
+    """
+    Among the rows reaching the target recall (else the best-recall row):
+    those within LATENCY_TOLERANCE of the lowest p95, then the highest
+    recall and the cheapest graph, search and candidate count.
+    """
+    passing = [r for r in rows if r["recall"] >= target] or [max(rows, key=lambda r: r["recall"])]
+    fastest = min(r["p95_ms"] for r in passing)
+    close = [r for r in passing if r["p95_ms"] <= fastest * (1 + LATENCY_TOLERANCE)]
+    return min(close, key=lambda r: (-r["recall"], r["M"], r["construction_ef"], r["search_ef"], r["fetch_k"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep HNSW index and retriever parameters for an ingested repository.")
+    parser.add_argument("--repo_name", type=str, required=True, help="Repository ingested into knowledge_base/")
+    parser.add_argument("--queries", choices=["sections", "chunks"], default="sections",
+                        help="Canonical bundle queries (embedded, default) or stored chunk vectors (free)")
+    parser.add_argument("--sample", type=int, default=100, help="Maximum number of queries (default: 100)")
+    parser.add_argument("--space", nargs="+", choices=["l2", "cosine", "ip"], help="Distances to try (default: the collection's)")
+    parser.add_argument("--M", nargs="+", type=int, default=[8, 16, 32])
+    parser.add_argument("--construction-ef", nargs="+", type=int, default=[64, 100, 200])
+    parser.add_argument("--search-ef", nargs="+", type=int, default=[16, 32, 64, 100])
+    parser.add_argument("--fetch-k", nargs="+", type=int, default=[12, 20, 40], help="MMR candidate counts to try")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="Recall the recommendation must reach (default: 0.95)")
+    parser.add_argument("--save", action="store_true",
+                        help=f"Write the recommendation to {RETRIEVAL_CONFIG_DIR}/<repo>.json (applied on the next ingestion)")
+    args = parser.parse_args()
+
+    ids, vectors, hnsw = load_vectors(args.repo_name)
+    if not ids:
+        print(f"Collection of {args.repo_name} is empty.")
+        return
+    args.space = args.space or [hnsw.get("space", "l2")]
+    current = search_kwargs(args.repo_name)
+    queries = query_vectors(vectors, args.queries, args.sample)
+    print(f"{args.repo_name}: {len(ids)} chunks, {len(queries)} {args.queries} queries, k={current['k']}")
+
+    rows = sweep(ids, vectors, queries, args, current["k"])
+    print(f"{'space':<7}{'M':>4}{'c_ef':>6}{'s_ef':>6}{'fetch_k':>9}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}{'build s':>9}")
+    for r in rows:
+        print(f"{r['space']:<7}{r['M']:>4}{r['construction_ef']:>6}{r['search_ef']:>6}{r['fetch_k']:>9}"
+              f"{r['recall']:>9.3f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['build_s']:>9.2f}")
+
+    best = recommend(rows, args.target_recall)
+    config = retrieval_config(args.repo_name)
+    config["index"].update({name: best[name] for name in ("space", "M", "construction_ef", "search_ef")})
+    config["search"].update({"k": current["k"], "fetch_k": best["fetch_k"], "lambda_mult": current["lambda_mult"]})
+    print(f"\n{'=' * 50}")
+    if best["recall"] < args.target_recall:
+        print(f"No setting reached recall {args.target_recall}; best recall is {best['recall']:.3f}.")
+    print(f"Recommended (recall {best['recall']:.3f}, p95 {best['p95_ms']:.2f} ms):")
+    print(json.dumps(config, indent=2))
+
+    if args.save:
+        out_dir = os.path.join(os.getcwd(), RETRIEVAL_CONFIG_DIR)
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"{args.repo_name}.json")
+        with open(out_path, "w") as f:
+            json.dump(config, f, indent=2)
+        print(f"Saved to {out_path}; re-ingest {args.repo_name} to apply.")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,17 @@ import csv
 import os
 import sys
 import time
-from typing import List
+from typing import TYPE_CHECKING, List
 
-from langchain_openai import ChatOpenAI
 from langchain_core.callbacks import BaseCallbackHandler
-from langchain_core.outputs import LLMResult
-from langchain_core.prompts import PromptTemplate
+
+if TYPE_CHECKING:
+    from langchain_core.outputs import LLMResult
+    from langchain_core.prompts import PromptTemplate
 
 sys.path.append(os.getcwd())
-from src.vector_store.store import get_vector_store, get_retriever
+from src.vector_store.bundles import BASELINE_QUERIES
+from src.vector_store.store import get_vector_store, load_whole_context, search
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -36,13 +38,9 @@ OUTPUT_DIR = os.path.join(os.getcwd(), "generated_readmes", "baseline_single_age
 
 # Retrieval queries — each targets a different facet of the repository so that
 # the single agent receives broad, diverse context comparable to what the MAS
-# pipeline gathers across its specialised agents.
-RETRIEVAL_QUERIES = [
-    "project overview description purpose architecture main entry point",
-    "installation setup dependencies requirements pip npm docker compose",
-    "usage examples commands API endpoints CLI flags run start",
-    "configuration environment variables config options settings .env",
-]
+# pipeline gathers across its specialised agents. Defined with the retrieval
+# bundles, which precompute their results at ingestion.
+RETRIEVAL_QUERIES = BASELINE_QUERIES
 
 
 # Token counting callback (mirrors src/workflows/main.py)
@@ -54,7 +52,7 @@ class TokenCountingCallback(BaseCallbackHandler):
         self.prompt_tokens = 0
         self.completion_tokens = 0
 
-    def on_llm_end(self, response: LLMResult, **kwargs):
+    def on_llm_end(self, response: "LLMResult", **kwargs):
         if response.llm_output and "token_usage" in response.llm_output:
             usage = response.llm_output["token_usage"]
             self.total_tokens += usage.get("total_tokens", 0)
@@ -70,13 +68,19 @@ def retrieve_context(repo_name: str, k_per_query: int = 8) -> str:
     across queries by document content hash.
 
     Returns a single string containing all unique retrieved chunks,
-    each prefixed with its source path.
+    each prefixed with its source path. Small repositories ingested without
+    a vector store return their packed whole-file context instead.
     """
+    packed = load_whole_context(repo_name)
+    if packed is not None:
+        print(f"[{repo_name}] Small repository: using the whole-file context packed at ingestion "
+              f"({len(packed):,} chars), no vector search.")
+        return packed
+
     print(f"[{repo_name}] Retrieving context from vector store ...")
 
     try:
         store = get_vector_store(repo_name)
-        retriever = get_retriever(store)
     except Exception as e:
         print(f"[{repo_name}] ERROR: Could not load vector store — {e}")
         return "No context available (vector store error)."
@@ -86,7 +90,7 @@ def retrieve_context(repo_name: str, k_per_query: int = 8) -> str:
 
     for query in RETRIEVAL_QUERIES:
         try:
-            docs = retriever.invoke(query)
+            docs = search(store, repo_name, query)
         except Exception as e:
             print(f"[{repo_name}]  Warning: query failed ('{query[:40]}…'): {e}")
             continue
@@ -109,8 +113,10 @@ def retrieve_context(repo_name: str, k_per_query: int = 8) -> str:
     return context_str
 
 
-def load_prompt_template() -> PromptTemplate:
+def load_prompt_template() -> "PromptTemplate":
     """Load the external prompt file and return a LangChain PromptTemplate."""
+    from langchain_core.prompts import PromptTemplate
+
     if not os.path.exists(PROMPT_PATH):
         raise FileNotFoundError(
             f"Prompt file not found: {PROMPT_PATH}\n"
@@ -186,6 +192,7 @@ def generate_single_agent_readme(repo_name: str, model_name: str = "gpt-5.1"):
 
     print(f"[{repo_name}] Generating README (this may take a minute) ...")
     token_cb = TokenCountingCallback()
+    from langchain_openai import ChatOpenAI
     llm = ChatOpenAI(
         model=model_name,
         temperature=0.7,
@@ -2,12 +2,11 @@ import os
 import json
 import re
 from typing import Dict
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 class Aggregator:
     def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
         
         prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/aggregator_prompt.txt")
@@ -60,11 +59,25 @@ class Aggregator:
         
         return '\n'.join(result_lines)
 
-    def aggregate(self, sections: Dict[str, str]) -> str:
+    def assemble(self, sections: Dict[str, str]) -> str:
+        """
+        Deterministic assembly used when no LLM call can be afforded:
+        sections in plan order under H2 headers, duplicate command blocks removed.
+        """
+        parts = [f"## {title}\n\n{content.strip()}" for title, content in sections.items() if content]
+        return self._deduplicate_commands("\n\n".join(parts) + "\n")
+
+    def aggregate(self, sections: Dict[str, str], deterministic: bool = False) -> str:
+        if deterministic:
+            print("Assembling final README deterministically...")
+            return self.assemble(sections)
+
         print("Aggregating final README...")
         
         sections_str = json.dumps(sections, indent=2)
 
+        from langchain_core.prompts import PromptTemplate
+
         prompt = PromptTemplate(
             template=self.prompt_template,
             input_variables=["sections_json"]
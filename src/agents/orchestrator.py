@@ -2,9 +2,6 @@ import os
 import json
 from enum import Enum
 from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 
 class OrchestratorDecision(BaseModel):
@@ -15,6 +12,8 @@ class OrchestratorDecision(BaseModel):
 
 class Orchestrator:
     def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
         
         prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/orchestrator_prompt.txt")
@@ -27,6 +26,8 @@ class Orchestrator:
         section_status = state.get("section_status", {})
         feedback = state.get("review_feedback", {})
         
+        from langchain_core.prompts import PromptTemplate
+
         prompt = PromptTemplate(
             template=self.prompt_template,
             input_variables=["repo_name", "iteration", "phase", "has_profile", "has_plan", "section_status_json", "feedback_json"]
@@ -39,6 +40,23 @@ class Orchestrator:
             print(f"[{state.get('repo_name')}] Max steps (50) reached. Forcing finish.")
             return OrchestratorDecision(decision="FINISH", reasoning="Max steps reached.", target_sections=[])
 
+        # Token budget nearly spent: finish deterministically without another LLM call
+        budget = state.get("budget")
+        if budget is not None and budget.exhausted() and state.get("plan") is not None:
+            print(f"[{state.get('repo_name')}] Token budget exhausted. Forcing finish.")
+            return OrchestratorDecision(decision="FINISH", reasoning="Token budget exhausted.", target_sections=[])
+
+        # Deadline near: no new review rounds; write whatever is still unwritten
+        # in one parallel wave, then finish
+        deadline = state.get("deadline")
+        if deadline is not None and state.get("plan") is not None and deadline.near():
+            unwritten = [sid for sid, status in section_status.items() if status in ("pending", "fail")]
+            if unwritten and state.get("phase") != "WIND_DOWN":
+                print(f"[{state.get('repo_name')}] Deadline near. Final writing wave for {unwritten}.")
+                return OrchestratorDecision(decision="DELEGATE", reasoning="Deadline near: final writing wave.", target_sections=unwritten)
+            print(f"[{state.get('repo_name')}] Deadline near. Forcing finish.")
+            return OrchestratorDecision(decision="FINISH", reasoning="Deadline near.", target_sections=[])
+
         try:
             decision = chain.invoke({
                 "repo_name": state.get("repo_name"),
@@ -1,13 +1,12 @@
 import os
 import json
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
 from src.models.repo_profile import RepoProfile
 from src.models.readme_plan import ReadmePlan
 
 class ReadmePlanner:
     def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
         
         prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/planner_prompt.txt")
@@ -24,6 +23,8 @@ class ReadmePlanner:
         profile_json = profile.model_dump_json()
         pattern_library_str = json.dumps(self.pattern_library, indent=2)
 
+        from langchain_core.prompts import PromptTemplate
+
         prompt = PromptTemplate(
             template=self.prompt_template,
             input_variables=["repo_profile_json", "pattern_library_json"]
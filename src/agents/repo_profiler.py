@@ -2,47 +2,72 @@
 import os
 import json
 from typing import List
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
 from src.models.repo_profile import RepoProfile
 from src.models.readme_plan import ReadmePlan
-from src.vector_store.store import get_retriever, get_vector_store
+from src.vector_store.store import get_vector_store, load_whole_context, search
+from src.ingestion.utils.manifest_parser import HINT_FIELDS, extract_manifest_facts
+from src.ingestion.utils.symbol_index import INDEX_HINT_FIELDS, load_symbol_index, profile_facts_from_index
+
+# Retrieval queries and the profile fields they mainly serve. A query is
+# skipped when all of its fields were already parsed from the manifests or
+# looked up in the symbol index (hints don't count).
+PROFILE_QUERIES = [
+    ("project description purpose overview what is this", ["description", "key_features"]),
+    ("installation setup requirements dependencies how to install", ["install_methods", "dependencies"]),
+    ("usage examples features configuration how to use", ["usage_snippets", "config_options", "commands"]),
+]
 
 class UnifiedRepoProfiler:
     def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
         
         prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/unified_profiler_prompt.txt")
         with open(prompt_path, "r") as f:
             self.prompt_template = f.read()
 
-    def profile(self, repo_name: str, file_tree: str) -> RepoProfile:
+    def profile(self, repo_name: str, file_tree: str, repo_path: str | None = None) -> RepoProfile:
         print(f"[{repo_name}] Orchestrator Profiler running...")
-        
-        context = ""
-        try:
-            store = get_vector_store(repo_name)
-            retriever = get_retriever(store)
-            queries = [
-                "project description purpose overview what is this",
-                "installation setup requirements dependencies how to install",
-                "usage examples features configuration how to use",
-            ]
-            all_docs, seen = [], set()
-            for q in queries:
-                for d in retriever.invoke(q)[:4]:
-                    if d.page_content not in seen:
-                        seen.add(d.page_content)
-                        all_docs.append(d)
-            context = "\n\n".join([f"...{d.page_content}..." for d in all_docs[:10]])
-        except Exception as e:
-            print(f"Vector Store access failed: {e}")
-            context = "Vector store unavailable."
+
+        # Exact values from pyproject.toml / package.json / Cargo.toml / LICENSE ...
+        facts = extract_manifest_facts(repo_path) if repo_path else {}
+        # (derived ones, such as `pip install .`, only as hints for the LLM)
+        hints = {key: facts.pop(key) for key in HINT_FIELDS if key in facts}
+        # ... and entry points, CLI options and env vars from the symbol index.
+        # Manifest values (e.g. console scripts) take precedence; commands and
+        # usage snippets built from entry points and CLI options are hints.
+        for key, value in profile_facts_from_index(load_symbol_index(repo_name, repo_path)).items():
+            if key in INDEX_HINT_FIELDS:
+                if key not in facts:
+                    hints.setdefault(key, value)
+            else:
+                facts.setdefault(key, value)
+        known_facts = json.dumps(facts, indent=2) if facts else "None found."
+        known_hints = json.dumps(hints, indent=2) if hints else "None."
+
+        # Small repos are packed whole at ingestion (no vector search)
+        context = load_whole_context(repo_name)
+        if context is None:
+            try:
+                store = get_vector_store(repo_name)
+                queries = [q for q, fields in PROFILE_QUERIES if not all(f in facts for f in fields)]
+                all_docs, seen = [], set()
+                for q in queries:
+                    for d in search(store, repo_name, q)[:4]:
+                        if d.page_content not in seen:
+                            seen.add(d.page_content)
+                            all_docs.append(d)
+                context = "\n\n".join([f"...{d.page_content}..." for d in all_docs[:10]])
+            except Exception as e:
+                print(f"Vector Store access failed: {e}")
+                context = "Vector store unavailable."
+
+        from langchain_core.prompts import PromptTemplate
 
         prompt = PromptTemplate(
             template=self.prompt_template,
-            input_variables=["repo_name", "file_tree", "context"]
+            input_variables=["repo_name", "file_tree", "context", "known_facts", "hints"]
         )
         
         chain = prompt | self.llm.with_structured_output(RepoProfile)
@@ -51,15 +76,20 @@ class UnifiedRepoProfiler:
             profile = chain.invoke({
                 "repo_name": repo_name,
                 "file_tree": file_tree,
-                "context": context
+                "context": context,
+                "known_facts": known_facts,
+                "hints": known_hints
             })
+            # Parsed values are exact; never let the LLM's version win
+            for key, value in facts.items():
+                setattr(profile, key, value)
             print(f"[{repo_name}] Profile generated successfully.")
             # Critical: Enforce the exact repo name from input to match Vector Store keys
             profile.name = repo_name 
             return profile
         except Exception as e:
             print(f"Profiling failed: {e}")
-            return RepoProfile(
+            fallback = RepoProfile(
                 name=repo_name,
                 type="Unknown",
                 main_language="Unknown",
@@ -71,3 +101,5 @@ class UnifiedRepoProfiler:
                 usage_snippets=[],
                 config_options=[]
             )
+            # The manifest facts don't depend on the LLM
+            return fallback.model_copy(update=facts)
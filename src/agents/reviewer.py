@@ -1,37 +1,71 @@
 import os
 import json
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from src.models.repo_profile import RepoProfile
-from src.vector_store.store import get_retriever, get_vector_store
+from src.vector_store.bundles import review_query
+from src.vector_store.routing import section_roles
+from src.vector_store.store import get_vector_store, load_whole_context, search
 
 class ReviewResult(BaseModel):
     status: str = Field(..., description="'pass' or 'fail'")
     feedback: str = Field(..., description="Explanation of issues")
     rewritten_content: Optional[str] = Field(None, description="Corrected content if fix is minor")
+    section_id: Optional[str] = Field(None, description="ID of the reviewed section (batch reviews)")
+
+class BatchReviewResult(BaseModel):
+    reviews: List[ReviewResult] = Field(..., description="One review per section.")
 
 class Reviewer:
     def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
         
-        prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/reviewer_prompt.txt")
-        with open(prompt_path, "r") as f:
+        prompts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts")
+        with open(os.path.join(prompts_dir, "reviewer_prompt.txt"), "r") as f:
             self.prompt_template = f.read()
+        with open(os.path.join(prompts_dir, "batch_reviewer_prompt.txt"), "r") as f:
+            self.batch_prompt_template = f.read()
 
-    def review(self, profile: RepoProfile, section: str, content: str) -> ReviewResult:
-        print(f"[{profile.name}] Unified Reviewer checking '{section}'...")
-        
-        context = ""
+    def verification_context(self, profile: RepoProfile, section_ids: List[str], writer_contexts: List[str],
+                             max_chunks: int = 3, extra_retrieval: bool = False) -> str:
+        """
+        The context the writer retrieved for these sections, so the review
+        checks the draft against exactly what the writer saw. The reviewer's
+        own search runs only when no writer context was recorded, or in
+        addition to it when extra_retrieval is set.
+        """
+        written = list(dict.fromkeys(c for c in writer_contexts if c))
+        if written and not extra_retrieval:
+            return "\n\n".join(written)
+
+        # Small repos are packed whole at ingestion (no vector search)
+        context = load_whole_context(profile.name)
+        if context is not None:
+            return context
         try:
             store = get_vector_store(profile.name)
-            retriever = get_retriever(store)
-            docs = retriever.invoke(f"{section} verification items")
-            context = "\n\n".join([d.page_content[:500] for d in docs[:3]])
+            packed = "\n\n".join(written)
+            seen, chunks = set(), []
+            for section_id in section_ids:
+                for d in search(store, profile.name, review_query(section_id), roles=section_roles(section_id))[:max_chunks]:
+                    chunk = d.page_content[:500]
+                    # Skip chunks the writer's context already contains
+                    if chunk not in seen and chunk not in packed:
+                        seen.add(chunk)
+                        chunks.append(chunk)
+            return "\n\n".join(written + chunks)
         except Exception as e:
-            context = "Verification context unavailable."
+            return "\n\n".join(written) or "Verification context unavailable."
+
+    def review(self, profile: RepoProfile, section: str, content: str, max_chunks: int = 3,
+               writer_context: str = "", extra_retrieval: bool = False) -> ReviewResult:
+        print(f"[{profile.name}] Unified Reviewer checking '{section}'...")
+        
+        context = self.verification_context(profile, [section], [writer_context], max_chunks, extra_retrieval)
+
+        from langchain_core.prompts import PromptTemplate
 
         prompt = PromptTemplate(
             template=self.prompt_template,
@@ -50,3 +84,38 @@ class Reviewer:
         except Exception as e:
             print(f"Review failed: {e}")
             return ReviewResult(status="pass", feedback="Reviewer failed to execute, assuming pass.")
+
+    def review_batch(self, profile: RepoProfile, sections: List[Dict[str, str]], max_chunks: int = 3,
+                     writer_contexts: Optional[Dict[str, str]] = None, extra_retrieval: bool = False) -> List[ReviewResult]:
+        """
+        Reviews several sections in one structured call with a shared context.
+        sections: dicts with 'id', 'title' and 'content'.
+        writer_contexts: the context each section's writer retrieved, by id.
+        Returns one ReviewResult per section the model answered, with section_id set.
+        """
+        ids = [s["id"] for s in sections]
+        print(f"[{profile.name}] Unified Reviewer batch-checking {ids}...")
+
+        writer_contexts = writer_contexts or {}
+        context = self.verification_context(profile, ids, [writer_contexts.get(i, "") for i in ids], max_chunks, extra_retrieval)
+
+        from langchain_core.prompts import PromptTemplate
+
+        prompt = PromptTemplate(
+            template=self.batch_prompt_template,
+            input_variables=["sections_json", "repo_profile_json", "context"]
+        )
+        
+        chain = prompt | self.llm.with_structured_output(BatchReviewResult)
+        
+        try:
+            result = chain.invoke({
+                "sections_json": json.dumps(sections, indent=2),
+                "repo_profile_json": profile.model_dump_json(),
+                "context": context
+            })
+        except Exception as e:
+            print(f"Batch review failed: {e}")
+            return []
+
+        return [r for r in result.reviews if r.section_id in ids]
@@ -0,0 +1,264 @@
+import os
+import re
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from src.agents.reviewer import ReviewResult
+from src.ingestion.utils.file_scanner import IGNORE_DIRS
+from src.ingestion.utils.snapshot import get_snapshot
+
+# Package-manager / build tools and the files that show a repository uses them.
+# A tool is considered "in use" if any of its marker files exist anywhere in
+# the repository (or, for globs, any file with that suffix).
+TOOL_MARKERS: Dict[str, Tuple[str, ...]] = {
+    "pip":            ("requirements.txt", "setup.py", "setup.cfg", "pyproject.toml", "*.py"),
+    "pipenv":         ("Pipfile",),
+    "poetry":         ("poetry.lock", "[tool.poetry]"),
+    "uv":             ("uv.lock", "pyproject.toml"),
+    "conda":          ("environment.yml", "environment.yaml"),
+    "npm":            ("package.json",),
+    "yarn":           ("yarn.lock", "packageManager:yarn"),
+    "pnpm":           ("pnpm-lock.yaml", "pnpm-workspace.yaml", "packageManager:pnpm"),
+    "bun":            ("bun.lockb", "bun.lock"),
+    "cargo":          ("Cargo.toml",),
+    "go":             ("go.mod", "*.go"),
+    "mvn":            ("pom.xml",),
+    "gradle":         ("build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts"),
+    "gem":            ("Gemfile", "*.gemspec"),
+    "bundle":         ("Gemfile",),
+    "composer":       ("composer.json",),
+    "docker-compose": ("docker-compose.yml", "docker-compose.yaml", "compose.yml", "compose.yaml"),
+    "make":           ("Makefile", "makefile", "GNUmakefile"),
+}
+
+# Command prefix -> tool name
+COMMAND_TOOLS = {
+    "pip": "pip", "pip3": "pip", "pipenv": "pipenv", "poetry": "poetry", "uv": "uv",
+    "conda": "conda", "mamba": "conda",
+    "npm": "npm", "yarn": "yarn", "pnpm": "pnpm", "bun": "bun",
+    "cargo": "cargo", "go": "go", "mvn": "mvn", "./mvnw": "mvn",
+    "gradle": "gradle", "./gradlew": "gradle",
+    "gem": "gem", "bundle": "bundle", "composer": "composer",
+    "docker-compose": "docker-compose", "make": "make",
+}
+
+# Environment / installer tools that work in any repository of their language
+# (`conda create -n x python=3.10` in a pip project): a warning, not a failure
+SOFT_TOOLS = {"pip", "conda"}
+
+# Extensions that mark inline code as a file path even when the repository
+# has no file of that type (`config.yaml`, `docs/setup.md`)
+PATH_EXTENSIONS = {
+    ".py", ".ipynb", ".js", ".ts", ".jsx", ".tsx", ".go", ".rs", ".java", ".rb", ".php", ".sh",
+    ".md", ".rst", ".txt", ".json", ".yml", ".yaml", ".toml", ".cfg", ".ini", ".csv", ".html",
+}
+
+# Virtualenvs are created by the user (`source venv/bin/activate`), never committed
+VENV_PREFIXES = ("venv/", ".venv/", "env/")
+
+# Commands whose first argument is a file inside the repository
+FILE_ARG_COMMANDS = {"python", "python3", "node", "bash", "sh", "ts-node", "deno", "ruby", "php", "source"}
+
+_SHELL_LANGS = {"", "bash", "sh", "shell", "console", "zsh", "terminal", "cmd", "powershell", "ps1"}
+_CODE_BLOCK = re.compile(r"^\s*```([\w+-]*)[^\n]*\n(.*?)^\s*```", re.M | re.S)
+_INLINE_CODE = re.compile(r"(?<!`)`([^`\n]+)`(?!`)")
+_MD_LINK = re.compile(r"\[[^\]]*\]\(([^)\s]+)[^)]*\)")
+_PLACEHOLDER = re.compile(r"[<>{}$*~|]|\.\.\.")
+_URL_SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+# The file tree hides these, but READMEs legitimately point into them
+# (`bin/run.sh`, `packages/core`), so the index keeps them.
+_INDEXED_DIRS = {"bin", "packages", "build", "dist", "out", "vendor"}
+_PRUNE_DIRS = IGNORE_DIRS - _INDEXED_DIRS
+
+class RepoIndex:
+    """Files, directories and tools of a repository, for cheap lookups."""
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self.files: Set[str] = set()
+        self.dirs: Set[str] = set()
+        self.top_dirs: Set[str] = set()
+        self.basenames: Set[str] = set()
+        self.suffixes: Set[str] = set()
+        self.markers: Set[str] = set()
+
+        for entry in get_snapshot(repo_path).entries:
+            path = entry["path"]
+            if any(part in _PRUNE_DIRS for part in path.split("/")):
+                continue
+            if entry["is_dir"]:
+                self.dirs.add(path)
+                if "/" not in path:
+                    self.top_dirs.add(path)
+                continue
+            fname = os.path.basename(path)
+            self.files.add(path)
+            self.basenames.add(fname)
+            self.suffixes.add(os.path.splitext(fname)[1].lower())
+
+        self._read_manifest_markers()
+        self.tools = {tool for tool, markers in TOOL_MARKERS.items() if any(self._has_marker(m) for m in markers)}
+
+    def _read_manifest_markers(self):
+        pyproject = os.path.join(self.repo_path, "pyproject.toml")
+        if os.path.isfile(pyproject):
+            with open(pyproject, "r", encoding="utf-8", errors="ignore") as f:
+                if "[tool.poetry]" in f.read():
+                    self.markers.add("[tool.poetry]")
+        package_json = os.path.join(self.repo_path, "package.json")
+        if os.path.isfile(package_json):
+            try:
+                with open(package_json, "r", encoding="utf-8", errors="ignore") as f:
+                    manager = str(json.load(f).get("packageManager", ""))
+                self.markers.add(f"packageManager:{manager.split('@')[0]}")
+            except (ValueError, AttributeError):
+                pass
+
+    def _has_marker(self, marker: str) -> bool:
+        if marker.startswith("*."):
+            return marker[1:] in self.suffixes
+        if marker in self.markers:
+            return True
+        return marker in self.basenames
+
+    def has_path(self, path: str) -> bool:
+        norm = os.path.normpath(path.strip()).rstrip("/")
+        if norm in self.files or norm in self.dirs or ("/" not in norm and norm in self.basenames):
+            return True
+        # `.env` is usually created by the user from a committed template
+        return any(f"{norm}{suffix}" in self.files for suffix in (".example", ".sample", ".template"))
+
+@lru_cache(maxsize=16)
+def get_repo_index(repo_path: str) -> RepoIndex:
+    return RepoIndex(repo_path)
+
+class StaticReviewer:
+    """
+    Local, LLM-free pre-review. Catches mechanical problems (wrong package
+    manager, references to files that don't exist) so they go straight back
+    to the writer without a Reviewer call, and drops duplicate code blocks.
+    Doubtful findings (an installer the repository doesn't declare) are kept
+    in `warnings` and don't fail the section.
+    """
+
+    def __init__(self, repo_path: str):
+        self.index = get_repo_index(repo_path)
+        self.warnings: List[str] = []
+
+    def _command_lines(self, content: str) -> List[str]:
+        lines = []
+        for lang, body in _CODE_BLOCK.findall(content):
+            if lang.lower() not in _SHELL_LANGS:
+                continue
+            for line in body.splitlines():
+                line = line.strip()
+                if line.startswith("$ "):
+                    line = line[2:]
+                if line and not line.startswith("#"):
+                    # Split chained commands: `cd x && npm install`
+                    lines.extend(part.strip() for part in re.split(r"&&|;|\|\|", line) if part.strip())
+        return lines
+
+    def _check_commands(self, content: str) -> List[str]:
+        issues = []
+        for line in self._command_lines(content):
+            tokens = line.split()
+            if tokens and tokens[0] == "sudo":
+                tokens = tokens[1:]
+            if not tokens:
+                continue
+            head = tokens[0]
+            if head in ("python", "python3") and tokens[1:3] == ["-m", "pip"]:
+                head = "pip"
+            if head == "docker" and len(tokens) > 1 and tokens[1] == "compose":
+                head = "docker-compose"
+
+            tool = COMMAND_TOOLS.get(head)
+            if tool and tool not in self.index.tools:
+                markers = ", ".join(m for m in TOOL_MARKERS[tool] if not m.startswith(("*", "[", "packageManager")))
+                issue = f"`{line}` uses {tool}, but the repository has no {markers or tool + ' project files'}."
+                (self.warnings if tool in SOFT_TOOLS else issues).append(issue)
+                continue
+            if head == "docker" and len(tokens) > 1 and tokens[1] == "build" and "Dockerfile" not in self.index.basenames:
+                issues.append(f"`{line}` builds a Docker image, but the repository has no Dockerfile.")
+                continue
+
+            # File arguments: `python app.py`, `pip install -r requirements.txt`, `./run.sh`
+            candidates = []
+            if head in FILE_ARG_COMMANDS and len(tokens) > 1 and not tokens[1].startswith("-"):
+                candidates.append(tokens[1])
+            if "-r" in tokens[:-1]:
+                candidates.append(tokens[tokens.index("-r") + 1])
+            if head.startswith("./") and head not in COMMAND_TOOLS:
+                candidates.append(head)
+            for path in candidates:
+                if head == "source" and path.startswith(VENV_PREFIXES):
+                    continue
+                if self._looks_like_repo_path(path) and not self.index.has_path(path):
+                    issues.append(f"`{line}` references `{path}`, which does not exist in the repository.")
+        return issues
+
+    def _looks_like_path(self, text: str) -> bool:
+        if _PLACEHOLDER.search(text) or _URL_SCHEME.match(text) or text.startswith(("/", "#", "@", "-", "../")):
+            return False
+        if " " in text or "=" in text:
+            return False
+        return "/" in text or bool(os.path.splitext(text)[1])
+
+    def _looks_like_repo_path(self, text: str) -> bool:
+        """A path starting in an existing top-level directory or ending in a file extension
+        (`src/app.py`, `config.yaml`); not MIME types or `owner/repo` names, which
+        have no extension and don't start in a repository directory."""
+        if not self._looks_like_path(text):
+            return False
+        norm = os.path.normpath(text)
+        if norm.split("/")[0] in self.index.top_dirs:
+            return True
+        ext = os.path.splitext(norm)[1].lower()
+        return bool(ext) and (ext in self.index.suffixes or ext in PATH_EXTENSIONS)
+
+    def _check_paths(self, content: str) -> List[str]:
+        # Only references that clearly point into the repo: relative link
+        # targets (no URL schemes) and inline code that looks like a repo path.
+        without_blocks = _CODE_BLOCK.sub("", content)
+        links = [t.split("#")[0] for t in _MD_LINK.findall(without_blocks)]
+        refs = [t for t in links if self._looks_like_path(t)]
+        refs += [t for t in _INLINE_CODE.findall(without_blocks) if "/" in t and self._looks_like_repo_path(t)]
+        issues, seen = [], set()
+        for ref in refs:
+            if not ref or ref in seen:
+                continue
+            seen.add(ref)
+            if not self.index.has_path(ref):
+                issues.append(f"`{ref}` is referenced but does not exist in the repository.")
+        return issues
+
+    def dedupe_code_blocks(self, content: str) -> Tuple[str, int]:
+        """Removes repeated code blocks. Returns the cleaned content and how many were removed."""
+        seen = set()
+        removed = 0
+
+        def _replace(match):
+            nonlocal removed
+            normalized = re.sub(r"\s+", " ", match.group(2).strip().lower())
+            if normalized in seen and len(normalized) > 10:
+                removed += 1
+                return ""
+            seen.add(normalized)
+            return match.group(0)
+
+        deduped = _CODE_BLOCK.sub(_replace, content)
+        if not removed:
+            return content, 0
+        return re.sub(r"\n{3,}", "\n\n", deduped).strip(), removed
+
+    def check(self, section_id: str, content: str) -> Optional[ReviewResult]:
+        """Returns a failing ReviewResult listing concrete issues, or None if the section passes.
+        Warnings found along the way are left in self.warnings."""
+        self.warnings = []
+        issues = self._check_commands(content) + self._check_paths(content)
+        if not issues:
+            return None
+        feedback = "Static check failed:\n" + "\n".join(f"- {issue}" for issue in issues)
+        return ReviewResult(status="fail", feedback=feedback, section_id=section_id)
@@ -0,0 +1,85 @@
+import os
+import json
+from typing import Dict, List
+from pydantic import BaseModel, Field
+from src.models.repo_profile import RepoProfile
+from src.vector_store.bundles import canonical_query
+from src.vector_store.routing import section_roles
+from src.vector_store.store import chunk_text, expand_hits, get_vector_store, load_whole_context, search
+
+class SectionDraft(BaseModel):
+    id: str = Field(..., description="Section ID exactly as requested.")
+    content: str = Field(..., description="Markdown content for the section, without a header.")
+
+class BatchWriteResult(BaseModel):
+    sections: List[SectionDraft] = Field(..., description="One draft per requested section.")
+
+class BatchWriter:
+    """
+    Writes a group of related sections in one structured-output call.
+    The profile, prompt and retrieved context are sent once for the whole
+    group instead of once per section.
+    """
+
+    def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
+        self.llm = ChatOpenAI(model=model_name, temperature=0.7)
+        
+        prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/batch_writer_prompt.txt")
+        with open(prompt_path, "r") as f:
+            self.prompt_template = f.read()
+        # Shared retrieved context of the last write_batch(), handed to the reviewer of its sections
+        self.last_context = ""
+
+    def write_batch(self, profile: RepoProfile, sections: List[Dict[str, str]], section_type: str, max_chunks: int = 5) -> Dict[str, str]:
+        """
+        sections: dicts with 'id', 'title', 'instructions' and optionally 'current_content'.
+        Returns content keyed by section id; sections the model skipped are absent.
+        """
+        titles = [s["title"] for s in sections]
+        print(f"[{profile.name}] BatchWriter writing {titles}...")
+
+        self.last_context = ""
+        # One shared context block: a few chunks per section, deduplicated
+        # Small repos are packed whole at ingestion (no vector search)
+        context = load_whole_context(profile.name)
+        if context is None:
+            try:
+                store = get_vector_store(profile.name)
+                seen, chunks = set(), []
+                for s in sections:
+                    instructions_hint = (s.get("instructions") or "")[:120].strip()
+                    query = canonical_query(s["id"]) or f"{s['title']} {instructions_hint}".strip()
+                    for d in expand_hits(store, search(store, profile.name, query, roles=section_roles(s["id"]))[:max_chunks]):
+                        if d.page_content not in seen:
+                            seen.add(d.page_content)
+                            chunks.append(chunk_text(d))
+                context = "\n\n".join(chunks)
+                self.last_context = context
+            except Exception as e:
+                print(f"Vector Store access failed for {titles}: {e}")
+                context = "Context unavailable."
+
+        from langchain_core.prompts import PromptTemplate
+
+        prompt = PromptTemplate(
+            template=self.prompt_template,
+            input_variables=["section_type", "repo_profile_json", "context", "sections_json"]
+        )
+        
+        chain = prompt | self.llm.with_structured_output(BatchWriteResult)
+        
+        try:
+            result = chain.invoke({
+                "section_type": section_type,
+                "repo_profile_json": profile.model_dump_json(),
+                "context": context,
+                "sections_json": json.dumps(sections, indent=2)
+            })
+        except Exception as e:
+            print(f"BatchWriter failed on {titles}: {e}")
+            return {}
+
+        requested = {s["id"] for s in sections}
+        return {d.id: d.content for d in result.sections if d.id in requested and d.content.strip()}
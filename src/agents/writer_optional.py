@@ -1,33 +1,46 @@
 import os
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
 from src.models.repo_profile import RepoProfile
-from src.vector_store.store import get_retriever, get_vector_store
+from src.vector_store.bundles import canonical_query
+from src.vector_store.routing import section_roles
+from src.vector_store.store import chunk_text, expand_hits, get_vector_store, load_whole_context, search
 
 class OptionalWriter:
     def __init__(self, model_name: str = "gpt-5.1"):
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(model=model_name, temperature=0.7)
         
         prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts/writer_prompt.txt")
         with open(prompt_path, "r") as f:
             self.prompt_template = f.read()
+        # Retrieved context of the last write(), handed to the reviewer of the same section
+        self.last_context = ""
 
     def write(self, profile: RepoProfile, section: str, instructions: str, **kwargs) -> str:
         print(f"[{profile.name}] OptionalWriter writing '{section}'...")
         
-        context = ""
-        try:
-            store = get_vector_store(profile.name)
-            retriever = get_retriever(store)
-            # Use section title + planner instructions as a dynamic, section-specific query
-            # instead of a hardcoded generic suffix that pulls irrelevant docs.
-            instructions_hint = (instructions or "")[:120].strip()
-            query = f"{section} {instructions_hint}".strip()
-            docs = retriever.invoke(query)
-            context = "\n\n".join([d.page_content[:1500] for d in docs[:5]])
-        except Exception as e:
-            context = ""
+        self.last_context = ""
+        # Small repos are packed whole at ingestion (no vector search)
+        context = load_whole_context(profile.name)
+        if context is None:
+            try:
+                store = get_vector_store(profile.name)
+                # Canonical sections use their fixed query, whose hits were precomputed at
+                # ingestion. Others use section title + planner instructions as a dynamic,
+                # section-specific query instead of a hardcoded generic suffix that pulls irrelevant docs.
+                instructions_hint = (instructions or "")[:120].strip()
+                query = canonical_query(kwargs.get("section_id", "")) or f"{section} {instructions_hint}".strip()
+                # Only chunks of the file roles the section draws on (manifests for installation, ...)
+                docs = search(store, profile.name, query, roles=section_roles(kwargs.get("section_id")))
+                max_chunks = kwargs.get("max_chunks", 5)
+                # Hits cut out of a larger function are completed with their neighbours
+                docs = expand_hits(store, docs[:max_chunks])
+                context = "\n\n".join([chunk_text(d) for d in docs])
+                self.last_context = context
+            except Exception as e:
+                context = ""
+
+        from langchain_core.prompts import PromptTemplate
 
         prompt = PromptTemplate(
             template=self.prompt_template,
@@ -1,7 +1,6 @@
 import argparse
 import os
 import csv
-from rouge import Rouge
 
 
 # python src/evaluation/evaluate_readme.py --repo <repo-name> --gen generated_readmes/<repo-name>.md --ref data/readmes/<repo-name>.md
@@ -56,7 +55,9 @@ def evaluate(repo_name, generated_path=None, reference_path=None, csv_path=None)
         print(f"Error: Reference README not found at {reference_path}")
         return
 
-    # Initialize Rouge
+    # Initialize Rouge (imported here so `--help` stays fast; bert_score is
+    # likewise imported only when it is about to be used)
+    from rouge import Rouge
     rouge = Rouge()
     
     # Calculate scores
@@ -1,22 +1,38 @@
 import os
 import sys
+import time
+import json
 import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.ingestion.utils.file_scanner import generate_file_tree
 from src.ingestion.utils.librarian import identify_essential_files
-from src.vector_store.store import ingest_repo
+from src.ingestion.utils.file_selector import candidate_tree, select_essential_files, selection_overlap
+from src.ingestion.utils.symbol_index import save_symbol_index
+from src.vector_store.store import RESCORE_PRECISIONS, SMALL_REPO_TOKENS, ingest_repo
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Token budget for the file tree shown to the Librarian
+LIBRARIAN_TREE_TOKENS = 3000
+
+# Heuristic candidates shown to the Librarian with --selector hybrid
+HYBRID_CANDIDATES = 60
+
 # Process a single repository:
 # python src/ingestion/ingest_repos.py --repos-dir <path/to/single-repo> --single-repo
 # Multiple repositories in a directory.
 # python src/ingestion/ingest_repos.py --repos-dir </path/to/repos-directory>
 # Or use the default directory
 # python src/ingestion/ingest_repos.py
+# Pick files locally instead of asking the Librarian (no LLM call)
+# python src/ingestion/ingest_repos.py --selector heuristic
+# Smaller index: 256-dim vectors, rescored with int8 full vectors
+# python src/ingestion/ingest_repos.py --embedding-dims 256 --rescore int8
+# Tune the HNSW index / retriever parameters of an ingested repo (see scripts/tune_retrieval.py)
+# python scripts/tune_retrieval.py --repo_name <repo-name> --save
 
 def sanitize_file_paths(file_paths: list[str], repo_name: str) -> list[str]:
     """
@@ -31,6 +47,41 @@ def sanitize_file_paths(file_paths: list[str], repo_name: str) -> list[str]:
         sanitized.append(path)
     return sanitized
 
+def select_files(repo_name: str, repo_path: str, selector: str = "llm", refresh_librarian: bool = False) -> list[str]:
+    """
+    Picks the files to ingest.
+
+    "llm": the Librarian reads the (budgeted) file tree.
+    "heuristic": local scoring by role, size and depth (file_selector.py), no LLM call.
+    "hybrid": the Librarian only sees the top heuristic candidates.
+    Librarian selections are cached per file tree; refresh_librarian forces a new call.
+
+    Prints the selection time and, when the Librarian ran, how much of its
+    choice the heuristic would have picked.
+    """
+    start = time.perf_counter()
+    heuristic = select_essential_files(repo_path)
+    heuristic_time = time.perf_counter() - start
+    if selector == "heuristic":
+        print(f"Heuristic selector picked {len(heuristic)} files in {heuristic_time * 1000:.0f} ms: {heuristic}")
+        return heuristic
+
+    start = time.perf_counter()
+    if selector == "hybrid":
+        file_tree = candidate_tree(repo_path, max_files=HYBRID_CANDIDATES)
+    else:
+        file_tree = generate_file_tree(repo_path, max_tokens=LIBRARIAN_TREE_TOKENS)
+
+    print("Consulting Librarian...")
+    essential_files = sanitize_file_paths(identify_essential_files(file_tree, repo_name, refresh=refresh_librarian), repo_name)
+    print(f"Librarian identified {len(essential_files)} essential files in {time.perf_counter() - start:.1f}s: {essential_files}")
+
+    if essential_files:
+        overlap = selection_overlap(repo_path, heuristic, essential_files)
+        print(f"Heuristic selection ({heuristic_time * 1000:.0f} ms) shares {overlap['shared']} files with the Librarian: "
+              f"recall {overlap['recall']:.0%}, jaccard {overlap['jaccard']:.0%}")
+    return essential_files
+
 def main():
     parser = argparse.ArgumentParser(description="Ingest repositories for ML4SE")
     parser.add_argument(
@@ -44,7 +95,62 @@ def main():
         action="store_true",
         help="Treat --repos-dir as a single repository instead of a directory containing multiple repositories"
     )
+    parser.add_argument(
+        "--legacy-chunker",
+        action="store_true",
+        help="Split files with the old 800-char recursive splitter instead of whole symbols"
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Embed near-duplicate chunks (copied files, repeated headers) instead of keeping one representative"
+    )
+    parser.add_argument(
+        "--small-repo-tokens",
+        type=int,
+        default=SMALL_REPO_TOKENS,
+        help=f"Repos whose files total at most this many tokens skip the vector store and are "
+             f"packed whole for the agents; 0 disables (default: {SMALL_REPO_TOKENS})"
+    )
+    parser.add_argument(
+        "--retrieval-config",
+        type=str,
+        help="JSON file with HNSW index / retriever overrides for every ingested repo, "
+             "e.g. {\"index\": {\"M\": 32}, \"search\": {\"fetch_k\": 30}} "
+             "(per-repo files in data/retrieval_config/ apply otherwise)"
+    )
+    parser.add_argument(
+        "--embedding-dims",
+        type=int,
+        help="Store only the first n embedding dimensions in the vector index (Matryoshka truncation)"
+    )
+    parser.add_argument(
+        "--rescore",
+        choices=RESCORE_PRECISIONS,
+        help="With --embedding-dims, also keep the full vectors at this precision and rescore search candidates with them"
+    )
+    parser.add_argument(
+        "--selector",
+        choices=["llm", "heuristic", "hybrid"],
+        default="llm",
+        help="How files are picked: the Librarian LLM (default), local scoring only, "
+             "or the Librarian over the top heuristic candidates"
+    )
+    parser.add_argument(
+        "--refresh-librarian",
+        action="store_true",
+        help="Call the Librarian even if a selection for the same file tree is cached"
+    )
     args = parser.parse_args()
+    chunker = "legacy" if args.legacy_chunker else "symbol"
+    retrieval_overrides = None
+    if args.retrieval_config:
+        with open(args.retrieval_config, "r") as f:
+            retrieval_overrides = json.load(f)
+    if args.embedding_dims or args.rescore:
+        retrieval_overrides = retrieval_overrides or {}
+        storage = retrieval_overrides.setdefault("storage", {})
+        storage.update({k: v for k, v in (("dimensions", args.embedding_dims), ("rescore", args.rescore)) if v})
     
     repos_dir = args.repos_dir
     if not os.path.exists(repos_dir):
@@ -56,15 +162,12 @@ def main():
         repo_path = repos_dir
         print(f"Processing single repository: {repo_name}")
         
-        file_tree = generate_file_tree(repo_path)
-        
-        print("Consulting Librarian...")
-        essential_files = identify_essential_files(file_tree)
-        print(f"Librarian identified {len(essential_files)} essential files: {essential_files}")
+        essential_files = select_files(repo_name, repo_path, args.selector, args.refresh_librarian)
         
         if essential_files:
-            essential_files = sanitize_file_paths(essential_files, repo_name)
-            ingest_repo(repo_name, essential_files, repo_path)
+            ingest_repo(repo_name, essential_files, repo_path, chunker=chunker, dedupe=not args.no_dedup,
+                        small_repo_tokens=args.small_repo_tokens, retrieval_overrides=retrieval_overrides)
+            save_symbol_index(repo_name, repo_path)
         else:
             print("No essential files identified. Skipping ingestion.")
     else:
@@ -80,15 +183,12 @@ def main():
             print(f"\nProcessing {repo_name}...")
             repo_path = os.path.join(repos_dir, repo_name)
             
-            file_tree = generate_file_tree(repo_path)
-            
-            print("Consulting Librarian...")
-            essential_files = identify_essential_files(file_tree)
-            print(f"Librarian identified {len(essential_files)} essential files: {essential_files}")
+            essential_files = select_files(repo_name, repo_path, args.selector, args.refresh_librarian)
             
             if essential_files:
-                essential_files = sanitize_file_paths(essential_files, repo_name)
-                ingest_repo(repo_name, essential_files, repo_path)
+                ingest_repo(repo_name, essential_files, repo_path, chunker=chunker, dedupe=not args.no_dedup,
+                            small_repo_tokens=args.small_repo_tokens, retrieval_overrides=retrieval_overrides)
+                save_symbol_index(repo_name, repo_path)
             else:
                 print("No essential files identified. Skipping ingestion.")
 
@@ -1,85 +1,286 @@
 import os
+import re
+from collections import Counter
 from pathlib import Path
+from typing import Dict, List, Optional
 
-def generate_file_tree(start_path: str, max_depth: int = 3) -> str:
+# Common ignore patterns
+IGNORE_DIRS = {
+    '.git', '.idea', '.vscode', '.vs',
+    '__pycache__', 'venv', 'env', '.eggs', '.pytest_cache', '.mypy_cache', '.tox',
+    'node_modules', '.next', '.nuxt',
+    'target', '.gradle',
+    'bin', 'obj', 'packages',
+    'vendor',
+    'build', 'dist', 'out', '.cache', 'coverage',
+    '.DS_Store', '__MACOSX',
+}
+IGNORE_FILES = {
+    '.DS_Store',
+    'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml',
+    'poetry.lock', 'Cargo.lock',
+    'go.sum',
+    '.gitignore', '.env',
+}
+
+IGNORE_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico',
+    '.woff', '.woff2', '.ttf', '.eot',
+    '.mp4', '.pdf', '.zip', '.gz', '.tar',
+    '.css', '.scss', '.sass', '.less',
+    '.class', '.jar', '.war', '.ear',
+    '.dll', '.exe', '.pdb', '.nupkg', '.suo',
+    '.pyc', '.pyo', '.pyd',
+    '.o', '.a', '.so', '.dylib', '.lib',
+    '.test',
+}
+
+# Files always shown in a budgeted tree: manifests, entry points and configs
+KEY_FILES = {
+    'pyproject.toml', 'setup.py', 'setup.cfg', 'requirements.txt', 'Pipfile', 'environment.yml',
+    'package.json', 'tsconfig.json', 'Cargo.toml', 'go.mod', 'pom.xml', 'build.gradle', 'build.gradle.kts',
+    'Gemfile', 'composer.json', 'CMakeLists.txt', 'Makefile', 'Dockerfile', 'docker-compose.yml',
+    'docker-compose.yaml', 'main.py', '__main__.py', 'app.py', 'cli.py', 'manage.py', 'server.py',
+    'index.js', 'index.ts', 'main.js', 'main.ts', 'app.js', 'server.js', 'cli.js',
+    'main.go', 'main.rs', 'lib.rs', 'Main.java', 'Program.cs',
+}
+KEY_FILE_PATTERNS = re.compile(r"^(requirements.*\.txt|.*\.gemspec|.*\.csproj|config\.(ya?ml|toml|json|ini|py)|settings\.py)$", re.I)
+
+def is_key_file(path: str) -> bool:
+    name = os.path.basename(path)
+    return name in KEY_FILES or bool(KEY_FILE_PATTERNS.match(name))
+
+def generate_file_tree(start_path: str, max_depth: int = 3, max_tokens: Optional[int] = None) -> str:
     """
     Generates a string representation of the file tree structure starting from start_path.
-    Respects common ignore patterns.
+    Respects common ignore patterns. Built from the repository snapshot, so
+    the directory is only walked once per process.
+
+    With max_tokens, large directories are collapsed into summaries instead
+    (see generate_budgeted_tree) and max_depth is ignored.
     """
+    from src.ingestion.utils.snapshot import get_snapshot
+
     start_path = Path(start_path)
     if not start_path.exists():
         return f"Error: Path {start_path} does not exist."
+    if max_tokens is not None:
+        return generate_budgeted_tree(str(start_path), max_tokens)
 
+    children = get_snapshot(str(start_path)).children()
     tree_str = []
-    
-    # Common ignore patterns
-    IGNORE_DIRS = {
-        '.git', '.idea', '.vscode', '.vs',
-        '__pycache__', 'venv', 'env', '.eggs', '.pytest_cache', '.mypy_cache', '.tox',
-        'node_modules', '.next', '.nuxt',
-        'target', '.gradle',
-        'bin', 'obj', 'packages',
-        'vendor',
-        'build', 'dist', 'out', '.cache', 'coverage',
-        '.DS_Store', '__MACOSX',
-    }
-    IGNORE_FILES = {
-        '.DS_Store',
-        'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml',
-        'poetry.lock', 'Cargo.lock',
-        'go.sum',
-        '.gitignore', '.env',
-    }
-
-    IGNORE_EXTENSIONS = {
-        '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico',
-        '.woff', '.woff2', '.ttf', '.eot',
-        '.mp4', '.pdf', '.zip', '.gz', '.tar',
-        '.css', '.scss', '.sass', '.less',
-        '.class', '.jar', '.war', '.ear',
-        '.dll', '.exe', '.pdb', '.nupkg', '.suo',
-        '.pyc', '.pyo', '.pyd',
-        '.o', '.a', '.so', '.dylib', '.lib',
-        '.test',
-    }
-
-    def _tree(dir_path: Path, prefix: str = "", current_depth: int = 0):
-        if current_depth > max_depth:
-            return
 
-        try:
-            items = sorted(os.listdir(dir_path), key=lambda x: (not (dir_path / x).is_dir(), x.lower()))
-        except PermissionError:
+    def _tree(rel_dir: str, prefix: str = "", current_depth: int = 0):
+        if current_depth > max_depth:
             return
 
-        filtered_items = []
-        for item in items:
-            full_path = dir_path / item
-            if (item not in IGNORE_DIRS and 
-                item not in IGNORE_FILES and 
-                not item.startswith('.') and
-                full_path.suffix.lower() not in IGNORE_EXTENSIONS):
-                filtered_items.append(item)
-
+        filtered_items = sorted(
+            (e for e in children.get(rel_dir, []) if not e["ignored"]),
+            key=lambda e: (not e["is_dir"], os.path.basename(e["path"]).lower())
+        )
         entries_count = len(filtered_items)
-        
-        for i, item in enumerate(filtered_items):
-            path = dir_path / item
+
+        for i, entry in enumerate(filtered_items):
+            item = os.path.basename(entry["path"])
             is_last = (i == entries_count - 1)
-            
+
             connector = "└── " if is_last else "├── "
-            
-            if path.is_dir():
+
+            if entry["is_dir"]:
                 tree_str.append(f"{prefix}{connector}{item}/")
                 extension = "    " if is_last else "│   "
-                _tree(path, prefix + extension, current_depth + 1)
+                _tree(entry["path"], prefix + extension, current_depth + 1)
             else:
                 tree_str.append(f"{prefix}{connector}{item}")
 
     tree_str.append(f"{start_path.name}/")
-    _tree(start_path)
+    _tree("")
     return "\n".join(tree_str)
 
+def _summarize(files: List[str]) -> str:
+    """'412 files: 380 .py, 32 .json'"""
+    counts = Counter(os.path.splitext(f)[1].lower() or os.path.basename(f) for f in files)
+    top = ", ".join(f"{n} {ext}" for ext, n in counts.most_common(3))
+    more = ", ..." if len(counts) > 3 else ""
+    return f"{len(files)} file{'s' if len(files) != 1 else ''}: {top}{more}"
+
+# Key files listed under a collapsed directory; the rest are counted
+KEY_FILES_PER_DIR = 5
+
+def generate_budgeted_tree(start_path: str, max_tokens: int = 2000) -> str:
+    """
+    Renders the file tree within a token budget. Key files (manifests, entry
+    points, configs) stay listed for as long as possible; detail is dropped
+    in this order until the tree fits:
+
+    1. The largest directories are collapsed into one-line summaries
+       (`tests/ (412 files: 380 .py, 32 .json)`), deepest first. Up to
+       KEY_FILES_PER_DIR key files inside each stay listed below it.
+    2. The root's own files other than key files become one summary line.
+    3. Collapsed directories list one key file, then none.
+    4. The root is summarized, listing up to KEY_FILES_PER_DIR key files
+       (the root's own first).
+    5. Trailing lines are cut. The result never exceeds max_tokens.
+
+    Each directory's cost, expanded and collapsed, is counted once per line
+    and updated as directories collapse, so the full tree is only rendered
+    and counted to confirm the result is within max_tokens.
+    """
+    import heapq
+    from src.ingestion.utils.snapshot import get_snapshot
+    from src.utils.tokens import count_tokens
+
+    start_path = Path(start_path)
+    children = get_snapshot(str(start_path)).children()
+
+    # Visible directories and, for each, every visible file below it
+    subdirs: Dict[str, List[str]] = {}
+    files_below: Dict[str, List[str]] = {}
+
+    def _collect(rel_dir: str) -> List[str]:
+        entries = sorted(
+            (e for e in children.get(rel_dir, []) if not e["ignored"]),
+            key=lambda e: (not e["is_dir"], os.path.basename(e["path"]).lower())
+        )
+        subdirs[rel_dir] = [e["path"] for e in entries if e["is_dir"]]
+        found = [e["path"] for e in entries if not e["is_dir"]]
+        for d in subdirs[rel_dir]:
+            found.extend(_collect(d))
+        files_below[rel_dir] = found
+        return found
+
+    _collect("")
+    root_files = [f for f in files_below[""] if "/" not in f]
+    root_key_files = [f for f in root_files if is_key_file(f)]
+    root_other_files = [f for f in root_files if not is_key_file(f)]
+    collapsed = set()
+    key_cap = KEY_FILES_PER_DIR
+    summarize_root_files = False
+
+    def _depth(path: str) -> int:
+        return path.count("/") + 1 if path else 0
+
+    def _collapsed_lines(path: str) -> tuple[str, List[str]]:
+        """Summary and key-file lines of a collapsed directory (without tree prefixes)."""
+        name = f"{start_path.name}/" if not path else f"{os.path.basename(path)}/"
+        key_files = [f for f in files_below[path] if is_key_file(f)]
+        lines = [os.path.relpath(f, path) if path else f for f in key_files[:key_cap]]
+        if len(key_files) > key_cap:
+            lines.append(f"... {len(key_files) - key_cap} more key files")
+        return f"{name} ({_summarize(files_below[path])})", lines
+
+    def _line_cost(text: str, depth: int) -> int:
+        # Prefix of a line at this depth, plus the newline joining it
+        return count_tokens("│   " * max(depth - 1, 0) + "├── " + text) + 1
+
+    # own_cost: the directory's own line and its files; collapsed_cost: summary + key files
+    own_cost: Dict[str, int] = {}
+    for path in subdirs:
+        depth = _depth(path)
+        own = count_tokens(f"{start_path.name}/") + 1 if not path else _line_cost(f"{os.path.basename(path)}/", depth)
+        own += sum(_line_cost(os.path.basename(f), depth + 1) for f in files_below[path] if os.path.dirname(f) == path)
+        own_cost[path] = own
+    # The root with its other files summarized (stage 2)
+    root_summary = f"... {_summarize(root_other_files)}" if root_other_files else ""
+    root_summarized_cost = (count_tokens(f"{start_path.name}/") + 1
+                            + sum(_line_cost(f, 1) for f in root_key_files)
+                            + (_line_cost(root_summary, 1) if root_summary else 0))
+    collapsed_cost: Dict[str, int] = {}
+    cost: Dict[str, int] = {}
+    pending: Dict[str, int] = {}
+    ready: list = []
+
+    def _reset():
+        """Fully expanded tree with the current key_cap and root mode."""
+        collapsed.clear()
+        for path in subdirs:
+            summary, key_lines = _collapsed_lines(path)
+            collapsed_cost[path] = _line_cost(summary, _depth(path)) + sum(_line_cost(line, _depth(path) + 1) for line in key_lines)
+        # Current cost of each directory's subtree, as rendered
+        for path in sorted(subdirs, key=_depth, reverse=True):
+            own = root_summarized_cost if not path and summarize_root_files else own_cost[path]
+            cost[path] = own + sum(cost[c] for c in subdirs[path])
+        # Directories whose subdirectories are all collapsed can collapse next:
+        # the biggest first, deepest on ties (never the root)
+        pending.update({d: len(subdirs[d]) for d in subdirs})
+        ready[:] = [(-(len(files_below[d]) + len(subdirs[d])), -_depth(d), d) for d in subdirs if d and not subdirs[d]]
+        heapq.heapify(ready)
+
+    def _collapse_until(budget: int):
+        while cost[""] > budget and ready:
+            target = heapq.heappop(ready)[2]
+            delta = cost[target] - collapsed_cost[target]
+            collapsed.add(target)
+            cost[target] = collapsed_cost[target]
+            parent = os.path.dirname(target)
+            # Propagate the saving up to the root
+            node = parent
+            while True:
+                cost[node] -= delta
+                if not node:
+                    break
+                node = os.path.dirname(node)
+            pending[parent] -= 1
+            if parent and pending[parent] == 0:
+                heapq.heappush(ready, (-(len(files_below[parent]) + len(subdirs[parent])), -_depth(parent), parent))
+
+    def _children_lines(items: List[tuple], prefix: str, lines: List[str]):
+        """Tree lines of (text, sub-items) pairs; sub-items are None for plain lines."""
+        for i, (text, sub) in enumerate(items):
+            is_last = (i == len(items) - 1)
+            lines.append(f"{prefix}{'└── ' if is_last else '├── '}{text}")
+            if sub:
+                _children_lines(sub, prefix + ("    " if is_last else "│   "), lines)
+
+    def _items(rel_dir: str) -> List[tuple]:
+        items = []
+        for d in subdirs[rel_dir]:
+            if d in collapsed:
+                summary, key_lines = _collapsed_lines(d)
+                items.append((summary, [(line, None) for line in key_lines]))
+            else:
+                items.append((f"{os.path.basename(d)}/", _items(d)))
+        if not rel_dir and summarize_root_files:
+            items += [(f, None) for f in root_key_files]
+            if root_summary:
+                items.append((root_summary, None))
+        else:
+            items += [(os.path.basename(f), None) for f in files_below[rel_dir] if os.path.dirname(f) == rel_dir]
+        return items
+
+    def _render() -> List[str]:
+        lines = [f"{start_path.name}/"]
+        _children_lines(_items(""), "", lines)
+        return lines
+
+    def _fits(lines: List[str]) -> bool:
+        return count_tokens("\n".join(lines)) <= max_tokens
+
+    lines: List[str] = []
+    for key_cap, summarize_root_files in ((KEY_FILES_PER_DIR, False), (KEY_FILES_PER_DIR, True), (1, True), (0, True)):
+        _reset()
+        # Per-line costs only approximate the joined text; tighten the target
+        # by the overshoot and collapse further until the real count fits
+        budget = max_tokens
+        while True:
+            _collapse_until(budget)
+            lines = _render()
+            over = count_tokens("\n".join(lines)) - max_tokens
+            if over <= 0 or not ready:
+                break
+            budget = min(budget, cost[""]) - over
+        if _fits(lines):
+            return "\n".join(lines)
+
+    # Only the root summary fits
+    key_cap = KEY_FILES_PER_DIR
+    summary, key_lines = _collapsed_lines("")
+    lines = [summary]
+    _children_lines([(line, None) for line in key_lines], "", lines)
+    while len(lines) > 1 and not _fits(lines):
+        lines.pop()
+    return "\n".join(lines)
+
 if __name__ == "__main__":
     # Test run
     print(generate_file_tree("."))
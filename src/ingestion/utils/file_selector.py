@@ -0,0 +1,186 @@
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from src.ingestion.utils.file_scanner import is_key_file
+
+# Points per file role; tests, lockfiles and data files are never selected
+ROLE_WEIGHTS = {
+    "manifest": 10,
+    "entry_point": 9,
+    "cli": 7,
+    "config": 6,
+    "source": 4,
+    "docs": 3,
+    "example": 3,
+}
+
+# At most this many files of a role, so docs/examples can't crowd out code
+ROLE_LIMITS = {"cli": 4, "config": 3, "docs": 3, "example": 2}
+
+# At most this many files from one directory
+DIR_LIMIT = 6
+
+MANIFEST_FILES = {
+    'pyproject.toml', 'setup.py', 'setup.cfg', 'requirements.txt', 'Pipfile', 'environment.yml',
+    'package.json', 'tsconfig.json', 'Cargo.toml', 'go.mod', 'pom.xml', 'build.gradle', 'build.gradle.kts',
+    'Gemfile', 'composer.json', 'CMakeLists.txt', 'Makefile',
+}
+MANIFEST_PATTERNS = re.compile(r"^(requirements.*\.txt|.*\.gemspec|.*\.csproj)$", re.I)
+
+ENTRY_POINT_FILES = {
+    'main.py', '__main__.py', 'app.py', 'manage.py', 'server.py', 'wsgi.py', 'asgi.py',
+    'index.js', 'index.ts', 'main.js', 'main.ts', 'app.js', 'app.ts', 'server.js', 'server.ts',
+    'main.go', 'main.rs', 'lib.rs', 'Main.java', 'Application.java', 'Program.cs',
+}
+
+CLI_FILES = {'cli.py', 'cli.js', 'cli.ts', 'commands.py', 'cli.rs'}
+CLI_DIRS = {'cli', 'cmd', 'commands'}
+
+CONFIG_FILES = {'Dockerfile', 'docker-compose.yml', 'docker-compose.yaml', 'settings.py', 'config.py'}
+CONFIG_PATTERNS = re.compile(r"^(config|settings|default[-_]?config)\.(ya?ml|toml|json|ini|cfg)$", re.I)
+
+DOC_EXTENSIONS = {'.md', '.rst', '.txt'}
+EXAMPLE_DIRS = {'examples', 'example', 'samples', 'sample', 'demo', 'demos'}
+TEST_DIRS = {'test', 'tests', '__tests__', 'spec', 'specs', 'testing', 'e2e'}
+TEST_PATTERNS = re.compile(r"^(test_.*|.*_test\.(py|go)|.*\.(test|spec)\.[jt]sx?|.*Tests?\.java|conftest\.py)$")
+
+# Languages counted as source code (snapshot language names)
+CODE_LANGUAGES = {
+    "Python", "JavaScript", "TypeScript", "Java", "Kotlin", "Scala", "Go", "Rust",
+    "Ruby", "PHP", "Swift", "C", "C++", "C#", "Shell",
+}
+
+def file_role(path: str, language: Optional[str] = None) -> Optional[str]:
+    """
+    Role of a repository file: manifest, entry_point, cli, config, docs,
+    example, source, test, or None for anything else (data, assets).
+    `path` is relative to the repository root.
+    """
+    name = os.path.basename(path)
+    parts = path.split("/")[:-1]
+    if any(p in TEST_DIRS for p in parts) or TEST_PATTERNS.match(name):
+        return "test"
+    if name in MANIFEST_FILES or MANIFEST_PATTERNS.match(name):
+        return "manifest"
+    if any(p in EXAMPLE_DIRS for p in parts):
+        return "example"
+    if name in ENTRY_POINT_FILES:
+        return "entry_point"
+    if name in CLI_FILES or (language in CODE_LANGUAGES and any(p in CLI_DIRS for p in parts)):
+        return "cli"
+    if name in CONFIG_FILES or CONFIG_PATTERNS.match(name):
+        return "config"
+    ext = os.path.splitext(name)[1].lower()
+    if ext in DOC_EXTENSIONS and (not parts or parts[0] in {"docs", "doc"}):
+        return "docs"
+    if language in CODE_LANGUAGES:
+        return "source"
+    return None
+
+def score_file(entry: dict) -> Tuple[Optional[str], float]:
+    """Role and score of a snapshot file entry. Deeper files score lower; tiny
+    and huge files are penalised, mid-sized source files get a small bonus."""
+    path, size = entry["path"], entry["size"]
+    role = file_role(path, entry.get("language"))
+    if role not in ROLE_WEIGHTS:
+        return role, 0.0
+
+    score = float(ROLE_WEIGHTS[role])
+    score -= 0.75 * path.count("/")
+    if size < 200:
+        score -= 3
+    elif size > 200_000:
+        score -= 4
+    elif role in ("source", "cli", "entry_point"):
+        score += min(2.0, max(0.0, math.log2(size / 1000)))
+    if os.path.basename(path) == "__init__.py" and size < 1000:
+        score -= 2
+    if is_key_file(path):
+        score += 1
+    return role, score
+
+def rank_files(repo_path: str) -> List[Tuple[str, str, float]]:
+    """(path, role, score) for every selectable file, best first. Files the
+    file tree ignores (IGNORE_DIRS/FILES/EXTENSIONS) are never candidates."""
+    from src.ingestion.utils.snapshot import get_snapshot
+
+    ranked = []
+    for entry in get_snapshot(repo_path).files():
+        role, score = score_file(entry)
+        if score > 0:
+            ranked.append((entry["path"], role, score))
+    ranked.sort(key=lambda r: (-r[2], r[0]))
+    return ranked
+
+def select_essential_files(repo_path: str, max_files: int = 20) -> List[str]:
+    """
+    Local, scoring-based stand-in for the Librarian: the top max_files files
+    by role, size and depth, with at most ROLE_LIMITS files of some roles
+    and DIR_LIMIT files per directory.
+    """
+    selected, per_role, per_dir = [], {}, {}
+    for path, role, _ in rank_files(repo_path):
+        directory = os.path.dirname(path)
+        if per_role.get(role, 0) >= ROLE_LIMITS.get(role, max_files) or per_dir.get(directory, 0) >= DIR_LIMIT:
+            continue
+        per_role[role] = per_role.get(role, 0) + 1
+        per_dir[directory] = per_dir.get(directory, 0) + 1
+        selected.append(path)
+        if len(selected) >= max_files:
+            break
+    return selected
+
+def render_paths_tree(root_name: str, paths: List[str]) -> str:
+    """Renders a list of relative file paths in the file tree format."""
+    tree: Dict[str, dict] = {}
+    for path in paths:
+        node = tree
+        for part in path.split("/"):
+            node = node.setdefault(part, {})
+
+    lines = [f"{root_name}/"]
+
+    def _tree(node: dict, prefix: str):
+        items = sorted(node.items(), key=lambda kv: (not kv[1], kv[0].lower()))
+        for i, (name, sub) in enumerate(items):
+            is_last = (i == len(items) - 1)
+            connector = "└── " if is_last else "├── "
+            lines.append(f"{prefix}{connector}{name}{'/' if sub else ''}")
+            if sub:
+                _tree(sub, prefix + ("    " if is_last else "│   "))
+
+    _tree(tree, "")
+    return "\n".join(lines)
+
+def candidate_tree(repo_path: str, max_files: int = 60) -> str:
+    """The top max_files heuristic candidates as a file tree, to pre-filter what
+    the Librarian sees."""
+    paths = [path for path, _, _ in rank_files(repo_path)[:max_files]]
+    return render_paths_tree(os.path.basename(os.path.normpath(repo_path)), paths)
+
+def selection_overlap(repo_path: str, heuristic: List[str], librarian: List[str]) -> Dict[str, float]:
+    """
+    Overlap of two selections, with directories in the Librarian's list
+    expanded to the files under them. `recall` is the share of the
+    Librarian's files the heuristic also picked.
+    """
+    from src.ingestion.utils.snapshot import get_snapshot
+
+    snapshot = get_snapshot(repo_path)
+
+    def _files(paths: List[str]) -> set:
+        files = set()
+        for path in paths:
+            path = os.path.normpath(path).replace(os.sep, "/")
+            below = [e["path"] for e in snapshot.files_under(path)]
+            files.update(below or [path])
+        return files
+
+    h, l = _files(heuristic), _files(librarian)
+    union = h | l
+    return {
+        "jaccard": len(h & l) / len(union) if union else 1.0,
+        "recall": len(h & l) / len(l) if l else 1.0,
+        "shared": len(h & l),
+    }
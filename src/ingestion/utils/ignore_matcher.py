@@ -0,0 +1,190 @@
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Set, Tuple
+from src.ingestion.utils.file_scanner import IGNORE_DIRS, IGNORE_FILES, IGNORE_EXTENSIONS
+
+# Directories whose contents are never listed: VCS data, dependencies and
+# caches. Other ignored directories (bin/, build/, .github/ ...) are still
+# walked, with everything under them flagged as ignored, since some stages
+# (static review, symbol index) look inside them.
+PRUNE_DIRS = {
+    '.git', '.hg', '.svn', '.idea', '.vscode', '.vs',
+    '__pycache__', 'venv', '.venv', 'env', '.eggs', '.pytest_cache', '.mypy_cache', '.tox',
+    'node_modules', '.next', '.nuxt', '.gradle', 'target', '.cache', '__MACOSX',
+}
+
+# Seconds allowed for `git ls-files`
+GIT_TIMEOUT = 30
+
+def is_ignored_name(name: str) -> bool:
+    """The file tree's ignore rules, applied to a single file or directory name."""
+    return (name in IGNORE_DIRS or name in IGNORE_FILES or name.startswith('.')
+            or os.path.splitext(name)[1].lower() in IGNORE_EXTENSIONS)
+
+def _glob_to_regex(glob: str) -> str:
+    """Translates one gitignore glob (without anchoring) to a regex body."""
+    out, i, n = [], 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = glob.find("]", i + 2)
+            if end < 0:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = glob[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+class GitignoreRules:
+    """
+    The patterns of one .gitignore, compiled. Paths passed to match() are
+    relative to the directory holding the file. Files without negations are
+    compiled into a single alternation per kind (any path / directories only).
+    """
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            anchored = "/" in line
+            body = _glob_to_regex(line.lstrip("/"))
+            regex = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$")
+            self.rules.append((regex, negate, dir_only))
+
+        self.combined: Optional[Tuple[Optional[re.Pattern], Optional[re.Pattern]]] = None
+        if self.rules and not any(negate for _, negate, _ in self.rules):
+            any_path = [r.pattern for r, _, d in self.rules if not d]
+            dirs = [r.pattern for r, _, d in self.rules if d]
+            self.combined = (
+                re.compile("|".join(any_path)) if any_path else None,
+                re.compile("|".join(dirs)) if dirs else None,
+            )
+
+    @classmethod
+    def from_file(cls, path: str) -> "GitignoreRules":
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return cls(f.readlines())
+        except OSError:
+            return cls([])
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True (ignored), False (re-included by a negation) or None (no rule matches)."""
+        if self.combined is not None:
+            any_path, dirs = self.combined
+            if (any_path and any_path.match(rel_path)) or (is_dir and dirs and dirs.match(rel_path)):
+                return True
+            return None
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return None
+
+def tracked_files(repo_path: str) -> Optional[Set[str]]:
+    """Files tracked by git ('/'-separated, relative), or None without a usable .git."""
+    if not os.path.exists(os.path.join(repo_path, ".git")):
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_path, "ls-files", "-z"],
+            capture_output=True, timeout=GIT_TIMEOUT, check=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Could not list tracked files in {repo_path}: {e}")
+        return None
+    return {p for p in result.stdout.decode("utf-8", errors="ignore").split("\0") if p}
+
+class IgnoreMatcher:
+    """
+    The repo's .gitignore rules and tracked-file list, for the snapshot
+    walker. A path is left out when it (or a directory above it) matches the
+    .gitignore files (nested ones take precedence over their parents) or
+    .git/info/exclude, unless git tracks it; a left-out directory is never
+    entered. The project's ignore sets only flag paths (is_ignored_name).
+    """
+
+    def __init__(self, repo_path: str, use_git: bool = True):
+        self.repo_path = repo_path
+        self.gitignores: Dict[str, GitignoreRules] = {}
+        exclude = os.path.join(repo_path, ".git", "info", "exclude")
+        self.exclude = GitignoreRules.from_file(exclude) if os.path.exists(exclude) else None
+        self.tracked = tracked_files(repo_path) if use_git else None
+        self.tracked_dirs: Set[str] = set()
+        for path in self.tracked or ():
+            parent = os.path.dirname(path)
+            while parent and parent not in self.tracked_dirs:
+                self.tracked_dirs.add(parent)
+                parent = os.path.dirname(parent)
+
+    def load_dir(self, rel_dir: str, names: List[str]):
+        """Picks up the .gitignore of a directory as the walker enters it."""
+        if ".gitignore" in names:
+            self.gitignores[rel_dir] = GitignoreRules.from_file(
+                os.path.join(self.repo_path, rel_dir, ".gitignore"))
+
+    def gitignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether the .gitignore files (or .git/info/exclude) match the path itself."""
+        parent = os.path.dirname(rel_path)
+        bases = [parent]
+        while parent:
+            parent = os.path.dirname(parent)
+            bases.append(parent)
+        # Deepest .gitignore first; the first file with a matching rule decides
+        for base in bases:
+            rules = self.gitignores.get(base)
+            if rules is None:
+                continue
+            verdict = rules.match(rel_path[len(base) + 1:] if base else rel_path, is_dir)
+            if verdict is not None:
+                return verdict
+        if self.exclude is not None:
+            return bool(self.exclude.match(rel_path, is_dir))
+        return False
+
+    def is_tracked(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether git tracks the file (or a file below the directory)."""
+        if self.tracked is None:
+            return False
+        return rel_path in self.tracked or (is_dir and rel_path in self.tracked_dirs)
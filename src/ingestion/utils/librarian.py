@@ -1,23 +1,76 @@
+import hashlib
 import json
 import os
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
+from typing import Optional
 
-def identify_essential_files(file_tree_str: str) -> list[str]:
+LIBRARIAN_MODEL = "gpt-5.1"
+
+# Latest selection per repo, with the tree/prompt fingerprint it was made for
+LIBRARIAN_CACHE_DIR = os.path.join("data", "librarian_cache")
+
+def _cache_path(repo_name: str) -> str:
+    return os.path.join(os.getcwd(), LIBRARIAN_CACHE_DIR, f"{repo_name}.json")
+
+def _load_cache(repo_name: str) -> dict:
+    path = _cache_path(repo_name)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read Librarian cache {path}: {e}")
+        return {}
+
+def _save_cache(repo_name: str, cache: dict):
+    path = _cache_path(repo_name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"Could not save Librarian cache {path}: {e}")
+
+def tree_fingerprint(file_tree_str: str, prompt_template_str: str) -> str:
+    """Hash of the rendered file tree, the prompt text (its version) and the model."""
+    digest = hashlib.sha256()
+    for part in (LIBRARIAN_MODEL, prompt_template_str, file_tree_str):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def identify_essential_files(file_tree_str: str, repo_name: Optional[str] = None, refresh: bool = False) -> list[str]:
     """
     Uses an LLM to identify essential files from a file tree string.
+
+    With repo_name, the latest selection is cached per repo under
+    data/librarian_cache/ with its tree_fingerprint: an unchanged tree
+    reuses it without an LLM call, a changed one replaces it. refresh=True
+    always calls the LLM.
     """
 
     prompt_path = os.path.join(os.path.dirname(__file__), "librarian_prompt.txt")
     with open(prompt_path, "r") as f:
         prompt_template_str = f.read()
 
+    key = None
+    if repo_name:
+        cache = _load_cache(repo_name)
+        key = tree_fingerprint(file_tree_str, prompt_template_str)
+        if not refresh and cache.get("fingerprint") == key:
+            print(f"[{repo_name}] Reusing cached Librarian selection (tree unchanged).")
+            return cache["files"]
+
+    from langchain_core.prompts import PromptTemplate
+
     prompt = PromptTemplate(
         template=prompt_template_str,
         input_variables=["file_tree"]
     )
 
-    llm = ChatOpenAI(temperature=0.7, model_name="gpt-5.1")
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(temperature=0.7, model_name=LIBRARIAN_MODEL)
 
     chain = prompt | llm
 
@@ -31,6 +84,8 @@ def identify_essential_files(file_tree_str: str) -> list[str]:
             content = content.replace("```", "")
             
         file_list = json.loads(content)
+        if key and file_list:
+            _save_cache(repo_name, {"fingerprint": key, "files": file_list})
         return file_list
     except Exception as e:
         print(f"Error acting as Librarian: {e}")
@@ -0,0 +1,399 @@
+import os
+import re
+import ast
+import json
+import configparser
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+MAX_DEPENDENCIES = 5
+
+# Distinctive phrases of common license texts -> SPDX identifier. Checked in
+# order, so the more specific variants come first.
+LICENSE_SIGNATURES = [
+    ("GNU AFFERO GENERAL PUBLIC LICENSE", "AGPL-3.0"),
+    ("GNU LESSER GENERAL PUBLIC LICENSE", "LGPL-3.0"),
+    (r"GNU GENERAL PUBLIC LICENSE\s+Version 2", "GPL-2.0"),
+    ("GNU GENERAL PUBLIC LICENSE", "GPL-3.0"),
+    ("Apache License", "Apache-2.0"),
+    ("Mozilla Public License", "MPL-2.0"),
+    ("Permission is hereby granted, free of charge", "MIT"),
+    ("Redistribution and use in source and binary forms.*?Neither the name", "BSD-3-Clause"),
+    ("Redistribution and use in source and binary forms", "BSD-2-Clause"),
+    ("This is free and unencumbered software released into the public domain", "Unlicense"),
+    ("Permission to use, copy, modify, and/or distribute this software for any", "ISC"),
+    ("Boost Software License", "BSL-1.0"),
+    ("Eclipse Public License", "EPL-2.0"),
+    ("CC0 1.0 Universal", "CC0-1.0"),
+]
+
+LICENSE_FILES = ["LICENSE", "LICENSE.md", "LICENSE.txt", "LICENCE", "LICENCE.md", "COPYING", "COPYING.md"]
+
+# Root files and docs/ files searched for install commands of the published
+# package (`pip install <name>`); they are only used when documented there
+INSTALL_DOC_PATTERN = re.compile(r"^(README|INSTALL|GETTING[_-]?STARTED|QUICKSTART)", re.I)
+INSTALL_DOC_EXTENSIONS = ("", ".md", ".rst", ".txt")
+
+# Fields derived from the manifests rather than read from them; the profiler
+# gets them as hints instead of exact values
+HINT_FIELDS = ("install_methods",)
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _requirement_name(spec: str) -> str:
+    """'fastapi[all]>=0.100; python_version>"3.8"' -> 'fastapi'"""
+    return re.split(r"[\s\[<>=!~;@(]", spec.strip(), maxsplit=1)[0]
+
+def _dedupe(items: List[str]) -> List[str]:
+    seen, out = set(), []
+    for item in items:
+        if item and item not in seen:
+            seen.add(item)
+            out.append(item)
+    return out
+
+def _first_url(urls: Dict[str, str]) -> Optional[str]:
+    for key in ("Homepage", "homepage", "Documentation", "documentation", "Docs", "Source", "Repository", "repository"):
+        if urls.get(key):
+            return urls[key]
+    return next(iter(urls.values()), None) if urls else None
+
+# --- Python ------------------------------------------------------------------
+
+def _parse_pyproject(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "pyproject.toml"))
+    if text is None or tomllib is None:
+        return {}
+    try:
+        data = tomllib.loads(text)
+    except Exception as e:
+        print(f"Could not parse pyproject.toml: {e}")
+        return {}
+
+    facts: Dict[str, Any] = {}
+    project = data.get("project", {})
+    poetry = data.get("tool", {}).get("poetry", {})
+    meta = project or poetry
+    if not meta:
+        return {}
+
+    facts["description"] = meta.get("description")
+    license_value = meta.get("license")
+    if isinstance(license_value, dict):
+        license_value = license_value.get("text")
+    if isinstance(license_value, str) and len(license_value) < 40:
+        facts["license_name"] = license_value
+    facts["homepage_url"] = meta.get("homepage") or _first_url(meta.get("urls", {}))
+
+    if project:
+        deps = [_requirement_name(d) for d in project.get("dependencies", [])]
+    else:
+        deps = [d for d in poetry.get("dependencies", {}) if d.lower() != "python"]
+    facts["dependencies"] = deps
+
+    facts["install_methods"] = ["pip install ."]
+    name = meta.get("name")
+    if name:
+        facts["published_installs"] = [f"pip install {name}"]
+    scripts = {**project.get("scripts", {}), **poetry.get("scripts", {})}
+    facts["commands"] = list(scripts)
+    return facts
+
+def _parse_setup_cfg(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "setup.cfg"))
+    if text is None:
+        return {}
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read_string(text)
+    except configparser.Error as e:
+        print(f"Could not parse setup.cfg: {e}")
+        return {}
+    if not parser.has_section("metadata"):
+        return {}
+
+    meta = parser["metadata"]
+    facts: Dict[str, Any] = {
+        "description": meta.get("description"),
+        "license_name": meta.get("license"),
+        "homepage_url": meta.get("url"),
+        "install_methods": ["pip install ."],
+    }
+    if meta.get("name"):
+        facts["published_installs"] = [f"pip install {meta.get('name')}"]
+    if parser.has_option("options", "install_requires"):
+        lines = parser.get("options", "install_requires").splitlines()
+        facts["dependencies"] = [_requirement_name(l) for l in lines if l.strip()]
+    if parser.has_option("options.entry_points", "console_scripts"):
+        lines = parser.get("options.entry_points", "console_scripts").splitlines()
+        facts["commands"] = [l.split("=")[0].strip() for l in lines if "=" in l]
+    return facts
+
+def _parse_setup_py(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "setup.py"))
+    if text is None:
+        return {}
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return {}
+
+    kwargs: Dict[str, Any] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, "id", getattr(node.func, "attr", None)) == "setup":
+            for kw in node.keywords:
+                try:
+                    kwargs[kw.arg] = ast.literal_eval(kw.value)
+                except (ValueError, TypeError, SyntaxError):
+                    # Computed values (e.g. read from a file) are left to the LLM
+                    pass
+            break
+
+    facts: Dict[str, Any] = {
+        "description": kwargs.get("description"),
+        "license_name": kwargs.get("license"),
+        "homepage_url": kwargs.get("url"),
+        "install_methods": ["pip install ."],
+    }
+    if isinstance(kwargs.get("name"), str):
+        facts["published_installs"] = [f"pip install {kwargs['name']}"]
+    if isinstance(kwargs.get("install_requires"), (list, tuple)):
+        facts["dependencies"] = [_requirement_name(d) for d in kwargs["install_requires"]]
+    entry_points = kwargs.get("entry_points")
+    if isinstance(entry_points, dict):
+        scripts = entry_points.get("console_scripts", [])
+        if isinstance(scripts, str):
+            scripts = scripts.splitlines()
+        facts["commands"] = [s.split("=")[0].strip() for s in scripts if "=" in s]
+    return facts
+
+def _parse_requirements(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "requirements.txt"))
+    if text is None:
+        return {}
+    deps = [_requirement_name(l) for l in text.splitlines() if l.strip() and not l.strip().startswith(("#", "-"))]
+    return {"dependencies": deps, "install_methods": ["pip install -r requirements.txt"]}
+
+# --- JavaScript ----------------------------------------------------------------
+
+def _parse_package_json(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "package.json"))
+    if text is None:
+        return {}
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        print(f"Could not parse package.json: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    license_value = data.get("license")
+    if isinstance(license_value, dict):
+        license_value = license_value.get("type")
+
+    facts: Dict[str, Any] = {
+        "description": data.get("description"),
+        "license_name": license_value,
+        "homepage_url": data.get("homepage"),
+        "dependencies": list(data.get("dependencies", {})),
+        "install_methods": ["npm install"],
+    }
+    name = data.get("name")
+    if name and not data.get("private"):
+        facts["published_installs"] = [f"npm install {'-g ' if data.get('bin') else ''}{name}"]
+
+    bin_field = data.get("bin")
+    if isinstance(bin_field, dict):
+        facts["commands"] = list(bin_field)
+    elif isinstance(bin_field, str) and name:
+        facts["commands"] = [name.split("/")[-1]]
+    else:
+        scripts = data.get("scripts", {})
+        facts["commands"] = [f"npm {'start' if s == 'start' else 'run ' + s}" for s in ("start", "dev", "build") if s in scripts]
+    return facts
+
+# --- Rust / Go / Java ----------------------------------------------------------
+
+def _parse_cargo(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "Cargo.toml"))
+    if text is None or tomllib is None:
+        return {}
+    try:
+        data = tomllib.loads(text)
+    except Exception as e:
+        print(f"Could not parse Cargo.toml: {e}")
+        return {}
+
+    package = data.get("package", {})
+    if not package:
+        return {}
+    name = package.get("name")
+    bins = [b.get("name") for b in data.get("bin", []) if b.get("name")]
+    is_binary = bool(bins) or os.path.exists(os.path.join(repo_path, "src", "main.rs"))
+
+    facts: Dict[str, Any] = {
+        "description": package.get("description"),
+        "license_name": package.get("license"),
+        "homepage_url": package.get("homepage") or package.get("documentation") or package.get("repository"),
+        "dependencies": list(data.get("dependencies", {})),
+    }
+    if is_binary:
+        facts["install_methods"] = ["cargo install --path ."]
+    if name:
+        facts["published_installs"] = [f"cargo install {name}" if is_binary else f"cargo add {name}"]
+        if is_binary:
+            facts["commands"] = bins or [name]
+    return facts
+
+def _parse_go_mod(repo_path: str) -> Dict[str, Any]:
+    text = _read(os.path.join(repo_path, "go.mod"))
+    if text is None:
+        return {}
+    module = re.search(r"^module\s+(\S+)", text, re.M)
+    if not module:
+        return {}
+    module = module.group(1)
+
+    deps = []
+    for block in re.findall(r"^require\s*\((.*?)^\)", text, re.M | re.S):
+        deps.extend(line.split()[0] for line in block.splitlines() if line.strip() and "// indirect" not in line)
+    deps.extend(re.findall(r"^require\s+([^\s(]+)\s+\S+\s*$", text, re.M))
+
+    facts: Dict[str, Any] = {"dependencies": [d.split("/")[-1] for d in deps]}
+    if os.path.exists(os.path.join(repo_path, "main.go")):
+        facts["install_methods"] = ["go install ."]
+        facts["published_installs"] = [f"go install {module}@latest"]
+        facts["commands"] = [module.split("/")[-1]]
+    else:
+        facts["published_installs"] = [f"go get {module}"]
+    if module.startswith(("github.com/", "gitlab.com/")):
+        facts["homepage_url"] = f"https://{module}"
+    return facts
+
+def _parse_pom(repo_path: str) -> Dict[str, Any]:
+    path = os.path.join(repo_path, "pom.xml")
+    if not os.path.exists(path):
+        return {}
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError as e:
+        print(f"Could not parse pom.xml: {e}")
+        return {}
+
+    ns = {"m": root.tag[1:].split("}")[0]} if root.tag.startswith("{") else {}
+    prefix = "m:" if ns else ""
+
+    def text_of(element, path):
+        found = element.find("/".join(prefix + part for part in path.split("/")), ns)
+        return found.text.strip() if found is not None and found.text else None
+
+    deps = [
+        text_of(dep, "artifactId")
+        for dep in root.findall(f"{prefix}dependencies/{prefix}dependency", ns)
+        if text_of(dep, "scope") not in ("test", "provided")
+    ]
+    return {
+        "description": text_of(root, "description"),
+        "license_name": text_of(root, "licenses/license/name"),
+        "homepage_url": text_of(root, "url"),
+        "dependencies": [d for d in deps if d],
+        "install_methods": ["mvn install"],
+    }
+
+# --- License -------------------------------------------------------------------
+
+def detect_license(repo_path: str) -> Optional[str]:
+    """SPDX identifier of the repository's LICENSE file, if recognised."""
+    for fname in LICENSE_FILES:
+        text = _read(os.path.join(repo_path, fname))
+        if text is None:
+            continue
+        head = text[:4000]
+        for pattern, spdx in LICENSE_SIGNATURES:
+            if re.search(pattern, head, re.I | re.S):
+                return spdx
+    return None
+
+def _install_docs_text(repo_path: str) -> str:
+    """README / INSTALL text of the repository root and docs/, whitespace-normalised."""
+    texts = []
+    for directory in (repo_path, os.path.join(repo_path, "docs")):
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for fname in names:
+            if INSTALL_DOC_PATTERN.match(fname) and os.path.splitext(fname)[1].lower() in INSTALL_DOC_EXTENSIONS:
+                texts.append(_read(os.path.join(directory, fname)) or "")
+    return re.sub(r"\s+", " ", "\n".join(texts))
+
+# Manifests in priority order: earlier ones win for scalar fields
+MANIFEST_PARSERS = [
+    ("package.json", _parse_package_json),
+    ("pyproject.toml", _parse_pyproject),
+    ("setup.cfg", _parse_setup_cfg),
+    ("setup.py", _parse_setup_py),
+    ("Cargo.toml", _parse_cargo),
+    ("go.mod", _parse_go_mod),
+    ("pom.xml", _parse_pom),
+    ("requirements.txt", _parse_requirements),
+]
+
+def extract_manifest_facts(repo_path: str) -> Dict[str, Any]:
+    """
+    Parses the repository's root manifests and LICENSE file into RepoProfile
+    fields. Only fields that were actually found are returned, so callers can
+    tell which ones are still open.
+
+    install_methods holds local forms (`pip install .`, `npm install`) plus
+    registry installs of the package (`pip install <name>`) only when the
+    repository's README or install docs already use them; see HINT_FIELDS.
+    """
+    facts: Dict[str, Any] = {}
+    sources: List[str] = []
+    published: List[str] = []
+    for fname, parser in MANIFEST_PARSERS:
+        if not os.path.exists(os.path.join(repo_path, fname)):
+            continue
+        parsed = parser(repo_path)
+        if parsed:
+            sources.append(fname)
+        published.extend(parsed.pop("published_installs", []))
+        for key, value in parsed.items():
+            if value in (None, "", []) or key in facts:
+                continue
+            facts[key] = value
+
+    # The LICENSE text is more reliable than free-form manifest strings
+    license_name = detect_license(repo_path)
+    if license_name:
+        facts["license_name"] = license_name
+        sources.append("LICENSE")
+
+    docs = _install_docs_text(repo_path) if published else ""
+    documented = [command for command in published if command in docs]
+    if documented:
+        facts["install_methods"] = documented + facts.get("install_methods", [])
+
+    if "dependencies" in facts:
+        facts["dependencies"] = _dedupe(facts["dependencies"])[:MAX_DEPENDENCIES]
+    for key in ("install_methods", "commands"):
+        if key in facts:
+            facts[key] = _dedupe(facts[key])
+    if facts:
+        print(f"Manifest facts from {', '.join(sources)}: {', '.join(sorted(facts))}")
+    return facts
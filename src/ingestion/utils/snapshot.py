@@ -0,0 +1,171 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+from src.ingestion.utils.ignore_matcher import PRUNE_DIRS, IgnoreMatcher, is_ignored_name
+
+LANGUAGES = {
+    ".py": "Python", ".ipynb": "Python",
+    ".js": "JavaScript", ".jsx": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript",
+    ".java": "Java", ".kt": "Kotlin", ".kts": "Kotlin", ".scala": "Scala",
+    ".go": "Go", ".rs": "Rust", ".rb": "Ruby", ".php": "PHP", ".swift": "Swift",
+    ".c": "C", ".h": "C", ".cpp": "C++", ".hpp": "C++", ".cc": "C++", ".cs": "C#",
+    ".sh": "Shell", ".bash": "Shell", ".ps1": "PowerShell", ".bat": "Batch",
+    ".md": "Markdown", ".rst": "reStructuredText", ".txt": "Text",
+    ".json": "JSON", ".yaml": "YAML", ".yml": "YAML", ".toml": "TOML", ".xml": "XML",
+    ".ini": "INI", ".cfg": "INI", ".html": "HTML", ".css": "CSS", ".sql": "SQL",
+}
+
+# Persisted snapshots, one per repository keyed by its absolute path
+# (git-ignored)
+SNAPSHOT_DIR = os.path.join("data", "snapshots")
+
+# Snapshots already built in this process, by absolute repo path
+_SNAPSHOTS: Dict[str, "RepoSnapshot"] = {}
+
+def _hash_file(path: str) -> Optional[str]:
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+class RepoSnapshot:
+    """
+    One-pass listing of a repository: path, size, mtime, content hash,
+    language and ignored flag for every file and directory (paths relative to
+    the repo, '/'-separated). Persisted per repo and refreshed by mtime, so
+    unchanged files are never re-hashed. Content hashes are only computed
+    when asked for (`hashed`); otherwise "hash" is None for changed files.
+    """
+
+    def __init__(self, repo_path: str, entries: List[Dict[str, Any]], hashed: bool = False):
+        self.repo_path = repo_path
+        self.entries = entries
+        self.hashed = hashed
+        self.by_path = {e["path"]: e for e in entries}
+
+    def files(self, include_ignored: bool = False) -> List[Dict[str, Any]]:
+        return [e for e in self.entries if not e["is_dir"] and (include_ignored or not e["ignored"])]
+
+    def files_under(self, rel_path: str, include_ignored: bool = False) -> List[Dict[str, Any]]:
+        """Files at or below rel_path ('' for the whole repo)."""
+        rel_path = rel_path.strip("/").replace(os.sep, "/")
+        if rel_path in ("", "."):
+            return self.files(include_ignored)
+        prefix = rel_path + "/"
+        return [e for e in self.files(include_ignored) if e["path"] == rel_path or e["path"].startswith(prefix)]
+
+    def children(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Entries grouped by parent directory ('' for the root)."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in self.entries:
+            grouped.setdefault(os.path.dirname(entry["path"]), []).append(entry)
+        return grouped
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"repo_path": self.repo_path, "hashed": self.hashed, "entries": self.entries}
+
+def scan_repo(repo_path: str, previous: Optional[RepoSnapshot] = None,
+              matcher: Optional[IgnoreMatcher] = None, hashes: bool = False) -> RepoSnapshot:
+    """
+    Walks the repository once with os.scandir. Paths excluded by the repo's
+    .gitignore files and not tracked by git are left out, and such
+    directories (like PRUNE_DIRS) are never entered (see IgnoreMatcher). Content
+    hashes of files whose size and mtime match the previous snapshot are reused;
+    other files are only hashed (sha1) with hashes=True.
+    """
+    old = previous.by_path if previous else {}
+    matcher = matcher or IgnoreMatcher(repo_path)
+    entries: List[Dict[str, Any]] = []
+    stack = [("", False, False)]
+    while stack:
+        rel_dir, dir_ignored, dir_gitignored = stack.pop()
+        try:
+            with os.scandir(os.path.join(repo_path, rel_dir)) as it:
+                items = list(it)
+        except OSError:
+            continue
+        matcher.load_dir(rel_dir, [item.name for item in items])
+        for item in items:
+            rel = f"{rel_dir}/{item.name}" if rel_dir else item.name
+            try:
+                is_dir = item.is_dir(follow_symlinks=False)
+                gitignored = dir_gitignored or matcher.gitignored(rel, is_dir)
+                if gitignored and not matcher.is_tracked(rel, is_dir):
+                    continue
+                stat = item.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            ignored = dir_ignored or is_ignored_name(item.name)
+            entry = {
+                "path": rel,
+                "is_dir": is_dir,
+                "size": 0 if is_dir else stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": None,
+                "language": None if is_dir else LANGUAGES.get(os.path.splitext(item.name)[1].lower()),
+                "ignored": ignored,
+            }
+            if is_dir:
+                if item.name not in PRUNE_DIRS:
+                    stack.append((rel, ignored, gitignored))
+            elif not ignored and not item.is_symlink():
+                prev = old.get(rel)
+                if prev and prev["size"] == entry["size"] and prev["mtime"] == entry["mtime"] and prev["hash"]:
+                    entry["hash"] = prev["hash"]
+                elif hashes:
+                    entry["hash"] = _hash_file(item.path)
+            entries.append(entry)
+    entries.sort(key=lambda e: e["path"])
+    return RepoSnapshot(repo_path, entries, hashed=hashes)
+
+def _snapshot_path(repo_path: str) -> str:
+    """<repo name>-<hash of the absolute path>.json, so same-named repos don't collide."""
+    abs_path = os.path.abspath(repo_path)
+    key = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.getcwd(), SNAPSHOT_DIR, f"{os.path.basename(abs_path)}-{key}.json")
+
+def load_snapshot(repo_path: str) -> Optional[RepoSnapshot]:
+    path = _snapshot_path(repo_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return RepoSnapshot(repo_path, data["entries"], hashed=data.get("hashed", False))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read snapshot {path}: {e}")
+        return None
+
+def save_snapshot(snapshot: RepoSnapshot):
+    path = _snapshot_path(snapshot.repo_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(snapshot.to_dict(), f)
+
+def get_snapshot(repo_path: str, refresh: bool = False, hashes: bool = False) -> RepoSnapshot:
+    """
+    Returns the repository snapshot. Within a process it is built once; across
+    runs the persisted snapshot is refreshed (stat only, hashes of unchanged
+    files are reused) and saved again if anything changed. With hashes=True
+    every file has its content hash (files added or changed since are hashed).
+    """
+    key = os.path.abspath(repo_path)
+    cached = _SNAPSHOTS.get(key)
+    if cached is not None and not refresh and (cached.hashed or not hashes):
+        return cached
+
+    previous = cached or load_snapshot(repo_path)
+    snapshot = scan_repo(repo_path, previous, hashes=hashes or bool(previous and previous.hashed))
+    if previous is None or previous.entries != snapshot.entries or snapshot.hashed != previous.hashed:
+        try:
+            save_snapshot(snapshot)
+        except OSError as e:
+            print(f"Could not save snapshot for {repo_path}: {e}")
+    _SNAPSHOTS[key] = snapshot
+    return snapshot
@@ -0,0 +1,329 @@
+import os
+import re
+import ast
+import json
+from typing import Any, Dict, List, Optional
+from src.ingestion.utils.file_scanner import IGNORE_DIRS
+from src.ingestion.utils.snapshot import get_snapshot
+
+# Source files larger than this are almost always generated/minified
+MAX_FILE_BYTES = 512 * 1024
+
+SYMBOL_INDEX_FILE = "symbol_index.json"
+
+SYMBOL_KINDS = ["functions", "classes", "cli_options", "env_vars", "entry_points"]
+
+_TEST_DIRS = {"test", "tests", "__tests__", "spec", "testing"}
+
+# CLIs commonly live in bin/ (node) and packages/ (monorepos), which the file
+# tree hides
+_PRUNE_DIRS = IGNORE_DIRS - {"bin", "packages"}
+
+_FLAG_ACTIONS = {"store_true", "store_false", "store_const", "count", "help", "version"}
+
+def _empty_index() -> Dict[str, List[Dict[str, Any]]]:
+    return {kind: [] for kind in SYMBOL_KINDS}
+
+def _line_of(text: str, offset: int) -> int:
+    return text.count("\n", 0, offset) + 1
+
+# --- Python (ast) ----------------------------------------------------------------
+
+def _const_str(node) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+def _call_name(node: ast.Call) -> str:
+    """'os.environ.get' for os.environ.get(...), 'getenv' for getenv(...)."""
+    parts = []
+    func = node.func
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    return ".".join(reversed(parts))
+
+def _keyword(node: ast.Call, name: str) -> Any:
+    for kw in node.keywords:
+        if kw.arg == name:
+            try:
+                return ast.literal_eval(kw.value)
+            except (ValueError, TypeError, SyntaxError):
+                return None
+    return None
+
+def _index_python(path: str, text: str, index: Dict[str, List[Dict[str, Any]]]):
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            args = [a.arg for a in node.args.args if a.arg not in ("self", "cls")]
+            index["functions"].append({
+                "name": node.name, "file": path, "line": node.lineno,
+                "signature": f"{node.name}({', '.join(args)})",
+                "doc": (ast.get_docstring(node) or "").split("\n")[0],
+            })
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+            index["classes"].append({
+                "name": node.name, "file": path, "line": node.lineno,
+                "doc": (ast.get_docstring(node) or "").split("\n")[0],
+            })
+        elif isinstance(node, ast.If) and isinstance(node.test, ast.Compare):
+            # if __name__ == "__main__":
+            test = node.test
+            if (isinstance(test.left, ast.Name) and test.left.id == "__name__"
+                    and any(_const_str(c) == "__main__" for c in test.comparators)):
+                index["entry_points"].append({"name": path, "file": path, "line": node.lineno, "kind": "python_main"})
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript):
+            # os.environ["KEY"]
+            target = node.value
+            if isinstance(target, ast.Attribute) and target.attr == "environ":
+                key = _const_str(node.slice)
+                if key:
+                    index["env_vars"].append({"name": key, "file": path, "line": node.lineno})
+            continue
+        if not isinstance(node, ast.Call):
+            continue
+
+        name = _call_name(node)
+        first = _const_str(node.args[0]) if node.args else None
+        if name.endswith(("getenv", "environ.get")) and first:
+            default = node.args[1] if len(node.args) > 1 else None
+            entry = {"name": first, "file": path, "line": node.lineno}
+            if isinstance(default, ast.Constant) and default.value is not None:
+                entry["default"] = str(default.value)
+            index["env_vars"].append(entry)
+        elif name.endswith("add_argument") and first:
+            # argparse: flags, or a positional name
+            flags = [f for f in (_const_str(a) for a in node.args) if f]
+            index["cli_options"].append({
+                "name": max(flags, key=len), "flags": flags, "file": path, "line": node.lineno,
+                "help": _keyword(node, "help") or "", "framework": "argparse",
+                "takes_value": _keyword(node, "action") not in _FLAG_ACTIONS,
+            })
+        elif name.endswith(("click.option", "click.argument")) or name in ("option", "argument"):
+            flags = [f for f in (_const_str(a) for a in node.args) if f]
+            if flags:
+                index["cli_options"].append({
+                    "name": max(flags, key=len), "flags": flags, "file": path, "line": node.lineno,
+                    "help": _keyword(node, "help") or "", "framework": "click",
+                    "takes_value": not _keyword(node, "is_flag"),
+                })
+
+# --- Other languages (regex) --------------------------------------------------------
+
+_JS_FUNCTION = re.compile(r"^\s*(?:export\s+(?:default\s+)?)?(?:async\s+)?function\s*\*?\s*(\w+)\s*\(([^)]*)\)", re.M)
+_JS_ARROW = re.compile(r"^\s*export\s+const\s+(\w+)\s*=\s*(?:async\s*)?\(([^)]*)\)\s*=>", re.M)
+_JS_CLASS = re.compile(r"^\s*(?:export\s+(?:default\s+)?)?class\s+(\w+)", re.M)
+_JS_OPTION = re.compile(r"\.(?:option|requiredOption)\(\s*['\"`]([^'\"`]+)['\"`](?:\s*,\s*['\"`]([^'\"`]*)['\"`])?")
+_JS_ENV = re.compile(r"process\.env\.([A-Z_][A-Z0-9_]*)|process\.env\[\s*['\"]([A-Z_][A-Z0-9_]*)['\"]\s*\]|import\.meta\.env\.([A-Z_][A-Z0-9_]*)")
+
+_GO_FUNCTION = re.compile(r"^func\s+(?:\([^)]*\)\s*)?([A-Z]\w*)\s*\(([^)]*)\)", re.M)
+_GO_TYPE = re.compile(r"^type\s+([A-Z]\w*)\s+(?:struct|interface)", re.M)
+_GO_FLAG = re.compile(r"flag\.(?:String|Int|Bool|Duration|Float64|Int64|Uint)(?:Var)?\((?:[^,]+,\s*)?\"([\w-]+)\"\s*,\s*[^,]+,\s*\"([^\"]*)\"")
+_GO_ENV = re.compile(r"os\.(?:Getenv|LookupEnv)\(\s*\"([^\"]+)\"")
+_GO_MAIN = re.compile(r"^func\s+main\s*\(\s*\)", re.M)
+
+_RUST_FUNCTION = re.compile(r"^\s*pub\s+(?:async\s+)?fn\s+(\w+)\s*(?:<[^>]*>)?\s*\(([^)]*)\)", re.M)
+_RUST_TYPE = re.compile(r"^\s*pub\s+(?:struct|enum|trait)\s+(\w+)", re.M)
+_RUST_ARG = re.compile(r"#\[(?:arg|clap)\(([^\]]*long[^\]]*)\)\]\s*(?:///[^\n]*\n\s*)*(?:pub\s+)?(\w+)\s*:")
+_RUST_ENV = re.compile(r"env::var(?:_os)?\(\s*\"([^\"]+)\"|env!\(\s*\"([^\"]+)\"")
+_RUST_MAIN = re.compile(r"^\s*(?:async\s+)?fn\s+main\s*\(\s*\)", re.M)
+
+_JAVA_CLASS = re.compile(r"^\s*public\s+(?:final\s+|abstract\s+)*(?:class|interface|enum|record)\s+(\w+)", re.M)
+_JAVA_METHOD = re.compile(r"^\s*public\s+(?:static\s+)?(?:final\s+)?[\w<>\[\], ]+\s+(\w+)\s*\(([^)]*)\)\s*(?:throws [\w, ]+)?\s*\{", re.M)
+_JAVA_ENV = re.compile(r"System\.getenv\(\s*\"([^\"]+)\"")
+_JAVA_MAIN = re.compile(r"public\s+static\s+void\s+main\s*\(")
+
+def _add_matches(pattern, text, path, index, kind, build):
+    for match in pattern.finditer(text):
+        entry = build(match)
+        if entry:
+            entry.update({"file": path, "line": _line_of(text, match.start())})
+            index[kind].append(entry)
+
+def _signature(name: str, params: str) -> Dict[str, Any]:
+    return {"name": name, "signature": f"{name}({' '.join(params.split())})"}
+
+def _first_group(match) -> Dict[str, Any]:
+    return {"name": next(g for g in match.groups() if g)}
+
+def _index_js(path: str, text: str, index: Dict[str, List[Dict[str, Any]]]):
+    _add_matches(_JS_FUNCTION, text, path, index, "functions", lambda m: _signature(m.group(1), m.group(2)))
+    _add_matches(_JS_ARROW, text, path, index, "functions", lambda m: _signature(m.group(1), m.group(2)))
+    _add_matches(_JS_CLASS, text, path, index, "classes", lambda m: {"name": m.group(1)})
+    _add_matches(_JS_OPTION, text, path, index, "cli_options", lambda m: {
+        "name": m.group(1).split(",")[-1].strip().split(" ")[0],
+        "flags": [f.strip() for f in m.group(1).split(",")],
+        "help": m.group(2) or "", "framework": "commander",
+        "takes_value": "<" in m.group(1) or "[" in m.group(1),
+    })
+    _add_matches(_JS_ENV, text, path, index, "env_vars", _first_group)
+    if text.startswith("#!") and "node" in text.split("\n", 1)[0]:
+        index["entry_points"].append({"name": path, "file": path, "line": 1, "kind": "node_bin"})
+
+def _index_go(path: str, text: str, index: Dict[str, List[Dict[str, Any]]]):
+    _add_matches(_GO_FUNCTION, text, path, index, "functions", lambda m: _signature(m.group(1), m.group(2)))
+    _add_matches(_GO_TYPE, text, path, index, "classes", lambda m: {"name": m.group(1)})
+    _add_matches(_GO_FLAG, text, path, index, "cli_options", lambda m: {
+        "name": f"-{m.group(1)}", "flags": [f"-{m.group(1)}"], "help": m.group(2), "framework": "flag",
+        "takes_value": not m.group(0).startswith("flag.Bool"),
+    })
+    _add_matches(_GO_ENV, text, path, index, "env_vars", _first_group)
+    _add_matches(_GO_MAIN, text, path, index, "entry_points", lambda m: {"name": path, "kind": "go_main"})
+
+def _index_rust(path: str, text: str, index: Dict[str, List[Dict[str, Any]]]):
+    _add_matches(_RUST_FUNCTION, text, path, index, "functions", lambda m: _signature(m.group(1), m.group(2)))
+    _add_matches(_RUST_TYPE, text, path, index, "classes", lambda m: {"name": m.group(1)})
+    _add_matches(_RUST_ARG, text, path, index, "cli_options", lambda m: {
+        "name": "--" + m.group(2).replace("_", "-"), "flags": ["--" + m.group(2).replace("_", "-")],
+        "help": "", "framework": "clap", "takes_value": True,
+    })
+    _add_matches(_RUST_ENV, text, path, index, "env_vars", _first_group)
+    _add_matches(_RUST_MAIN, text, path, index, "entry_points", lambda m: {"name": path, "kind": "rust_main"})
+
+def _index_java(path: str, text: str, index: Dict[str, List[Dict[str, Any]]]):
+    _add_matches(_JAVA_CLASS, text, path, index, "classes", lambda m: {"name": m.group(1)})
+    _add_matches(_JAVA_METHOD, text, path, index, "functions", lambda m: _signature(m.group(1), m.group(2)))
+    _add_matches(_JAVA_ENV, text, path, index, "env_vars", _first_group)
+    _add_matches(_JAVA_MAIN, text, path, index, "entry_points", lambda m: {"name": path, "kind": "java_main"})
+
+INDEXERS = {
+    ".py": _index_python,
+    ".js": _index_js, ".mjs": _index_js, ".cjs": _index_js,
+    ".jsx": _index_js, ".ts": _index_js, ".tsx": _index_js,
+    ".go": _index_go,
+    ".rs": _index_rust,
+    ".java": _index_java, ".kt": _index_java,
+}
+
+def build_symbol_index(repo_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Walks the repository once and records public functions/classes, CLI
+    options, environment variables and entry points, each with file and line.
+    Test directories are skipped: their symbols aren't part of the public
+    surface a README documents.
+    """
+    index = _empty_index()
+    for entry in get_snapshot(repo_path).files(include_ignored=True):
+        path = entry["path"]
+        *dirs, fname = path.split("/")
+        if any(d in _PRUNE_DIRS or d in _TEST_DIRS or d.startswith(".") for d in dirs):
+            continue
+        indexer = INDEXERS.get(os.path.splitext(fname)[1].lower())
+        if indexer is None or fname == "setup.py" or fname.startswith("test_") or ".test." in fname or ".spec." in fname:
+            continue
+        if entry["size"] > MAX_FILE_BYTES:
+            continue
+        try:
+            with open(os.path.join(repo_path, path), "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        except OSError:
+            continue
+        indexer(path, text, index)
+    return index
+
+# --- Persistence ----------------------------------------------------------------------
+
+def _index_path(repo_name: str) -> str:
+    return os.path.join(os.getcwd(), "knowledge_base", repo_name, SYMBOL_INDEX_FILE)
+
+def save_symbol_index(repo_name: str, repo_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Builds the index and stores it next to the repo's vector store."""
+    index = build_symbol_index(repo_path)
+    path = _index_path(repo_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(index, f, indent=2)
+    counts = ", ".join(f"{len(index[k])} {k}" for k in SYMBOL_KINDS)
+    print(f"[{repo_name}] Symbol index saved ({counts}).")
+    return index
+
+def load_symbol_index(repo_name: str, repo_path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Loads the persisted index, building it on the fly for repos ingested before it existed."""
+    path = _index_path(repo_name)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return {**_empty_index(), **json.load(f)}
+        except (OSError, ValueError) as e:
+            print(f"Could not read symbol index for {repo_name}: {e}")
+    if repo_path and os.path.isdir(repo_path):
+        return build_symbol_index(repo_path)
+    return _empty_index()
+
+# --- Profile lookups ------------------------------------------------------------------
+
+ENTRY_POINT_COMMANDS = {
+    "python_main": "python {file}",
+    "node_bin": "node {file}",
+    "rust_main": "cargo run",
+    "java_main": "java {file}",
+}
+
+def _entry_command(entry: Dict[str, Any]) -> str:
+    directory = os.path.dirname(entry["file"])
+    if entry["kind"] == "go_main":
+        return f"go run ./{directory}" if directory else "go run ."
+    if entry["kind"] == "python_main" and os.path.basename(entry["file"]) == "__main__.py" and directory:
+        return f"python -m {directory.replace('/', '.')}"
+    return ENTRY_POINT_COMMANDS[entry["kind"]].format(file=entry["file"])
+
+# Fields of profile_facts_from_index synthesized from entry points and CLI
+# options (not copied from the repo); the profiler gets them as hints only
+INDEX_HINT_FIELDS = ("commands", "usage_snippets")
+
+def profile_facts_from_index(index: Dict[str, List[Dict[str, Any]]], max_items: int = 8) -> Dict[str, Any]:
+    """
+    RepoProfile fields that can be answered by index lookup: `commands` from
+    entry points, `config_options` from environment variables and
+    `usage_snippets` from CLI options. Fields with nothing found are omitted.
+    See INDEX_HINT_FIELDS.
+    """
+    facts: Dict[str, Any] = {}
+
+    commands = []
+    for entry in index["entry_points"]:
+        command = _entry_command(entry)
+        if command not in commands:
+            commands.append(command)
+    if commands:
+        facts["commands"] = commands[:max_items]
+
+    config, seen = [], set()
+    for env in index["env_vars"]:
+        if env["name"] in seen:
+            continue
+        seen.add(env["name"])
+        config.append(f"{env['name']} (default: {env['default']})" if env.get("default") else env["name"])
+    if config:
+        facts["config_options"] = config[:max_items]
+
+    # One snippet per CLI file: the command and its documented options
+    snippets = []
+    options_by_file: Dict[str, List[Dict[str, Any]]] = {}
+    for option in index["cli_options"]:
+        options_by_file.setdefault(option["file"], []).append(option)
+    commands_by_file = {e["file"]: _entry_command(e) for e in index["entry_points"]}
+    for path, options in options_by_file.items():
+        command = commands_by_file.get(path, path)
+        lines = [f"{command} --help"]
+        for option in options[:max_items]:
+            name = option["name"]
+            if not name.startswith("-"):
+                usage = f"<{name}>"
+            elif option.get("takes_value"):
+                usage = f"{name} <{name.lstrip('-').replace('-', '_')}>"
+            else:
+                usage = name
+            help_text = f"  # {option['help']}" if option.get("help") else ""
+            lines.append(f"{command} {usage}{help_text}")
+        snippets.append("\n".join(lines))
+    if snippets:
+        facts["usage_snippets"] = snippets[:3]
+    return facts
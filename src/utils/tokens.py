@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+# gpt-5.1 and text-embedding-3-* are both close enough to o200k/cl100k that a
+# single encoding is fine for budgeting purposes.
+DEFAULT_ENCODING = "o200k_base"
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str):
+    """Loads a tiktoken encoding once; returns None if tiktoken is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"tiktoken encoding '{name}' unavailable ({e}); falling back to a chars/4 estimate.")
+        return None
+
+def count_tokens(text: str, encoding: str = DEFAULT_ENCODING) -> int:
+    """
+    Returns the number of tokens in text.
+    Falls back to a ~4 chars/token estimate when tiktoken cannot be loaded.
+    """
+    if not text:
+        return 0
+    enc = _get_encoding(encoding)
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
@@ -0,0 +1,101 @@
+import json
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from src.vector_store.routing import routed_search_by_vector, section_roles
+
+if TYPE_CHECKING:
+    from langchain_core.vectorstores import VectorStore
+
+BUNDLE_FILE = "retrieval_bundles.json"
+
+PATTERN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "readme_pattern_llm.json")
+
+# Fixed queries of the single-agent baseline (single-agent/baseline_single_agent.py)
+BASELINE_QUERIES = [
+    "project overview description purpose architecture main entry point",
+    "installation setup dependencies requirements pip npm docker compose",
+    "usage examples commands API endpoints CLI flags run start",
+    "configuration environment variables config options settings .env",
+]
+
+# Bundles loaded in this process: path -> (mtime, {query: [{content, metadata}]})
+_BUNDLES: Dict[str, tuple] = {}
+
+@lru_cache(maxsize=None)
+def canonical_sections() -> Dict[str, Dict[str, str]]:
+    """Section id -> {title, purpose} from the README pattern library."""
+    try:
+        with open(PATTERN_PATH, "r") as f:
+            outline = json.load(f)["outline"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read the README pattern library: {e}")
+        return {}
+    return {s["id"]: s for group in outline.values() for s in group}
+
+def canonical_query(section_id: str) -> Optional[str]:
+    """The writer query of a canonical section (title + start of its purpose), or None."""
+    section = canonical_sections().get(section_id)
+    if section is None:
+        return None
+    return f"{section['title']} {section.get('purpose', '')[:120]}".strip()
+
+def review_query(section_id: str) -> str:
+    return f"{section_id} verification items"
+
+def bundle_queries() -> List[Tuple[str, Optional[List[str]]]]:
+    """Every query whose results are precomputed at ingestion, with the file
+    roles its search is restricted to (see routing.py)."""
+    from src.agents.repo_profiler import PROFILE_QUERIES
+
+    queries = {}
+    for section_id in canonical_sections():
+        roles = section_roles(section_id)
+        queries.setdefault(canonical_query(section_id), roles)
+        queries.setdefault(review_query(section_id), roles)
+    for query in [q for q, _ in PROFILE_QUERIES] + BASELINE_QUERIES:
+        queries.setdefault(query, None)
+    return list(queries.items())
+
+def _bundle_path(repo_name: str) -> str:
+    return os.path.join(os.getcwd(), "knowledge_base", repo_name, BUNDLE_FILE)
+
+def build_bundles(repo_name: str, vector_store: "VectorStore", search_kwargs: dict) -> int:
+    """
+    Runs every bundle query against the freshly built store (MMR, same
+    parameters and role routing as a live search) and saves the hits next to
+    it. Queries are embedded in one batched call. Returns the number of
+    bundles saved.
+    """
+    queries = bundle_queries()
+    vectors = vector_store.embeddings.embed_documents([q for q, _ in queries])
+    bundles = {}
+    for (query, roles), vector in zip(queries, vectors):
+        docs = routed_search_by_vector(vector_store, vector, roles, search_kwargs)
+        bundles[query] = [{"content": d.page_content, "metadata": d.metadata} for d in docs]
+    with open(_bundle_path(repo_name), "w") as f:
+        json.dump(bundles, f)
+    return len(bundles)
+
+def get_bundle(repo_name: str, query: str) -> Optional[list]:
+    """Precomputed hits for query as Documents, or None if it wasn't precomputed."""
+    from langchain_core.documents import Document
+
+    path = _bundle_path(repo_name)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _BUNDLES.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path, "r") as f:
+                cached = (mtime, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Could not read {path}: {e}")
+            return None
+        _BUNDLES[path] = cached
+    hits = cached[1].get(query)
+    if hits is None:
+        return None
+    return [Document(page_content=h["content"], metadata=h["metadata"]) for h in hits]
@@ -0,0 +1,232 @@
+import os
+import re
+import ast
+from typing import Any, Dict, List, Tuple
+from src.utils.tokens import count_tokens
+
+# Writers truncate each retrieved chunk to 1500 characters, so chunks are kept
+# below that (~350 tokens) to arrive whole.
+CHUNK_TOKEN_BUDGET = 350
+
+# Top-level declarations that start a new symbol in brace/indent languages
+_DECLARATIONS = {
+    "js": re.compile(
+        r"^(?:export\s+(?:default\s+)?)?(?:(?:async\s+)?function\s*\*?\s*(?P<function>\w+)"
+        r"|class\s+(?P<class>\w+)"
+        r"|(?:const|let|var)\s+(?P<variable>\w+)\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>"
+        r"|(?:interface|type|enum)\s+(?P<type>\w+))"
+    ),
+    "go": re.compile(r"^(?:func\s+(?:\([^)]*\)\s*)?(?P<function>\w+)|type\s+(?P<type>\w+))"),
+    "rust": re.compile(
+        r"^(?:pub(?:\([^)]*\))?\s+)?(?:(?:async\s+)?fn\s+(?P<function>\w+)"
+        r"|(?:struct|enum|trait|union)\s+(?P<type>\w+)"
+        r"|impl(?:<[^>]*>)?\s+(?:[\w:<>]+\s+for\s+)?(?P<class>[\w:]+)"
+        r"|mod\s+(?P<module>\w+))"
+    ),
+    # Methods: modifiers, one return type (`List<Map<K, V>>`, `int[]`), name, `(`;
+    # statements that look alike (`return foo(`, `else if (`) are excluded
+    "java": re.compile(
+        r"^\s{0,4}(?:(?:public|private|protected|static|final|abstract|sealed|synchronized|native|default)\s+)*"
+        r"(?:(?:class|interface|enum|record)\s+(?P<class>\w+)"
+        r"|(?!(?:if|else|for|while|do|switch|case|catch|try|return|throw|new|yield|assert)\b)"
+        r"(?:<[^;()]*>\s+)?[\w.]+(?:<[^;()]*>)?(?:\[\])*\s+(?P<function>\w+)\s*\([^;]*$)"
+    ),
+}
+_DECLARATIONS["ruby"] = re.compile(r"^\s{0,2}(?:def\s+(?P<function>[\w.?!]+)|class\s+(?P<class>[\w:]+)|module\s+(?P<module>[\w:]+))")
+
+_LANGUAGES = {
+    ".js": "js", ".jsx": "js", ".mjs": "js", ".cjs": "js", ".ts": "js", ".tsx": "js",
+    ".go": "go", ".rs": "rust", ".java": "java", ".kt": "java", ".scala": "java", ".cs": "java",
+    ".rb": "ruby",
+}
+_COMMENT_PREFIXES = ("//", "/*", "*", "#", "///", "@", "#[")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)")
+
+# A unit is a contiguous run of lines that belongs together:
+# (symbol, kind, start_line, end_line), 1-based and inclusive.
+Unit = Tuple[str, str, int, int]
+
+def _python_units(text: str, lines: List[str]) -> List[Unit]:
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return []
+
+    units: List[Unit] = []
+    for node in tree.body:
+        # Decorators and the comments right above a definition belong to it
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        while start > 1 and lines[start - 2].lstrip().startswith("#"):
+            start -= 1
+        end = node.end_lineno
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            units.append((node.name, "function", start, end))
+        elif isinstance(node, ast.ClassDef):
+            units.append((node.name, "class", start, end))
+        else:
+            units.append(("", "block", start, end))
+    return units
+
+def _class_member_units(node: ast.ClassDef, lines: List[str]) -> List[Unit]:
+    """Splits an oversized Python class into its header and one unit per member."""
+    units: List[Unit] = []
+    body_start = node.body[0].lineno if node.body else node.end_lineno
+    header_end = body_start - 1
+    for child in node.body:
+        start = min([child.lineno] + [d.lineno for d in getattr(child, "decorator_list", [])])
+        while start > body_start and lines[start - 2].lstrip().startswith("#"):
+            start -= 1
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            units.append((f"{node.name}.{child.name}", "method", start, child.end_lineno))
+        elif units and units[-1][1] == "class_body":
+            units[-1] = (units[-1][0], "class_body", units[-1][2], child.end_lineno)
+        else:
+            units.append((node.name, "class_body", start, child.end_lineno))
+    if units and units[0][1] == "class_body":
+        # Docstring and class attributes go with the header
+        units[0] = (node.name, "class", min(node.lineno, units[0][2]), units[0][3])
+    else:
+        units.insert(0, (node.name, "class", node.lineno, max(header_end, node.lineno)))
+    return units
+
+def _declaration_units(lines: List[str], pattern: re.Pattern) -> List[Unit]:
+    """
+    Splits a brace-language file at top-level declarations. Each unit runs
+    from its declaration (plus the comments/attributes above it) up to the
+    next one; anything before the first declaration is a block.
+    """
+    starts: List[Tuple[int, str, str]] = []
+    for i, line in enumerate(lines):
+        match = pattern.match(line)
+        if not match:
+            continue
+        kind, name = next(((k, v) for k, v in match.groupdict().items() if v), ("block", ""))
+        start = i
+        while start > 0 and lines[start - 1].strip().startswith(_COMMENT_PREFIXES):
+            start -= 1
+        if starts and start <= starts[-1][0]:
+            continue
+        starts.append((start, name, kind))
+
+    units: List[Unit] = []
+    if not starts or starts[0][0] > 0:
+        units.append(("", "block", 1, starts[0][0] if starts else len(lines)))
+    for idx, (start, name, kind) in enumerate(starts):
+        end = starts[idx + 1][0] if idx + 1 < len(starts) else len(lines)
+        units.append((name, kind, start + 1, end))
+    return units
+
+def _markdown_units(lines: List[str]) -> List[Unit]:
+    units: List[Unit] = []
+    current, start = "", 1
+    in_fence = False
+    for i, line in enumerate(lines, start=1):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else _HEADING.match(line)
+        if heading and i > start:
+            units.append((current, "section", start, i - 1))
+            start = i
+        if heading:
+            current = heading.group(2).strip()
+    units.append((current, "section", start, len(lines)))
+    return units
+
+def _split_lines(lines: List[str], start: int, end: int, budget: int) -> List[Tuple[int, int]]:
+    """
+    Splits lines[start..end] (1-based, inclusive) into ranges of at most
+    `budget` tokens, preferring to cut at blank lines.
+    """
+    ranges = []
+    chunk_start, tokens, last_blank = start, 0, None
+    line_no = start
+    while line_no <= end:
+        line_tokens = count_tokens(lines[line_no - 1] + "\n")
+        if tokens + line_tokens > budget and line_no > chunk_start:
+            cut = last_blank if last_blank and last_blank > chunk_start else line_no - 1
+            ranges.append((chunk_start, cut))
+            chunk_start, tokens, last_blank = cut + 1, 0, None
+            line_no = chunk_start
+            continue
+        tokens += line_tokens
+        if not lines[line_no - 1].strip():
+            last_blank = line_no
+        line_no += 1
+    if chunk_start <= end:
+        ranges.append((chunk_start, end))
+    return ranges
+
+def _units_for(file_path: str, text: str, lines: List[str]) -> List[Unit]:
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in (".py", ".ipynb"):
+        units = _python_units(text, lines)
+        if units:
+            return units
+    elif ext in _LANGUAGES:
+        return _declaration_units(lines, _DECLARATIONS[_LANGUAGES[ext]])
+    elif ext in (".md", ".rst", ".markdown"):
+        return _markdown_units(lines)
+    return [("", "text", 1, len(lines))]
+
+def chunk_file(file_path: str, text: str, max_tokens: int = CHUNK_TOKEN_BUDGET) -> List[Dict[str, Any]]:
+    """
+    Splits a file into whole symbols (functions, classes, top-level blocks,
+    markdown sections) of at most max_tokens each, without overlap. Symbols
+    larger than the budget are split into members (Python classes) or at
+    line boundaries. Small neighbouring blocks without a symbol are merged.
+
+    Returns dicts with `content` and `symbol`, `kind`, `start_line`, `end_line`.
+    """
+    lines = text.splitlines()
+    if not lines:
+        return []
+
+    units = _units_for(file_path, text, lines)
+    tree = None
+    chunks: List[Dict[str, Any]] = []
+
+    def emit(symbol: str, kind: str, start: int, end: int):
+        # Drop leading/trailing blank lines so ranges point at real content
+        while start < end and not lines[start - 1].strip():
+            start += 1
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        content = "\n".join(lines[start - 1:end])
+        if not content.strip():
+            return
+        previous = chunks[-1] if chunks else None
+        if previous:
+            merged = "\n".join(lines[previous["start_line"] - 1:end])
+            if previous["kind"] == kind and kind in ("block", "text") and count_tokens(merged) <= max_tokens:
+                previous.update(content=merged, end_line=end)
+                return
+            # A lone heading or class header is folded into what follows it,
+            # keeping its own symbol
+            if previous["start_line"] == previous["end_line"] and count_tokens(merged) <= max_tokens:
+                previous.update(content=merged, end_line=end)
+                if not previous["symbol"]:
+                    previous.update(symbol=symbol, kind=kind)
+                return
+        chunks.append({"content": content, "symbol": symbol, "kind": kind, "start_line": start, "end_line": end})
+
+    for symbol, kind, start, end in units:
+        body = "\n".join(lines[start - 1:end])
+        if count_tokens(body) <= max_tokens:
+            emit(symbol, kind, start, end)
+            continue
+
+        if kind == "class" and file_path.endswith((".py", ".ipynb")):
+            tree = tree or ast.parse(text)
+            node = next(n for n in tree.body if isinstance(n, ast.ClassDef) and n.name == symbol and n.end_lineno == end)
+            members = _class_member_units(node, lines)
+            # Leading comments/decorators of the class go with its header
+            members[0] = (members[0][0], members[0][1], start, members[0][3])
+            for m_symbol, m_kind, m_start, m_end in members:
+                for part_start, part_end in _split_lines(lines, m_start, m_end, max_tokens):
+                    emit(m_symbol, m_kind, part_start, part_end)
+            continue
+
+        for part_start, part_end in _split_lines(lines, start, end, max_tokens):
+            emit(symbol, kind, part_start, part_end)
+
+    return chunks
@@ -0,0 +1,171 @@
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_chroma.vectorstores import maximal_marginal_relevance
+from langchain_core.documents import Document
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+# Candidates fetched from a reduced index per MMR candidate (fetch_k), so
+# rescoring can recover neighbours the reduced vectors rank slightly too low
+RESCORE_OVERSAMPLE = 3
+
+# Loaded rescoring vectors: path -> (mtime, {id: row}, float32 matrix)
+_RESCORE: Dict[str, tuple] = {}
+
+def truncate(vectors: np.ndarray, dimensions: Optional[int]) -> np.ndarray:
+    """First `dimensions` components of each row, re-normalised to unit length."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not dimensions or dimensions >= vectors.shape[-1]:
+        return vectors
+    cut = vectors[..., :dimensions]
+    return cut / np.maximum(np.linalg.norm(cut, axis=-1, keepdims=True), 1e-12)
+
+def quantize(vectors: np.ndarray, precision: str) -> Dict[str, np.ndarray]:
+    """Arrays to store for the precision; int8 keeps one scale per vector."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if precision == "int8":
+        scale = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127
+        return {"vectors": np.round(vectors / scale[:, None]).astype(np.int8), "scale": scale.astype(np.float32)}
+    return {"vectors": vectors.astype(np.float16 if precision == "float16" else np.float32)}
+
+def dequantize(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    vectors = arrays["vectors"].astype(np.float32)
+    if "scale" in arrays:
+        vectors *= arrays["scale"][:, None]
+    return vectors
+
+def save_rescore_vectors(path: str, ids: List[str], vectors: np.ndarray, precision: str):
+    np.savez(path, ids=np.asarray(ids), **quantize(vectors, precision))
+
+def load_rescore_vectors(path: str) -> Optional[Tuple[Dict[str, int], np.ndarray]]:
+    """({id: row}, dequantized full vectors) saved at ingestion, or None if there are none."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _RESCORE.get(path)
+    if cached is None or cached[0] != mtime:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        rows = {str(i): n for n, i in enumerate(arrays.pop("ids"))}
+        cached = (mtime, rows, dequantize(arrays))
+        _RESCORE[path] = cached
+    return cached[1], cached[2]
+
+def _cosine(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+    return vectors @ query / np.maximum(norms, 1e-12)
+
+def compact_mmr(collection, query: List[float], k: int, fetch_k: int, lambda_mult: float,
+                dimensions: Optional[int] = None, rescore: Optional[Tuple[Dict[str, int], np.ndarray]] = None,
+                where: Optional[dict] = None, where_document: Optional[dict] = None) -> dict:
+    """
+    MMR over a collection holding reduced vectors. `query` is a full embedding;
+    its truncated prefix fetches candidates from the index. With rescore
+    vectors, RESCORE_OVERSAMPLE * fetch_k candidates are re-ranked against the
+    full query and the best fetch_k go to MMR, which then also compares full
+    vectors. Returns {"ids", "documents", "metadatas"} of the k picks, best first.
+    """
+    full_query = np.asarray(query, dtype=np.float32)
+    n = fetch_k * RESCORE_OVERSAMPLE if rescore is not None else fetch_k
+    results = collection.query(query_embeddings=[truncate(full_query, dimensions)], n_results=n, where=where,
+                               where_document=where_document, include=["documents", "metadatas", "embeddings"])
+    ids, documents, metadatas = results["ids"][0], results["documents"][0], results["metadatas"][0]
+    if not ids:
+        return {"ids": [], "documents": [], "metadatas": []}
+
+    if rescore is not None and all(i in rescore[0] for i in ids):
+        rows, full = rescore
+        vectors = full[[rows[i] for i in ids]]
+        order = np.argsort(-_cosine(full_query, vectors), kind="stable")[:fetch_k]
+        mmr_query = full_query
+    else:
+        vectors = np.asarray(results["embeddings"][0], dtype=np.float32)
+        order = np.arange(min(len(ids), fetch_k))
+        mmr_query = truncate(full_query, dimensions)
+    picked = maximal_marginal_relevance(mmr_query, vectors[order], k=k, lambda_mult=lambda_mult)
+    chosen = [int(order[i]) for i in picked]
+    return {"ids": [ids[i] for i in chosen], "documents": [documents[i] for i in chosen],
+            "metadatas": [metadatas[i] for i in chosen]}
+
+class RecordingEmbeddings:
+    """
+    Wraps an embeddings model for ingestion into a reduced collection: vectors
+    are returned truncated to `dimensions` (what the index stores) and the
+    full vectors are kept by text for the rescoring copy.
+    """
+
+    def __init__(self, base: "Embeddings", dimensions: Optional[int]):
+        self.base = base
+        self.dimensions = dimensions
+        self.full: Dict[str, List[float]] = {}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.base.embed_documents(texts)
+        self.full.update(zip(texts, vectors))
+        return truncate(np.asarray(vectors), self.dimensions).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return truncate(np.asarray(self.base.embed_query(text)), self.dimensions).tolist()
+
+class CompactChroma(Chroma):
+    """
+    A repo collection stored with reduced vectors. Queries are embedded at
+    full dimension; MMR search (the retriever, bundles and routed searches
+    all go through max_marginal_relevance_search_by_vector) truncates them
+    for the index and rescores with the full vectors (see compact_mmr).
+    The similarity searches are overridden to truncate the query and rank
+    by the reduced vectors.
+    """
+
+    def __init__(self, *args, dimensions: Optional[int] = None, rescore_path: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dimensions = dimensions
+        self.rescore_path = rescore_path
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                    where_document: Optional[dict] = None, **kwargs) -> List[Document]:
+        return super().similarity_search_by_vector(truncate(embedding, self.dimensions).tolist(), k, filter,
+                                                   where_document, **kwargs)
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding: List[float], k: int = 4,
+                                                          filter: Optional[dict] = None,
+                                                          where_document: Optional[dict] = None,
+                                                          **kwargs) -> List[Tuple[Document, float]]:
+        return super().similarity_search_by_vector_with_relevance_scores(
+            truncate(embedding, self.dimensions).tolist(), k, filter, where_document, **kwargs)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     where_document: Optional[dict] = None, **kwargs) -> List[Tuple[Document, float]]:
+        # Also behind similarity_search and the "similarity" retriever
+        if self.embeddings is None:
+            return super().similarity_search_with_score(query, k, filter, where_document, **kwargs)
+        return self.similarity_search_by_vector_with_relevance_scores(self.embeddings.embed_query(query), k, filter,
+                                                                      where_document, **kwargs)
+
+    def similarity_search_with_vectors(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                       where_document: Optional[dict] = None,
+                                       **kwargs) -> List[Tuple[Document, np.ndarray]]:
+        if self.embeddings is None:
+            return super().similarity_search_with_vectors(query, k, filter, where_document, **kwargs)
+        query_embedding = truncate(self.embeddings.embed_query(query), self.dimensions)
+        results = self._collection.query(query_embeddings=[query_embedding], n_results=k, where=filter,
+                                         where_document=where_document,
+                                         include=["documents", "metadatas", "embeddings"], **kwargs)
+        return [(Document(page_content=text, metadata=metadata or {}, id=i), vector)
+                for i, text, metadata, vector in zip(results["ids"][0], results["documents"][0],
+                                                     results["metadatas"][0], results["embeddings"][0])
+                if text is not None]
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, filter: Optional[dict] = None,
+                                                where_document: Optional[dict] = None, **kwargs) -> List[Document]:
+        rescore = load_rescore_vectors(self.rescore_path) if self.rescore_path else None
+        results = compact_mmr(self._collection, embedding, k, fetch_k, lambda_mult, self.dimensions, rescore,
+                              where=filter, where_document=where_document)
+        return [Document(page_content=text or "", metadata=metadata or {}, id=i)
+                for i, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])]
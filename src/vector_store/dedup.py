@@ -0,0 +1,80 @@
+import random
+import re
+import zlib
+from typing import Dict, List, Tuple
+
+# Chunks whose shingle sets overlap at least this much (Jaccard) are duplicates
+DEDUP_THRESHOLD = 0.9
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# MinHash signature length, split into LSH bands of NUM_PERM // LSH_BANDS rows
+NUM_PERM = 32
+LSH_BANDS = 16
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(42)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Hashed word k-grams of the text, whitespace- and case-insensitive."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) <= size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))}
+    return {zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8")) for i in range(len(tokens) - size + 1)}
+
+def minhash(shingle_set: set) -> Tuple[int, ...]:
+    return tuple(min((a * x + b) % _PRIME for x in shingle_set) for a, b in _PERMUTATIONS)
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def dedupe_documents(docs: list, threshold: float = DEDUP_THRESHOLD) -> Tuple[list, int]:
+    """
+    Drops near-duplicate Documents (copied files, per-package clones, repeated
+    license headers). MinHash/LSH finds candidates, which are confirmed with
+    the exact Jaccard similarity of their shingles. Only chunks of different
+    sources are compared: dropping one from its own file would leave a
+    chunk_index gap that expand_hit cannot bridge. The first occurrence is
+    kept; its metadata lists the other sources it stands for
+    (`duplicate_sources`, comma-separated since Chroma metadata is scalar,
+    and `duplicate_count`). Returns (kept documents, number removed).
+    """
+    rows = NUM_PERM // LSH_BANDS
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    kept: list = []
+    kept_shingles: List[set] = []
+    covered: List[List[str]] = []
+
+    for doc in docs:
+        sh = shingles(doc.page_content)
+        signature = minhash(sh)
+        bands = [(b, signature[b * rows:(b + 1) * rows]) for b in range(LSH_BANDS)]
+
+        match = None
+        source = doc.metadata.get("source")
+        candidates = {i for band in bands for i in buckets.get(band, [])}
+        for i in sorted(candidates):
+            if kept[i].metadata.get("source") != source and jaccard(sh, kept_shingles[i]) >= threshold:
+                match = i
+                break
+
+        if match is not None:
+            if source and source not in covered[match]:
+                covered[match].append(source)
+            continue
+
+        for band in bands:
+            buckets.setdefault(band, []).append(len(kept))
+        kept.append(doc)
+        kept_shingles.append(sh)
+        covered.append([])
+
+    for doc, sources in zip(kept, covered):
+        if sources:
+            doc.metadata["duplicate_sources"] = ", ".join(sources)
+            doc.metadata["duplicate_count"] = len(sources)
+    return kept, len(docs) - len(kept)
@@ -0,0 +1,36 @@
+import os
+from typing import List
+
+import numpy as np
+
+# Collection name langchain_chroma uses when none is given (as in ingest_repo)
+COLLECTION_NAME = "langchain"
+
+def open_collection(repo_name: str):
+    """The repo's persisted Chroma collection, opened directly (no embeddings model)."""
+    import chromadb
+
+    persist_dir = os.path.join(os.getcwd(), "knowledge_base", repo_name)
+    if not os.path.exists(persist_dir):
+        raise ValueError(f"No vector store found for {repo_name} at {persist_dir}")
+    return chromadb.PersistentClient(path=persist_dir).get_collection(COLLECTION_NAME)
+
+def query_vectors(vectors: np.ndarray, source: str, sample: int) -> np.ndarray:
+    """
+    Query vectors for a retrieval benchmark: a fixed sample of the stored
+    chunk vectors ("chunks", free) or the canonical bundle queries
+    ("sections", embedded in one call).
+    """
+    if source == "chunks":
+        rng = np.random.default_rng(42)
+        return vectors[rng.choice(len(vectors), size=min(sample, len(vectors)), replace=False)]
+
+    from langchain_openai import OpenAIEmbeddings
+    from src.vector_store.bundles import bundle_queries
+
+    queries = [q for q, _ in bundle_queries()][:sample]
+    return np.asarray(OpenAIEmbeddings(model="text-embedding-3-small").embed_documents(queries), dtype=np.float32)
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,230 @@
+import csv
+import io
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+from src.ingestion.utils.file_scanner import is_key_file
+from src.vector_store.loader import SKIP_FILE_BYTES
+
+# Data files at least this long are reduced to their structure; shorter ones
+# (and manifests/configs such as package.json) are ingested verbatim
+SAMPLE_MIN_CHARS = 4000
+
+# Records shown per data file, and characters per record
+SAMPLE_RECORDS = 3
+SAMPLE_RECORD_CHARS = 300
+
+# Lines of schema / key paths per data file
+MAX_SCHEMA_LINES = 60
+
+# List items inspected when merging the schema of a list
+SCHEMA_ITEMS = 20
+
+# Bytes read for files with an extractor (only their structure is kept)
+EXTRACT_READ_BYTES = 2_000_000
+
+# Notebooks are read whole (up to the skip size): a cut-off notebook is not
+# valid JSON, and most of a large notebook is outputs that are dropped anyway
+NOTEBOOK_READ_BYTES = SKIP_FILE_BYTES
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    return {bool: "bool", int: "int", float: "float", str: "str", list: "list", dict: "object"}.get(type(value), type(value).__name__)
+
+def _schema_lines(value: Any, path: str, lines: List[str], seen: set):
+    """Appends `path: type` lines, merging the keys of (the first few) list items."""
+    if len(lines) >= MAX_SCHEMA_LINES:
+        return
+    if isinstance(value, dict):
+        if path not in seen:
+            seen.add(path)
+            lines.append(f"{path or '$'}: object ({len(value)} keys)")
+        for key, child in list(value.items())[:MAX_SCHEMA_LINES]:
+            _schema_lines(child, f"{path}.{key}", lines, seen)
+    elif isinstance(value, list):
+        if path not in seen:
+            seen.add(path)
+            lines.append(f"{path or '$'}: list ({len(value)} items)")
+        for item in value[:SCHEMA_ITEMS]:
+            _schema_lines(item, f"{path}[]", lines, seen)
+    elif path not in seen:
+        seen.add(path)
+        lines.append(f"{path}: {_type_name(value)}")
+
+def _records(value: Any) -> List[Any]:
+    """The first records of the largest list near the top of a document."""
+    if isinstance(value, list):
+        return value[:SAMPLE_RECORDS]
+    if isinstance(value, dict):
+        lists = [v for v in value.values() if isinstance(v, list) and v]
+        if lists:
+            return max(lists, key=len)[:SAMPLE_RECORDS]
+        return [{k: value[k] for k in list(value)[:10]}]
+    return [value]
+
+def _format(header: str, schema: List[str], samples: List[str]) -> str:
+    parts = [header, "", "Schema:"] + [f"  {line}" for line in schema]
+    if samples:
+        parts += ["", "Sample records:"] + [f"  {s[:SAMPLE_RECORD_CHARS]}" for s in samples]
+    return "\n".join(parts)
+
+def _structured(kind: str, file_path: str, text: str, documents: List[Any]) -> str:
+    schema: List[str] = []
+    seen: set = set()
+    for doc in documents:
+        _schema_lines(doc, "", schema, seen)
+    samples = [json.dumps(r, default=str) for doc in documents[:1] for r in _records(doc)]
+    header = f"{kind} file {os.path.basename(file_path)} ({len(text) // 1000} KB), structure and sample records:"
+    return _format(header, schema, samples)
+
+def extract_json(file_path: str, text: str) -> Optional[str]:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return _structured("JSON", file_path, text, [data])
+
+def extract_yaml(file_path: str, text: str) -> Optional[str]:
+    try:
+        import yaml
+        documents = [d for d in yaml.safe_load_all(text) if d is not None]
+    except Exception:
+        return None
+    return _structured("YAML", file_path, text, documents) if documents else None
+
+def extract_xml(file_path: str, text: str) -> Optional[str]:
+    import xml.etree.ElementTree as ET
+
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError:
+        return None
+
+    def _tag(element) -> str:
+        return element.tag.split("}", 1)[-1]
+
+    counts: Dict[str, int] = {}
+    attributes: Dict[str, set] = {}
+    examples: Dict[str, list] = {}
+
+    def _walk(element, path: str):
+        path = f"{path}/{_tag(element)}"
+        counts[path] = counts.get(path, 0) + 1
+        attributes.setdefault(path, set()).update(element.attrib)
+        if len(examples.setdefault(path, [])) < SAMPLE_RECORDS:
+            examples[path].append(element)
+        for child in element:
+            _walk(child, path)
+
+    _walk(root, "")
+    schema = []
+    for path, count in list(counts.items())[:MAX_SCHEMA_LINES]:
+        attrs = f" [@{', @'.join(sorted(attributes[path]))}]" if attributes[path] else ""
+        schema.append(f"{path} x{count}{attrs}")
+    # Sample the most repeated element, shallowest first
+    repeated = max(counts, key=lambda p: (counts[p], -p.count("/")))
+    samples = [" ".join(ET.tostring(e, encoding="unicode").split()) for e in examples[repeated]] if counts[repeated] > 1 else []
+    header = f"XML file {os.path.basename(file_path)} ({len(text) // 1000} KB), structure and sample records:"
+    return _format(header, schema, samples)
+
+def extract_csv(file_path: str, text: str) -> Optional[str]:
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    rows = list(csv.reader(io.StringIO(text), dialect))
+    if len(rows) < 2:
+        return None
+    header, body = rows[0], rows[1:]
+
+    def _column_type(values: List[str]) -> str:
+        values = [v for v in values if v.strip()]
+        for name, cast in (("int", int), ("float", float)):
+            try:
+                for v in values:
+                    cast(v)
+                return name
+            except ValueError:
+                continue
+        return "str" if values else "empty"
+
+    columns = list(zip(*body[:50]))
+    schema = [f"{name}: {_column_type(list(columns[i])) if i < len(columns) else 'empty'}" for i, name in enumerate(header)]
+    samples = [", ".join(row) for row in body[:SAMPLE_RECORDS]]
+    head = f"CSV file {os.path.basename(file_path)} ({len(body)} rows, {len(header)} columns), columns and sample rows:"
+    return _format(head, schema[:MAX_SCHEMA_LINES], samples)
+
+def extract_notebook(file_path: str, text: str) -> Optional[str]:
+    """Code and markdown cells as a Python script (markdown as comments); outputs are dropped."""
+    try:
+        notebook = json.loads(text)
+    except ValueError:
+        return None
+    cells = []
+    for cell in notebook.get("cells", []):
+        source = cell.get("source", "")
+        source = "".join(source) if isinstance(source, list) else source
+        if not source.strip():
+            continue
+        if cell.get("cell_type") == "markdown":
+            cells.append("# %% [markdown]\n" + "\n".join(f"# {line}".rstrip() for line in source.splitlines()))
+        elif cell.get("cell_type") == "code":
+            # IPython magics and shell escapes aren't Python
+            lines = [f"# {line}" if line.lstrip().startswith(("%", "!")) else line for line in source.splitlines()]
+            cells.append("# %%\n" + "\n".join(lines))
+    return "\n\n".join(cells) if cells else None
+
+EXTRACTORS: Dict[str, Callable[[str, str], Optional[str]]] = {
+    ".json": extract_json,
+    ".yaml": extract_yaml,
+    ".yml": extract_yaml,
+    ".xml": extract_xml,
+    ".csv": extract_csv,
+    ".ipynb": extract_notebook,
+}
+
+# Lines kept from a data file whose structure couldn't be parsed
+HEAD_SAMPLE_LINES = 40
+
+def has_extractor(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in EXTRACTORS
+
+def extract_read_bytes(file_path: str) -> int:
+    """Bytes to read from a file with an extractor."""
+    return NOTEBOOK_READ_BYTES if file_path.lower().endswith(".ipynb") else EXTRACT_READ_BYTES
+
+def notebook_skip_reason(text: str) -> str:
+    """Why a notebook produced no content: "invalid_notebook" or "no_cells"."""
+    try:
+        json.loads(text)
+    except ValueError:
+        return "invalid_notebook"
+    return "no_cells"
+
+def extract_content(file_path: str, text: str) -> Optional[str]:
+    """
+    Reduced content of a data file or notebook, or None to ingest the text
+    as-is. Data files are reduced to schema, key paths and a few sample
+    records (unless small or a manifest/config); files that don't parse keep
+    their first lines. Notebooks keep only their code and markdown cells
+    ("" if there are none).
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    extractor = EXTRACTORS.get(ext)
+    if extractor is None:
+        return None
+    if ext != ".ipynb" and (len(text) < SAMPLE_MIN_CHARS or is_key_file(file_path)):
+        return None
+    try:
+        extracted = extractor(file_path, text)
+    except Exception as e:
+        print(f"Could not extract structure of {file_path}: {e}")
+        extracted = None
+    if extracted is not None:
+        return extracted
+    if ext == ".ipynb":
+        return ""
+    lines = text.splitlines()
+    return "\n".join([f"{os.path.basename(file_path)} ({len(lines)} lines), first {HEAD_SAMPLE_LINES} lines:"]
+                     + [line[:SAMPLE_RECORD_CHARS] for line in lines[:HEAD_SAMPLE_LINES]])
@@ -0,0 +1,88 @@
+import mmap
+import os
+from typing import Optional, Tuple
+
+# Bytes read per file; data-like files get less since writers only need their shape
+MAX_FILE_BYTES = 300_000
+MAX_FILE_BYTES_BY_EXT = {
+    ".json": 100_000, ".xml": 100_000, ".txt": 100_000,
+    ".yaml": 100_000, ".yml": 100_000, ".csv": 100_000,
+}
+
+# Files larger than this are skipped without being opened
+SKIP_FILE_BYTES = 5_000_000
+
+# Bytes inspected to decide whether a file is binary
+SNIFF_BYTES = 8192
+
+# Files larger than this are read through mmap (only the capped prefix is copied)
+MMAP_THRESHOLD = 256_000
+
+# Average characters per line above which text is treated as minified/generated
+MINIFIED_LINE_LENGTH = 500
+
+_TEXT_BYTES = bytes(range(32, 127)) + b"\n\r\t\f\b"
+
+def byte_limit(file_path: str) -> int:
+    return MAX_FILE_BYTES_BY_EXT.get(os.path.splitext(file_path)[1].lower(), MAX_FILE_BYTES)
+
+def is_binary(head: bytes) -> bool:
+    """NUL bytes, or more than 30% non-text bytes outside valid UTF-8."""
+    if not head:
+        return False
+    if b"\0" in head:
+        return True
+    try:
+        head.decode("utf-8")
+        return False
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sample is still text
+        if e.start >= len(head) - 3:
+            return False
+    non_text = len(head.translate(None, _TEXT_BYTES))
+    return non_text / len(head) > 0.3
+
+def is_minified(text: str) -> bool:
+    return len(text) > 5000 and len(text) / (text.count("\n") + 1) > MINIFIED_LINE_LENGTH
+
+def read_text_file(full_path: str, max_bytes: Optional[int] = None,
+                   check_minified: bool = True) -> Tuple[Optional[str], str]:
+    """
+    Reads a file for ingestion, at most max_bytes (default: byte_limit of its
+    extension), cut back to the last full line. Returns (text, status) where
+    status is "ok" or "truncated", or (None, reason) with reason one of
+    "empty", "too_large", "binary", "minified" or "error".
+    """
+    max_bytes = max_bytes or byte_limit(full_path)
+    try:
+        size = os.path.getsize(full_path)
+        if size == 0:
+            return None, "empty"
+        if size > SKIP_FILE_BYTES:
+            return None, "too_large"
+        with open(full_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            if is_binary(head):
+                return None, "binary"
+            if size > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    data = m[:max_bytes]
+            else:
+                data = head + f.read(max(max_bytes - len(head), 0))
+    except (OSError, ValueError) as e:
+        print(f"Failed to read {full_path}: {e}")
+        return None, "error"
+
+    status = "ok"
+    if size > max_bytes:
+        data = data[:max_bytes]
+        cut = data.rfind(b"\n")
+        if cut > 0:
+            data = data[:cut + 1]
+        status = "truncated"
+    text = data.decode("utf-8", errors="ignore")
+    if not text.strip():
+        return None, "empty"
+    if check_minified and is_minified(text):
+        return None, "minified"
+    return text, status
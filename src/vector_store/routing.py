@@ -0,0 +1,84 @@
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+from src.ingestion.utils.file_selector import DOC_EXTENSIONS, file_role
+
+if TYPE_CHECKING:
+    from langchain_core.vectorstores import VectorStore
+
+# Files without a role in file_role that are still documentation
+DOC_NAMES = ("LICENSE", "LICENCE", "COPYING", "NOTICE", "AUTHORS", "CHANGELOG", "CHANGES", "CONTRIBUTING", "CITATION")
+
+# File roles a section's retrieval is restricted to (chunk metadata "role").
+# Sections not listed (overview, features, ...) search the whole collection.
+# Both the pattern library ids and the planner's core ids are listed.
+SECTION_ROLES: Dict[str, List[str]] = {
+    "install_setup": ["manifest", "config", "docs"],
+    "installation": ["manifest", "config", "docs"],
+    "requirements_prereq": ["manifest", "config", "docs"],
+    "requirements_dependencies": ["manifest", "config", "docs"],
+    "quickstart_usage": ["entry_point", "cli", "example", "docs"],
+    "usage": ["entry_point", "cli", "example", "docs"],
+    "advanced_usage": ["entry_point", "cli", "example", "docs", "source"],
+    "configuration": ["config", "manifest", "source", "docs"],
+    "architecture_structure": ["entry_point", "cli", "source", "docs"],
+    "demo_examples": ["example", "entry_point", "cli", "docs"],
+    "examples_use_cases": ["example", "entry_point", "cli", "docs"],
+    "examples": ["example", "entry_point", "cli", "docs"],
+    "testing_ci": ["test", "config", "manifest", "other"],
+    "deployment": ["config", "manifest", "docs", "other"],
+    "license": ["docs", "manifest", "other"],
+    "contributing": ["docs", "manifest", "other"],
+    "changelog_history": ["docs", "other"],
+    "citation_research": ["docs", "other"],
+}
+
+# A role-filtered search fetches this fraction of the usual MMR candidates
+# (fetch_k): the candidate set is already narrowed to the section's files
+ROUTED_FETCH_K_RATIO = 0.6
+
+# A filtered search returning fewer hits than this is topped up from the
+# whole collection (roles with few files, or collections ingested untagged)
+MIN_ROUTED_HITS = 4
+
+def chunk_role(path: str, language: Optional[str] = None) -> str:
+    """Role stored on every chunk of a file: file_role, with leftover text
+    files counted as docs and anything else (data, CI files) as "other"."""
+    role = file_role(path, language)
+    if role is not None:
+        return role
+    name = os.path.basename(path)
+    if os.path.splitext(name)[1].lower() in DOC_EXTENSIONS or name.upper().startswith(DOC_NAMES):
+        return "docs"
+    return "other"
+
+def section_roles(section_id: Optional[str]) -> Optional[List[str]]:
+    """Roles retrieval for this section is restricted to, or None for no filter."""
+    return SECTION_ROLES.get(section_id or "")
+
+def role_filter(roles: List[str]) -> dict:
+    """Chroma `where` clause matching chunks of any of the roles."""
+    return {"role": roles[0]} if len(roles) == 1 else {"role": {"$in": roles}}
+
+def routed_search_by_vector(vector_store: "VectorStore", vector: List[float], roles: Optional[List[str]], search_kwargs: dict) -> list:
+    """
+    MMR search (search_kwargs) restricted to chunks of the given roles, with
+    fetch_k scaled by ROUTED_FETCH_K_RATIO. With no roles, or fewer than
+    MIN_ROUTED_HITS filtered hits, the result is filled up to k from an
+    unfiltered search.
+    """
+    docs = []
+    if roles:
+        fetch_k = max(search_kwargs["k"], int(search_kwargs["fetch_k"] * ROUTED_FETCH_K_RATIO))
+        routed = {**search_kwargs, "fetch_k": fetch_k}
+        docs = vector_store.max_marginal_relevance_search_by_vector(vector, filter=role_filter(roles), **routed)
+        if len(docs) >= MIN_ROUTED_HITS:
+            return docs
+    seen = {(d.metadata.get("source"), d.metadata.get("chunk_index")) for d in docs}
+    for d in vector_store.max_marginal_relevance_search_by_vector(vector, **search_kwargs):
+        if len(docs) >= search_kwargs["k"]:
+            break
+        key = (d.metadata.get("source"), d.metadata.get("chunk_index"))
+        if key not in seen:
+            seen.add(key)
+            docs.append(d)
+    return docs
@@ -1,131 +1,537 @@
 import os
+import json
 import shutil
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain_core.documents import Document
-from langchain_core.vectorstores import VectorStore
-from langchain_core.retrievers import BaseRetriever
-from langchain_text_splitters import RecursiveCharacterTextSplitter, Language
-
-# Maps file extensions to LangChain Language enum for code-aware splitting.
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+from src.vector_store.bundles import build_bundles, get_bundle
+from src.vector_store.chunker import chunk_file
+from src.vector_store.dedup import dedupe_documents
+from src.vector_store.extractors import extract_content, extract_read_bytes, has_extractor, notebook_skip_reason
+from src.vector_store.loader import read_text_file
+from src.vector_store.routing import chunk_role, routed_search_by_vector
+from src.utils.tokens import count_tokens
+from src.ingestion.utils.file_scanner import is_key_file
+from src.ingestion.utils.snapshot import get_snapshot
+
+if TYPE_CHECKING:
+    from langchain_core.vectorstores import VectorStore
+    from langchain_core.retrievers import BaseRetriever
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# Maps file extensions to LangChain Language enum values for code-aware splitting.
 # Files not in this map use the generic RecursiveCharacterTextSplitter.
-_LANG_MAP: dict[str, Language] = {
-    ".py":   Language.PYTHON,
-    ".js":   Language.JS,
-    ".jsx":  Language.JS,
-    ".ts":   Language.JS,
-    ".tsx":  Language.JS,
-    ".java": Language.JAVA,
-    ".go":   Language.GO,
-    ".cs":   Language.CSHARP,
-    ".cpp":  Language.CPP,
-    ".c":    Language.C,
-    ".rs":   Language.RUST,
-    ".rb":   Language.RUBY,
+# Values are kept as plain strings so importing this module does not pull in
+# langchain_text_splitters; they are resolved to the enum on first use.
+_LANG_MAP: dict[str, str] = {
+    ".py":   "python",
+    ".js":   "js",
+    ".jsx":  "js",
+    ".ts":   "js",
+    ".tsx":  "js",
+    ".java": "java",
+    ".go":   "go",
+    ".cs":   "csharp",
+    ".cpp":  "cpp",
+    ".c":    "c",
+    ".rs":   "rust",
+    ".rb":   "ruby",
+    ".ipynb": "python",
 }
 
-_FALLBACK_SPLITTER = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+# Repos whose ingested files total at most this many tokens skip the vector
+# store; agents get every file in one packed context instead
+SMALL_REPO_TOKENS = 8000
+WHOLE_CONTEXT_FILE = "whole_context.json"
+
+# HNSW index parameters of a repo collection (Chroma's defaults)
+INDEX_PARAMS = {"space": "l2", "M": 16, "construction_ef": 100, "search_ef": 100}
+
+# MMR parameters of the retriever (also used to precompute bundles)
+RETRIEVER_SEARCH_KWARGS = {"k": 8, "fetch_k": 20, "lambda_mult": 0.5}
+
+# How vectors are stored. dimensions: keep only the first n in the Chroma
+# index (text-embedding-3 vectors are Matryoshka-trained, so a prefix is a
+# usable embedding), None for all. rescore: precision of a full-dimension
+# copy (RESCORE_PRECISIONS) used to rescore the index's candidates, None for
+# none; it needs dimensions, since Chroma itself only stores float32.
+# See compact.py.
+STORAGE_PARAMS = {"dimensions": None, "rescore": None}
+RESCORE_PRECISIONS = ("float32", "float16", "int8")
+
+# Per-repo overrides of all three ({"index": ..., "search": ..., "storage": ...}),
+# e.g. saved by scripts/tune_retrieval.py; the settings a collection was
+# built with are saved next to it
+RETRIEVAL_CONFIG_DIR = os.path.join("data", "retrieval_config")
+RETRIEVAL_CONFIG_FILE = "retrieval_config.json"
+RESCORE_FILE = "rescore_vectors.npz"
+
+# Extensions we are willing to read as text
+READABLE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".kt", ".go",
+    ".cs", ".cpp", ".c", ".rs", ".rb", ".swift", ".scala",
+    ".md", ".txt", ".rst", ".toml", ".yaml", ".yml", ".json",
+    ".cfg", ".ini", ".env", ".gradle", ".xml", ".sh", ".bat",
+    ".kts", ".pro", ".csv", ".ipynb",
+}
+
+@lru_cache(maxsize=None)
+def _splitter_for(lang: str | None) -> "RecursiveCharacterTextSplitter":
+    """Builds (once per language) the splitter used for that language."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter, Language
 
-def _get_splitter(file_path: str) -> RecursiveCharacterTextSplitter:
-    """Returns a language-aware splitter for code files, generic splitter otherwise."""
-    ext = os.path.splitext(file_path)[1].lower()
-    lang = _LANG_MAP.get(ext)
     if lang:
         return RecursiveCharacterTextSplitter.from_language(
-            language=lang, chunk_size=800, chunk_overlap=100
+            language=Language(lang), chunk_size=800, chunk_overlap=100
         )
-    return _FALLBACK_SPLITTER
+    return RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
 
-def ingest_repo(repo_name: str, file_paths: list[str], repo_root: str):
+def _get_splitter(file_path: str) -> "RecursiveCharacterTextSplitter":
+    """Returns a language-aware splitter for code files, generic splitter otherwise."""
+    ext = os.path.splitext(file_path)[1].lower()
+    return _splitter_for(_LANG_MAP.get(ext))
+
+def split_file(file_path: str, content: str, metadata: dict, chunker: str = "symbol") -> list:
+    """
+    Splits one file into Documents.
+
+    "symbol" (default) emits whole functions/classes/sections up to a token
+    budget with symbol/kind metadata (see chunker.py); "legacy" uses the
+    800-char recursive splitter with 100-char overlap.
+
+    Every chunk records its ordinal in the file (`chunk_index`) and its line
+    range so neighbours can be fetched later (see expand_hit). `split_symbol`
+    marks chunks of a symbol that didn't fit in one chunk.
+    """
+    from langchain_core.documents import Document
+
+    if chunker == "legacy":
+        docs = _get_splitter(file_path).split_documents([Document(page_content=content, metadata=metadata)])
+        offset = 0
+        for i, doc in enumerate(docs):
+            # The splitter doesn't report positions; locate the chunk (chunks overlap by <= 100 chars)
+            found = content.find(doc.page_content, max(offset - 100, 0))
+            found = found if found >= 0 else offset
+            offset = found + len(doc.page_content)
+            start_line = content.count("\n", 0, found) + 1
+            doc.metadata.update(
+                chunk_index=i,
+                start_line=start_line,
+                end_line=start_line + doc.page_content.count("\n"),
+                split_symbol=False,
+            )
+        return docs
+
+    chunks = chunk_file(file_path, content)
+    docs = []
+    for i, chunk in enumerate(chunks):
+        key = (chunk["symbol"], chunk["kind"])
+        neighbours = chunks[max(i - 1, 0):i] + chunks[i + 1:i + 2]
+        docs.append(Document(
+            page_content=chunk["content"],
+            metadata={
+                **metadata,
+                "symbol": chunk["symbol"],
+                "kind": chunk["kind"],
+                "start_line": chunk["start_line"],
+                "end_line": chunk["end_line"],
+                "chunk_index": i,
+                "split_symbol": bool(chunk["symbol"]) and any((n["symbol"], n["kind"]) == key for n in neighbours),
+            }
+        ))
+    return docs
+
+def retrieval_config(repo_name: str, overrides: Optional[dict] = None) -> dict:
+    """
+    Index, search and storage parameters for a new collection of the repo:
+    the defaults, updated from data/retrieval_config/<repo>.json if present,
+    then from overrides (same {"index": ..., "search": ..., "storage": ...} layout).
+    """
+    config = {"index": dict(INDEX_PARAMS), "search": dict(RETRIEVER_SEARCH_KWARGS), "storage": dict(STORAGE_PARAMS)}
+    layers = [overrides or {}]
+    path = os.path.join(os.getcwd(), RETRIEVAL_CONFIG_DIR, f"{repo_name}.json")
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                layers.insert(0, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Could not read {path}: {e}")
+    for layer in layers:
+        for key in config:
+            config[key].update(layer.get(key, {}))
+    return config
+
+def collection_metadata(index_params: dict) -> dict:
+    """Chroma collection metadata setting the HNSW parameters."""
+    return {f"hnsw:{name}": value for name, value in index_params.items()}
+
+def ingest_repo(repo_name: str, file_paths: list[str], repo_root: str, chunker: str = "symbol", dedupe: bool = True,
+                small_repo_tokens: int = SMALL_REPO_TOKENS, retrieval_overrides: Optional[dict] = None):
     """
     Ingests a list of files into a persistent ChromaDB collection dedicated to the repo.
-    Each file is split with a language-aware splitter based on its extension.
+    Each file is split into whole symbols (or with the legacy splitter, see split_file).
+    Files are read with per-file byte limits; binary, minified and oversized
+    files are skipped (see loader.py). Large data files are reduced to their
+    structure and notebooks to their cells (see extractors.py). Skipped,
+    truncated and reduced files are printed and saved to ingest_report.json
+    next to the collection. With dedupe, near-duplicate chunks are embedded
+    once (see dedup.py). Every chunk carries the role of its file (see
+    routing.py) so retrieval can be filtered per section. Results of the
+    canonical section, profiler and baseline queries are precomputed into
+    retrieval_bundles.json (see bundles.py). The HNSW index and retriever
+    parameters come from retrieval_config (retrieval_overrides on top) and
+    are saved to retrieval_config.json next to the collection. With reduced
+    storage the index keeps truncated vectors and, optionally, a quantized
+    full-dimension copy for rescoring (see compact.py).
+
+    If all files together are at most small_repo_tokens tokens (0 disables
+    this), nothing is embedded: they are packed into whole_context.json and
+    agents use load_whole_context instead of the vector store.
     """
     print(f"[{repo_name}] Starting ingestion of {len(file_paths)} files...")
 
-    # Extensions we are willing to read as text
-    READABLE_EXTENSIONS = {
-        ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".kt", ".go",
-        ".cs", ".cpp", ".c", ".rs", ".rb", ".swift", ".scala",
-        ".md", ".txt", ".rst", ".toml", ".yaml", ".yml", ".json",
-        ".cfg", ".ini", ".env", ".gradle", ".xml", ".sh", ".bat",
-        ".kts", ".pro",
-    }
+    snapshot = get_snapshot(repo_root)
 
     def collect_paths(base_root: str, rel_path: str) -> list[str]:
         """Returns readable file paths under rel_path (handles both files and dirs)."""
-        full = os.path.join(base_root, rel_path)
-        if os.path.isfile(full):
-            ext = os.path.splitext(full)[1].lower()
+        rel_path = os.path.normpath(rel_path).replace(os.sep, "/")
+        entry = snapshot.by_path.get(rel_path)
+        if entry is None and os.path.isfile(os.path.join(base_root, rel_path)):
+            # Inside a directory the snapshot doesn't list (e.g. node_modules)
+            entry = {"path": rel_path, "is_dir": False}
+        if entry is None:
+            return []
+        if not entry["is_dir"]:
+            ext = os.path.splitext(rel_path)[1].lower()
             if ext in READABLE_EXTENSIONS or ext == "":
                 return [rel_path]
             return []
-        if os.path.isdir(full):
-            found = []
-            for root, _, files in os.walk(full):
-                for fname in files:
-                    ext = os.path.splitext(fname)[1].lower()
-                    if ext in READABLE_EXTENSIONS:
-                        abs_f = os.path.join(root, fname)
-                        found.append(os.path.relpath(abs_f, base_root))
-            return found
-        return []
+        return [
+            e["path"] for e in snapshot.files_under(rel_path)
+            if os.path.splitext(e["path"])[1].lower() in READABLE_EXTENSIONS
+        ]
 
-    splits = []
+    files = []
+    report = {"files": 0, "bytes_read": 0, "truncated": [], "skipped": [], "extracted": []}
 
     for relative_path in file_paths:
         for resolved_path in collect_paths(repo_root, relative_path):
             full_path = os.path.join(repo_root, resolved_path)
-            try:
-                with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-                    if not content.strip():
-                        continue
-                    doc = Document(
-                        page_content=content,
-                        metadata={"source": resolved_path, "repo_name": repo_name}
-                    )
-                    splitter = _get_splitter(resolved_path)
-                    splits.extend(splitter.split_documents([doc]))
-            except Exception as e:
-                print(f"[{repo_name}] Failed to read {resolved_path}: {e}")
+            if has_extractor(resolved_path) and not is_key_file(resolved_path):
+                # Only the structure is kept, so read more and allow long lines
+                content, status = read_text_file(full_path, extract_read_bytes(resolved_path), check_minified=False)
+            else:
+                content, status = read_text_file(full_path)
+            if content is None:
+                if status != "empty":
+                    report["skipped"].append({"path": resolved_path, "reason": status})
+                continue
+            if status == "truncated":
+                report["truncated"].append(resolved_path)
+            report["files"] += 1
+            report["bytes_read"] += len(content.encode("utf-8"))
+            entry = snapshot.by_path.get(resolved_path) or {}
+            metadata = {"source": resolved_path, "repo_name": repo_name,
+                        "role": chunk_role(resolved_path, entry.get("language"))}
+            extracted = extract_content(resolved_path, content)
+            if extracted is not None:
+                report["extracted"].append({"path": resolved_path, "chars": len(content), "kept": len(extracted)})
+                if not extracted.strip():
+                    # Only notebooks reduce to nothing (no cells, or not valid JSON)
+                    report["skipped"].append({"path": resolved_path, "reason": notebook_skip_reason(content)})
+                    continue
+                content = extracted
+                metadata["extracted"] = True
+            files.append((resolved_path, content, metadata))
 
-    if not splits:
+    print(f"[{repo_name}] Read {report['files']} files ({report['bytes_read'] / 1000:.0f} KB): "
+          f"{len(report['truncated'])} truncated, {len(report['skipped'])} skipped.")
+    for item in report["skipped"]:
+        print(f"[{repo_name}]   skipped {item['path']} ({item['reason']})")
+    for path in report["truncated"]:
+        print(f"[{repo_name}]   truncated {path}")
+    if report["extracted"]:
+        before = sum(e["chars"] for e in report["extracted"])
+        after = sum(e["kept"] for e in report["extracted"])
+        print(f"[{repo_name}] Reduced {len(report['extracted'])} data files/notebooks to their structure: "
+              f"{before / 1000:.0f}K -> {after / 1000:.0f}K chars.")
+
+    if not files:
         print(f"[{repo_name}] No documents to ingest.")
         return
 
-    print(f"[{repo_name}] Created {len(splits)} chunks.")
-
     persist_dir = os.path.join(os.getcwd(), "knowledge_base", repo_name)
 
     if os.path.exists(persist_dir):
         shutil.rmtree(persist_dir)
 
-    Chroma.from_documents(
-        documents=splits,
-        embedding=OpenAIEmbeddings(model="text-embedding-3-small"),
-        persist_directory=persist_dir
-    )
+    report["tokens"] = sum(count_tokens(content) for _, content, _ in files)
+    if report["tokens"] <= small_repo_tokens:
+        # Small enough for one prompt: no chunking, no embeddings
+        os.makedirs(persist_dir, exist_ok=True)
+        with open(os.path.join(persist_dir, WHOLE_CONTEXT_FILE), "w") as f:
+            json.dump({"tokens": report["tokens"],
+                       "files": [{"source": path, "content": content} for path, content, _ in files]}, f)
+        report["context_path"] = "whole_repo"
+        with open(os.path.join(persist_dir, "ingest_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[{repo_name}] {report['tokens']} tokens <= {small_repo_tokens}: packed {len(files)} files "
+              f"into {WHOLE_CONTEXT_FILE}, skipping the vector store.")
+        return
+
+    splits = []
+    for resolved_path, content, metadata in files:
+        try:
+            splits.extend(split_file(resolved_path, content, metadata, chunker=chunker))
+        except Exception as e:
+            print(f"[{repo_name}] Failed to split {resolved_path}: {e}")
+
+    print(f"[{repo_name}] Created {len(splits)} chunks.")
+
+    if dedupe:
+        total = len(splits)
+        splits, removed = dedupe_documents(splits)
+        report["duplicates_removed"] = removed
+        report["dedup_ratio"] = round(removed / total, 4) if total else 0.0
+        print(f"[{repo_name}] Removed {removed} near-duplicate chunks ({report['dedup_ratio']:.1%}), embedding {len(splits)}.")
+
+    if not splits:
+        print(f"[{repo_name}] No documents to ingest.")
+        return
+
+    from langchain_chroma import Chroma
+    from langchain_openai import OpenAIEmbeddings
+
+    config = retrieval_config(repo_name, retrieval_overrides)
+    storage = config["storage"]
+    if storage["rescore"] and not storage["dimensions"]:
+        print(f"[{repo_name}] rescore needs reduced dimensions; storing full vectors without a rescoring copy.")
+        storage["rescore"] = None
+    embedding = OpenAIEmbeddings(model="text-embedding-3-small")
+    if storage["dimensions"]:
+        from src.vector_store.compact import RecordingEmbeddings, save_rescore_vectors
+
+        recorder = RecordingEmbeddings(embedding, storage["dimensions"])
+        ids = [str(i) for i in range(len(splits))]
+        Chroma.from_documents(
+            documents=splits,
+            embedding=recorder,
+            ids=ids,
+            persist_directory=persist_dir,
+            collection_metadata=collection_metadata(config["index"])
+        )
+        if storage["rescore"]:
+            save_rescore_vectors(os.path.join(persist_dir, RESCORE_FILE), ids,
+                                 [recorder.full[d.page_content] for d in splits], storage["rescore"])
+    else:
+        db = Chroma.from_documents(
+            documents=splits,
+            embedding=embedding,
+            persist_directory=persist_dir,
+            collection_metadata=collection_metadata(config["index"])
+        )
+    with open(os.path.join(persist_dir, RETRIEVAL_CONFIG_FILE), "w") as f:
+        json.dump(config, f, indent=2)
+    if storage["dimensions"]:
+        # Reopened so searches embed queries at full dimension (see CompactChroma)
+        db = get_vector_store(repo_name)
+    report["chunks"] = len(splits)
+    report["context_path"] = "vector_store"
+    report["retrieval_config"] = config
+    try:
+        report["bundles"] = build_bundles(repo_name, db, config["search"])
+        print(f"[{repo_name}] Precomputed {report['bundles']} retrieval bundles.")
+    except Exception as e:
+        print(f"[{repo_name}] Could not precompute retrieval bundles: {e}")
+    with open(os.path.join(persist_dir, "ingest_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
     print(f"[{repo_name}] Successfully ingested into {persist_dir}")
 
-def get_vector_store(repo_name: str) -> VectorStore:
+def _whole_context_path(repo_name: str) -> str:
+    return os.path.join(os.getcwd(), "knowledge_base", repo_name, WHOLE_CONTEXT_FILE)
+
+def context_path(repo_name: str) -> str:
+    """How agents get context for the repo: "whole_repo" (small-repo fast path) or "vector_store"."""
+    return "whole_repo" if os.path.exists(_whole_context_path(repo_name)) else "vector_store"
+
+def load_whole_context(repo_name: str) -> Optional[str]:
+    """
+    Every ingested file of a small repo, packed as one context string, or
+    None if the repo was ingested into a vector store.
+    """
+    path = _whole_context_path(repo_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+        return None
+    return "\n\n".join(f"--- SOURCE: {item['source']} ---\n{item['content']}" for item in data["files"])
+
+def get_vector_store(repo_name: str) -> "VectorStore":
     """
     Loads and returns the existing vector store for a given repository.
     """
     persist_dir = os.path.join(os.getcwd(), "knowledge_base", repo_name)
     if not os.path.exists(persist_dir):
         raise ValueError(f"No vector store found for {repo_name} at {persist_dir}")
-        
+    if context_path(repo_name) == "whole_repo":
+        raise ValueError(f"{repo_name} was ingested without a vector store (small repo); use load_whole_context")
+
+    from langchain_chroma import Chroma
+    from langchain_openai import OpenAIEmbeddings
+
+    embedding = OpenAIEmbeddings(model="text-embedding-3-small")
+    storage = saved_retrieval_config(repo_name)["storage"]
+    if storage["dimensions"]:
+        from src.vector_store.compact import CompactChroma
+
+        rescore_path = os.path.join(persist_dir, RESCORE_FILE)
+        return CompactChroma(
+            persist_directory=persist_dir,
+            embedding_function=embedding,
+            dimensions=storage["dimensions"],
+            rescore_path=rescore_path if storage["rescore"] and os.path.exists(rescore_path) else None
+        )
     return Chroma(
         persist_directory=persist_dir,
-        embedding_function=OpenAIEmbeddings(model="text-embedding-3-small")
+        embedding_function=embedding
     )
 
-def get_retriever(vector_store: VectorStore) -> BaseRetriever:
+def saved_retrieval_config(repo_name: str) -> dict:
+    """Settings the repo's collection was ingested with (defaults for older collections)."""
+    config = {"index": dict(INDEX_PARAMS), "search": dict(RETRIEVER_SEARCH_KWARGS), "storage": dict(STORAGE_PARAMS)}
+    path = os.path.join(os.getcwd(), "knowledge_base", repo_name, RETRIEVAL_CONFIG_FILE)
+    try:
+        with open(path, "r") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return config
+    for key in config:
+        config[key].update(saved.get(key, {}))
+    return config
+
+def search_kwargs(repo_name: str) -> dict:
+    """MMR parameters the repo's collection was ingested (and its bundles built) with."""
+    return saved_retrieval_config(repo_name)["search"]
+
+def get_retriever(vector_store: "VectorStore", kwargs: Optional[dict] = None) -> "BaseRetriever":
     """
-    Returns a retriever from the vector store.
+    Returns an MMR retriever from the vector store (RETRIEVER_SEARCH_KWARGS
+    unless kwargs are given).
     """
     return vector_store.as_retriever(
         search_type="mmr",
-        search_kwargs={"k": 8, "fetch_k": 20, "lambda_mult": 0.5}
+        search_kwargs=kwargs or RETRIEVER_SEARCH_KWARGS
+    )
+
+def search(vector_store: "VectorStore", repo_name: str, query: str, roles: Optional[list] = None) -> list:
+    """
+    Top hits for query: the bundle precomputed at ingestion when the query is
+    a canonical one (see bundles.py), otherwise a live MMR search. With roles
+    (see routing.section_roles) the live search only considers chunks of
+    those file roles.
+    """
+    docs = get_bundle(repo_name, query)
+    if docs is not None:
+        return docs
+    kwargs = search_kwargs(repo_name)
+    if roles:
+        vector = vector_store.embeddings.embed_query(query)
+        return routed_search_by_vector(vector_store, vector, roles, kwargs)
+    return get_retriever(vector_store, kwargs).invoke(query)
+
+# Token budget for a retrieved chunk expanded with its neighbours
+EXPAND_TOKEN_BUDGET = 700
+
+# Characters of a retrieved chunk passed to the agents. Expanded chunks are
+# already bounded by EXPAND_TOKEN_BUDGET and passed whole.
+MAX_CHUNK_CHARS = 1500
+
+def get_neighbor_chunks(vector_store: "VectorStore", source: str, indices: list[int]) -> dict:
+    """Fetches chunks of `source` by chunk_index. Returns {chunk_index: Document}."""
+    from langchain_core.documents import Document
+
+    if not indices:
+        return {}
+    result = vector_store.get(
+        where={"$and": [{"source": source}, {"chunk_index": {"$in": indices}}]},
+        include=["documents", "metadatas"],
     )
+    return {
+        meta["chunk_index"]: Document(page_content=text, metadata=meta)
+        for text, meta in zip(result["documents"], result["metadatas"])
+    }
+
+def expand_hit(vector_store: "VectorStore", doc, max_tokens: int = EXPAND_TOKEN_BUDGET, window: int = 3):
+    """
+    Expands a retrieved chunk with adjacent chunks from the same file, up to
+    max_tokens. Chunks of the same symbol (the rest of a split function) are
+    added first, then the nearest neighbours, alternating after/before.
+    Returns the original Document if there is nothing to add.
+    """
+    from langchain_core.documents import Document
+
+    meta = doc.metadata
+    index = meta.get("chunk_index")
+    if index is None or "source" not in meta:
+        return doc
+
+    candidates = [i for step in range(1, window + 1) for i in (index + step, index - step) if i >= 0]
+    neighbours = get_neighbor_chunks(vector_store, meta["source"], candidates)
+    key = (meta.get("symbol"), meta.get("kind"))
+    same_symbol = [i for i in candidates if i in neighbours and (neighbours[i].metadata.get("symbol"), neighbours[i].metadata.get("kind")) == key]
+    others = [i for i in candidates if i in neighbours and i not in same_symbol]
+
+    selected = {index: doc}
+    tokens = count_tokens(doc.page_content)
+    for i in same_symbol + others:
+        # Only grow a contiguous range
+        if i - 1 not in selected and i + 1 not in selected:
+            continue
+        cost = count_tokens(neighbours[i].page_content)
+        if tokens + cost > max_tokens:
+            continue
+        selected[i] = neighbours[i]
+        tokens += cost
+    if len(selected) == 1:
+        return doc
+
+    ordered = [selected[i] for i in sorted(selected)]
+    return Document(
+        page_content="\n".join(d.page_content for d in ordered),
+        metadata={
+            **meta,
+            "start_line": ordered[0].metadata.get("start_line"),
+            "end_line": ordered[-1].metadata.get("end_line"),
+            "expanded_chunks": sorted(selected),
+        }
+    )
+
+def expand_hits(vector_store: "VectorStore", docs: list, max_tokens: int = EXPAND_TOKEN_BUDGET) -> list:
+    """
+    Expands only the hits that were cut out of a larger symbol; the others are
+    returned as-is, so neighbours are fetched (and paid for) only where needed.
+    Hits already covered by an earlier expansion are dropped.
+    """
+    expanded, covered = [], set()
+    for doc in docs:
+        key = (doc.metadata.get("source"), doc.metadata.get("chunk_index"))
+        if key in covered:
+            continue
+        if doc.metadata.get("split_symbol"):
+            try:
+                doc = expand_hit(vector_store, doc, max_tokens=max_tokens)
+            except Exception as e:
+                print(f"Neighbour expansion failed for {key[0]}: {e}")
+        for i in doc.metadata.get("expanded_chunks", [key[1]]):
+            covered.add((key[0], i))
+        expanded.append(doc)
+    return expanded
+
+def chunk_text(doc) -> str:
+    """Content of a retrieved chunk as passed to an agent."""
+    if doc.metadata.get("expanded_chunks"):
+        return doc.page_content
+    return doc.page_content[:MAX_CHUNK_CHARS]
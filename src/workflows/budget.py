@@ -0,0 +1,171 @@
+import threading
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.utils.tokens import count_tokens
+
+# Degradation stages, in order. Each stage keeps the restrictions of the
+# previous ones.
+STAGE_FULL = "full"
+STAGE_REDUCED_CONTEXT = "reduced_context"   # retrieve fewer chunks per call
+STAGE_NO_RETRIES = "no_retries"             # stop sending failed sections back to writers
+STAGE_FINISH = "finish"                     # deterministic FINISH + assembly
+
+_STAGE_ORDER = [STAGE_FULL, STAGE_REDUCED_CONTEXT, STAGE_NO_RETRIES, STAGE_FINISH]
+
+# Fraction of the budget at which each stage starts. FINISH leaves headroom for
+# the final aggregation call.
+DEFAULT_THRESHOLDS = {
+    STAGE_REDUCED_CONTEXT: 0.5,
+    STAGE_NO_RETRIES: 0.7,
+    STAGE_FINISH: 0.85,
+}
+
+# USD per 1M tokens (prompt, completion).
+MODEL_PRICING = {
+    "gpt-5.1": (1.25, 10.0),
+}
+
+class TokenBudget(BaseCallbackHandler):
+    """
+    Per-repository token/cost budget.
+
+    Registered as a LangChain callback so every LLM call in the run is
+    accounted for: the prompt is estimated with tiktoken when the call starts
+    (so parallel writers/reviewers see each other's in-flight spend) and the
+    estimate is replaced by the provider's reported usage when it ends.
+    Agents consult `stage()` to degrade gracefully as the budget runs out.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        model_name: str = "gpt-5.1",
+        thresholds: Optional[Dict[str, float]] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.prompt_price, self.completion_price = MODEL_PRICING.get(model_name, MODEL_PRICING["gpt-5.1"])
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+        self._in_flight: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+        self._lowest_stage = STAGE_FULL
+
+    # --- Accounting ---------------------------------------------------------
+
+    def _reserve(self, run_id: UUID, text: str):
+        estimate = count_tokens(text)
+        with self._lock:
+            self._in_flight[run_id] = estimate
+            self.prompt_tokens += estimate
+            self.calls += 1
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs):
+        self._reserve(run_id, "\n".join(prompts))
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs):
+        text = "\n".join(str(m.content) for batch in messages for m in batch)
+        self._reserve(run_id, text)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        with self._lock:
+            estimate = self._in_flight.pop(run_id, 0)
+            if usage:
+                self.prompt_tokens += usage.get("prompt_tokens", 0) - estimate
+                self.completion_tokens += usage.get("completion_tokens", 0)
+            else:
+                text = "".join(g.text for gens in response.generations for g in gens)
+                self.completion_tokens += count_tokens(text)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        # The prompt was (most likely) billed; keep the estimate.
+        with self._lock:
+            self._in_flight.pop(run_id, None)
+
+    # --- Queries ------------------------------------------------------------
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cost(self) -> float:
+        return (self.prompt_tokens * self.prompt_price + self.completion_tokens * self.completion_price) / 1_000_000
+
+    def used_fraction(self) -> float:
+        fractions = [0.0]
+        if self.max_tokens:
+            fractions.append(self.total_tokens / self.max_tokens)
+        if self.max_cost:
+            fractions.append(self.cost / self.max_cost)
+        return max(fractions)
+
+    def remaining_tokens(self) -> Optional[int]:
+        if not self.max_tokens:
+            return None
+        return max(self.max_tokens - self.total_tokens, 0)
+
+    def remaining_cost(self) -> Optional[float]:
+        if not self.max_cost:
+            return None
+        return max(self.max_cost - self.cost, 0.0)
+
+    def stage(self) -> str:
+        """Current degradation stage. Stages never move back to a laxer one."""
+        used = self.used_fraction()
+        current = STAGE_FULL
+        for stage in _STAGE_ORDER[1:]:
+            if used >= self.thresholds[stage]:
+                current = stage
+        with self._lock:
+            if _STAGE_ORDER.index(current) > _STAGE_ORDER.index(self._lowest_stage):
+                print(f"Token budget: {used:.0%} used, entering stage '{current}'.")
+                self._lowest_stage = current
+            return self._lowest_stage
+
+    def at_least(self, stage: str) -> bool:
+        return _STAGE_ORDER.index(self.stage()) >= _STAGE_ORDER.index(stage)
+
+    def exhausted(self) -> bool:
+        """Whether the run should stop and finish deterministically."""
+        return self.at_least(STAGE_FINISH)
+
+    def context_chunks(self, default: int) -> int:
+        """Number of retrieved chunks an agent should use at the current stage."""
+        if self.at_least(STAGE_REDUCED_CONTEXT):
+            return max(1, default // 2)
+        return default
+
+    def fits(self, text: str, completion_ratio: float = 0.0) -> bool:
+        """
+        Whether a prompt of this size (plus an expected completion of
+        completion_ratio times its size) still fits in the remaining budget,
+        in tokens and in cost.
+        """
+        prompt = count_tokens(text)
+        completion = prompt * completion_ratio
+        remaining = self.remaining_tokens()
+        if remaining is not None and prompt + completion >= remaining:
+            return False
+        remaining_cost = self.remaining_cost()
+        cost = (prompt * self.prompt_price + completion * self.completion_price) / 1_000_000
+        return remaining_cost is None or cost < remaining_cost
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "budget_max_tokens": self.max_tokens,
+            "budget_max_cost": self.max_cost,
+            "budget_prompt_tokens": self.prompt_tokens,
+            "budget_completion_tokens": self.completion_tokens,
+            "budget_estimated_cost": round(self.cost, 4),
+            "budget_llm_calls": self.calls,
+            "budget_stage": self._lowest_stage,
+        }
@@ -0,0 +1,43 @@
+import time
+from typing import Any, Dict, Optional
+
+class Deadline:
+    """
+    Wall-clock deadline for a README generation run.
+
+    Once less than `reserve` seconds remain the run winds down: no new review
+    rounds are started, the remaining unwritten sections are written in one
+    parallel wave, and whatever is approved (or was written in that wave) is
+    aggregated.
+    """
+
+    def __init__(self, seconds: float, reserve: Optional[float] = None, start: Optional[float] = None):
+        self.seconds = seconds
+        # Enough time for one writer wave plus aggregation
+        self.reserve = reserve if reserve is not None else seconds * 0.25
+        self.start = start if start is not None else time.time()
+        self.wound_down_at: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return time.time() - self.start
+
+    def remaining(self) -> float:
+        return self.seconds - self.elapsed()
+
+    def near(self) -> bool:
+        """Whether the run should wind down."""
+        is_near = self.remaining() <= self.reserve
+        if is_near and self.wound_down_at is None:
+            self.wound_down_at = self.elapsed()
+            print(f"Deadline: {self.remaining():.1f}s of {self.seconds:.0f}s left, winding down.")
+        return is_near
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "deadline_seconds": self.seconds,
+            "deadline_wound_down_at": round(self.wound_down_at, 2) if self.wound_down_at is not None else None,
+            "deadline_met": not self.expired(),
+        }
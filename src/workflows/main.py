@@ -7,14 +7,16 @@ import sys
 import os
 import time
 import json
+from functools import lru_cache
 from langchain_core.callbacks import BaseCallbackHandler
-from langchain_core.outputs import LLMResult
 sys.path.append(os.getcwd())
-from typing import TypedDict, Annotated, List, Dict, Any, Union
-from langgraph.graph import StateGraph, END, START
-from langgraph.types import Send
+from typing import TYPE_CHECKING, TypedDict, Annotated, List, Dict, Any, Union
 
-from langgraph.types import Send
+if TYPE_CHECKING:
+    from langchain_core.outputs import LLMResult
+
+# langgraph is imported lazily (see build_workflow / the dispatchers) so that
+# `--help` and `--validate-plan` do not pay for it at startup.
 
 from src.models.repo_profile import RepoProfile
 from src.models.readme_plan import ReadmePlan, ReadmeSectionResult as ReadmeSection
@@ -23,14 +25,27 @@ from src.agents.repo_profiler import UnifiedRepoProfiler
 from src.agents.readme_planner import ReadmePlanner
 from src.agents.writer_core import CoreWriter
 from src.agents.writer_optional import OptionalWriter
-from src.agents.reviewer import Reviewer
+from src.agents.writer_batch import BatchWriter
+from src.agents.reviewer import Reviewer, ReviewResult
+from src.agents.static_reviewer import StaticReviewer
 from src.agents.aggregator import Aggregator
 from src.ingestion.utils.file_scanner import generate_file_tree
+from src.workflows.budget import TokenBudget, STAGE_NO_RETRIES
+from src.workflows.deadline import Deadline
+from src.utils.tokens import count_tokens
+from src.vector_store.store import context_path
 
 
 from dotenv import load_dotenv
 load_dotenv()
 
+def merge_counts(x: Dict[str, int], y: Dict[str, int]) -> Dict[str, int]:
+    """State reducer that sums counters written by parallel nodes."""
+    merged = dict(x)
+    for key, value in y.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
 class WorkflowState(TypedDict):
     repo_name: str
     repo_path: str
@@ -43,8 +58,17 @@ class WorkflowState(TypedDict):
     
     iteration: int
     decision: OrchestratorDecision | None
-    phase: str # PROFILE, PLAN, EXECUTION
+    phase: str # PROFILE, PLAN, EXECUTION, WIND_DOWN
     section_retries: Annotated[Dict[str, int], lambda x, y: {**x, **y}]
+    budget: Any # TokenBudget | None, shared by every node of the run
+    deadline: Any # Deadline | None
+    batch_writing: bool # write each DELEGATE group in one call per section type
+    batch_review: bool # review short sections together in one call
+    run_stats: Annotated[Dict[str, int], merge_counts] # counters reported at the end of the run
+    review_fastpath: bool # apply the reviewer's rewritten_content instead of a writer round-trip
+    fastpath_sections: Annotated[Dict[str, int], lambda x, y: {**x, **y}] # section -> iteration it was patched in
+    section_context: Annotated[Dict[str, str], lambda x, y: {**x, **y}] # section -> context its writer retrieved, reused by the reviewer
+    review_retrieval: bool # reviewer also runs its own verification search
 
 class TokenCountingCallback(BaseCallbackHandler):
     def __init__(self):
@@ -52,24 +76,49 @@ class TokenCountingCallback(BaseCallbackHandler):
         self.prompt_tokens = 0
         self.completion_tokens = 0
 
-    def on_llm_end(self, response: LLMResult, **kwargs):
+    def on_llm_end(self, response: "LLMResult", **kwargs):
         if response.llm_output and "token_usage" in response.llm_output:
             usage = response.llm_output["token_usage"]
             self.total_tokens += usage.get("total_tokens", 0)
             self.prompt_tokens += usage.get("prompt_tokens", 0)
             self.completion_tokens += usage.get("completion_tokens", 0)
 
+CORE_SECTION_IDS = {"project_title", "project_overview", "features", "installation", "requirements_dependencies", "usage", "examples"}
+
+# Upper bound on sections per batched writer call, to keep completions bounded
+BATCH_WRITE_MAX_SECTIONS = 6
+
+# Sections longer than this are reviewed on their own in batch-review mode
+BATCH_REVIEW_MAX_SECTION_TOKENS = 800
+BATCH_REVIEW_MAX_SECTIONS = 8
+
+# Token budget for the file tree in the profiler prompt; large directories are summarized
+PROFILE_TREE_TOKENS = 1000
+
 def orchestrator_node(state: WorkflowState):
     agent = Orchestrator()
+    previous = state.get("decision")
     decision = agent.decide(state)
-    return {"decision": decision, "iteration": state["iteration"] + 1}
+    updates = {"decision": decision, "iteration": state["iteration"] + 1}
+
+    # A review round in which every failure was patched in place by the
+    # reviewer needs no DELEGATE round and no follow-up REVIEW decision.
+    if previous is not None and previous.decision == "REVIEW":
+        round_targets = previous.target_sections
+        patched = [sid for sid in round_targets if state.get("fastpath_sections", {}).get(sid) == state["iteration"]]
+        if patched and not any(state["section_status"].get(sid) == "fail" for sid in round_targets):
+            updates["run_stats"] = {"fastpath_orchestrator_calls_saved": 2}
+    deadline = state.get("deadline")
+    if decision.decision == "DELEGATE" and deadline is not None and deadline.near():
+        updates["phase"] = "WIND_DOWN"
+    return updates
 
 def profiler_node(state: WorkflowState):
     agent = UnifiedRepoProfiler()
 
-    file_tree = generate_file_tree(state["repo_path"], max_depth=2)
+    file_tree = generate_file_tree(state["repo_path"], max_tokens=PROFILE_TREE_TOKENS)
     
-    profile = agent.profile(state["repo_name"], file_tree)
+    profile = agent.profile(state["repo_name"], file_tree, repo_path=state["repo_path"])
     return {"profile": profile, "phase": "PLANNING"}
 
 def planner_node(state: WorkflowState):
@@ -83,16 +132,33 @@ def writer_dispatcher(state: WorkflowState):
     Dispatcher to send to correct writer based on section type.
     This isn't a node, it's a conditional edge destination generator.
     """
+    from langgraph.types import Send
+
     decision = state["decision"]
     targets = decision.target_sections
     
     tasks = []
     plan = state["plan"]
     
+    if state.get("batch_writing"):
+        groups = {"core": [], "optional": []}
+        for section in plan.sections:
+            if section.id in targets:
+                groups["core" if section.id in CORE_SECTION_IDS else "optional"].append(section)
+        for section_type, sections in groups.items():
+            for i in range(0, len(sections), BATCH_WRITE_MAX_SECTIONS):
+                batch = sections[i:i + BATCH_WRITE_MAX_SECTIONS]
+                if len(batch) == 1:
+                    # Nothing to share; use the regular single-section writer
+                    tasks.append(Send(f"{section_type}_writer", {"section": batch[0], "state": state}))
+                else:
+                    tasks.append(Send("batch_writer", {"sections": batch, "section_type": section_type, "state": state}))
+        return tasks
+
     for section in plan.sections:
         if section.id in targets:
             # Determine type
-            if section.id in ["project_title", "project_overview", "features", "installation", "requirements_dependencies", "usage", "examples"]:
+            if section.id in CORE_SECTION_IDS:
                 tasks.append(Send("core_writer", {"section": section, "state": state}))
             else:
                 tasks.append(Send("optional_writer", {"section": section, "state": state}))
@@ -101,93 +167,337 @@ class WriterInput(TypedDict):
     section: ReadmeSection
     state: WorkflowState
 
-def core_writer_node(input: WriterInput):
-    section = input["section"]
-    state = input["state"]
-    agent = CoreWriter()
-    
-    instructions = (section.instructions or "") + "\n" + (state["decision"].instructions or "")
+class BatchWriterInput(TypedDict):
+    sections: List[ReadmeSection]
+    section_type: str
+    state: WorkflowState
+
+class BatchReviewerInput(TypedDict):
+    sections: List[ReadmeSection]
+    state: WorkflowState
+
+def build_writer_instructions(section: ReadmeSection, state: WorkflowState) -> str:
+    """Planner + orchestrator instructions, plus review feedback when rewriting."""
     instructions = (section.instructions or "") + "\n" + (state["decision"].instructions or "")
     feedback = state["review_feedback"].get(section.id, "")
     if feedback:
         instructions += f"\n\nCRITICAL: Previous review feedback - {feedback}\n"
         instructions += "IMPORTANT: When rewriting, COMPLETELY REPLACE the current content. Do NOT append or merge. Remove any redundant information mentioned in the feedback."
+    return instructions
 
-    content = agent.write(state["profile"], section.title, instructions, current_content=state["sections_content"].get(section.id, ""))
+def core_writer_node(input: WriterInput):
+    section = input["section"]
+    state = input["state"]
+    agent = CoreWriter()
+    budget = state.get("budget")
+    max_chunks = budget.context_chunks(5) if budget is not None else 5
+    
+    instructions = build_writer_instructions(section, state)
+
+    content = agent.write(state["profile"], section.title, instructions, current_content=state["sections_content"].get(section.id, ""), max_chunks=max_chunks, section_id=section.id)
     return {
         "sections_content": {section.id: content}, 
-        "section_status": {section.id: "review_pending"}
+        "section_status": {section.id: "review_pending"},
+        "section_context": {section.id: agent.last_context},
+        "run_stats": {"writer_llm_calls": 1}
     }
 
 def optional_writer_node(input: WriterInput):
     section = input["section"]
     state = input["state"]
     agent = OptionalWriter()
+    budget = state.get("budget")
+    max_chunks = budget.context_chunks(5) if budget is not None else 5
     
-    instructions = (section.instructions or "") + "\n" + (state["decision"].instructions or "")
-    feedback = state["review_feedback"].get(section.id, "")
-    if feedback:
-        instructions += f"\n\nCRITICAL: Previous review feedback - {feedback}\n"
-        instructions += "IMPORTANT: When rewriting, COMPLETELY REPLACE the current content. Do NOT append or merge. Remove any redundant information mentioned in the feedback."
+    instructions = build_writer_instructions(section, state)
 
-    content = agent.write(state["profile"], section.title, instructions, current_content=state["sections_content"].get(section.id, ""))
+    content = agent.write(state["profile"], section.title, instructions, current_content=state["sections_content"].get(section.id, ""), max_chunks=max_chunks, section_id=section.id)
     return {
         "sections_content": {section.id: content}, 
-        "section_status": {section.id: "review_pending"}
+        "section_status": {section.id: "review_pending"},
+        "section_context": {section.id: agent.last_context},
+        "run_stats": {"writer_llm_calls": 1}
+    }
+
+def batch_writer_node(input: BatchWriterInput):
+    sections = input["sections"]
+    state = input["state"]
+    agent = BatchWriter()
+    budget = state.get("budget")
+    max_chunks = budget.context_chunks(5) if budget is not None else 5
+
+    requests = []
+    for section in sections:
+        request = {
+            "id": section.id,
+            "title": section.title or section.id,
+            "instructions": build_writer_instructions(section, state),
+        }
+        current = state["sections_content"].get(section.id, "")
+        if current:
+            request["current_content"] = current
+        requests.append(request)
+
+    contents = agent.write_batch(state["profile"], requests, input["section_type"], max_chunks=max_chunks)
+    answered = len(contents)
+    contexts = {sid: agent.last_context for sid in contents}
+    llm_calls = 1
+
+    # Anything the batch call dropped is written individually
+    for section, request in zip(sections, requests):
+        if section.id not in contents:
+            llm_calls += 1
+            print(f"[{state['repo_name']}] Batch output missing '{section.id}', writing it individually.")
+            writer = CoreWriter() if input["section_type"] == "core" else OptionalWriter()
+            contents[section.id] = writer.write(state["profile"], section.title, request["instructions"], current_content=request.get("current_content", ""), max_chunks=max_chunks, section_id=section.id)
+            contexts[section.id] = writer.last_context
+
+    return {
+        "sections_content": contents,
+        "section_status": {sid: "review_pending" for sid in contents},
+        "section_context": contexts,
+        "run_stats": {"writer_llm_calls": llm_calls, "batch_writer_calls_saved": max(answered - 1, 0)}
     }
 
 def reviewer_dispatcher(state: WorkflowState):
+    from langgraph.types import Send
+
     decision = state["decision"]
     targets = decision.target_sections
     tasks = []
     plan = state["plan"]
     
+    if state.get("batch_review"):
+        # Short sections are reviewed together; long ones keep their own call
+        batch = []
+        for section in plan.sections:
+            if section.id not in targets:
+                continue
+            content = state["sections_content"].get(section.id, "")
+            if count_tokens(content) > BATCH_REVIEW_MAX_SECTION_TOKENS:
+                tasks.append(Send("reviewer", {"section": section, "state": state}))
+            else:
+                batch.append(section)
+        for i in range(0, len(batch), BATCH_REVIEW_MAX_SECTIONS):
+            group = batch[i:i + BATCH_REVIEW_MAX_SECTIONS]
+            if len(group) == 1:
+                tasks.append(Send("reviewer", {"section": group[0], "state": state}))
+            else:
+                tasks.append(Send("batch_reviewer", {"sections": group, "state": state}))
+        return tasks
+
     for section in plan.sections:
         if section.id in targets:
              tasks.append(Send("reviewer", {"section": section, "state": state}))
     return tasks
 
-def reviewer_node(input: WriterInput):
-    section = input["section"]
-    state = input["state"]
-    agent = Reviewer()
-    
-    content = state["sections_content"].get(section.id, "")
-    result = agent.review(state["profile"], section.id, content)
-    
-    print(f"[{state['repo_name']}] Review for '{section.id}': {result.status}")
+def merge_updates(updates: Dict[str, Any], more: Dict[str, Any]) -> Dict[str, Any]:
+    """Combines per-section node updates into a single update."""
+    for key, value in more.items():
+        if key == "run_stats":
+            updates[key] = merge_counts(updates.get(key, {}), value)
+        else:
+            updates[key] = {**updates.get(key, {}), **value}
+    return updates
+
+def review_skip_updates(section_id: str, state: WorkflowState) -> Dict[str, Any] | None:
+    """Updates for a section whose review should not run (deadline/budget), else None."""
+    deadline = state.get("deadline")
+    if deadline is not None and deadline.near():
+        # Don't start a review round this close to the deadline; the section
+        # stays unreviewed and is aggregated as written.
+        print(f"[{state['repo_name']}] Deadline near. Skipping review of '{section_id}'.")
+        return {}
+
+    budget = state.get("budget")
+    retried = state.get("section_retries", {}).get(section_id, 0) > 0
+    if retried and budget is not None and budget.at_least(STAGE_NO_RETRIES):
+        # Rewrites are no longer sent back, so a second review could not be
+        # acted upon; the first review of every section still runs.
+        print(f"[{state['repo_name']}] Token budget low. Accepting rewrite of '{section_id}' without review.")
+        return {
+            "section_status": {section_id: "pass"},
+            "review_feedback": {section_id: "Review skipped (token budget)."}
+        }
+    return None
+
+def static_review(section_id: str, state: WorkflowState) -> tuple[str, Dict[str, Any], bool]:
+    """
+    Runs the local static checks on a section before any LLM review. Returns
+    the (deduplicated) content, the resulting state updates, and whether the
+    section passed the static gate.
+    """
+    checker = StaticReviewer(state["repo_path"])
+    content = state["sections_content"].get(section_id, "")
+    updates: Dict[str, Any] = {}
+
+    content, removed = checker.dedupe_code_blocks(content)
+    if removed:
+        print(f"[{state['repo_name']}] Removed {removed} duplicate code block(s) from '{section_id}'.")
+        merge_updates(updates, {
+            "sections_content": {section_id: content},
+            "run_stats": {"static_duplicate_blocks_removed": removed},
+        })
+
+    result = checker.check(section_id, content)
+    for warning in checker.warnings:
+        print(f"[{state['repo_name']}] Static check warning for '{section_id}': {warning}")
+    if checker.warnings:
+        merge_updates(updates, {"run_stats": {"static_review_warnings": len(checker.warnings)}})
+    if result is None:
+        return content, updates, True
+
+    # Obvious failure: straight back to the writer with the concrete issues
+    merge_updates(updates, apply_review(section_id, result, state))
+    merge_updates(updates, {"run_stats": {"static_review_failures": 1, "review_llm_calls_saved": 1}})
+    return content, updates, False
+
+def apply_review(section_id: str, result: ReviewResult, state: WorkflowState) -> Dict[str, Any]:
+    """Turns a review verdict into state updates, handling retries."""
+    print(f"[{state['repo_name']}] Review for '{section_id}': {result.status}")
     if result.status == "fail":
         print(f"    Feedback: {result.feedback}")
     
     new_status = result.status
+
+    # Minor fix: take the reviewer's corrected content as-is instead of sending
+    # the section back through the orchestrator and a full writer call.
+    rewritten = (result.rewritten_content or "").strip()
+    current = state["sections_content"].get(section_id, "")
+    if new_status == "fail" and state.get("review_fastpath") and rewritten and rewritten != current.strip():
+        # Cheap re-review: the patch must still pass the static checks
+        recheck = StaticReviewer(state["repo_path"]).check(section_id, rewritten)
+        if recheck is not None:
+            print(f"[{state['repo_name']}] Reviewer's fix for '{section_id}' failed static checks. Sending back to writer.")
+            result = ReviewResult(status="fail", feedback=f"{result.feedback}\n{recheck.feedback}", section_id=section_id)
+            return apply_review(section_id, result, state)
+        print(f"[{state['repo_name']}] Applying reviewer's fix to '{section_id}'.")
+        return {
+            "sections_content": {section_id: rewritten},
+            "section_status": {section_id: "pass"},
+            "review_feedback": {section_id: result.feedback},
+            "fastpath_sections": {section_id: state["iteration"]},
+            "run_stats": {"fastpath_applied": 1, "fastpath_writer_calls_saved": 1},
+        }
     
     # Handle Retries
     retries_map = state.get("section_retries", {})
-    current_retries = retries_map.get(section.id, 0)
+    current_retries = retries_map.get(section_id, 0)
     
     updates = {}
     
     if new_status == "fail":
         current_retries += 1
-        updates["section_retries"] = {section.id: current_retries}
+        updates["section_retries"] = {section_id: current_retries}
         
         if current_retries >= 3:
-            print(f"[{state['repo_name']}] Section '{section.id}' failed {current_retries} times. Max retries reached. Forcing PASS.")
+            print(f"[{state['repo_name']}] Section '{section_id}' failed {current_retries} times. Max retries reached. Forcing PASS.")
             new_status = "pass"
+        else:
+            budget = state.get("budget")
+            if budget is not None and budget.at_least(STAGE_NO_RETRIES):
+                print(f"[{state['repo_name']}] Token budget low. Not sending '{section_id}' back to the writer. Forcing PASS.")
+                new_status = "pass"
     
-    updates["section_status"] = {section.id: new_status}
-    updates["review_feedback"] = {section.id: result.feedback}
+    updates["section_status"] = {section_id: new_status}
+    updates["review_feedback"] = {section_id: result.feedback}
     
     return updates
 
+def reviewer_node(input: WriterInput):
+    section = input["section"]
+    state = input["state"]
+    skipped = review_skip_updates(section.id, state)
+    if skipped is not None:
+        return skipped
+
+    content, updates, passed = static_review(section.id, state)
+    if not passed:
+        return updates
+
+    agent = Reviewer()
+    budget = state.get("budget")
+    
+    max_chunks = budget.context_chunks(3) if budget is not None else 3
+    writer_context = state.get("section_context", {}).get(section.id, "")
+    extra_retrieval = bool(state.get("review_retrieval"))
+    result = agent.review(state["profile"], section.id, content, max_chunks=max_chunks,
+                          writer_context=writer_context, extra_retrieval=extra_retrieval)
+
+    merge_updates(updates, apply_review(section.id, result, state))
+    stats = {"review_llm_calls": 1}
+    if writer_context and not extra_retrieval:
+        stats["review_searches_saved"] = 1
+    return merge_updates(updates, {"run_stats": stats})
+
+def batch_reviewer_node(input: BatchReviewerInput):
+    sections = input["sections"]
+    state = input["state"]
+    updates: Dict[str, Any] = {}
+    to_review, requests = [], []
+    for section in sections:
+        skipped = review_skip_updates(section.id, state)
+        if skipped is not None:
+            merge_updates(updates, skipped)
+            continue
+        content, static_updates, passed = static_review(section.id, state)
+        merge_updates(updates, static_updates)
+        if passed:
+            to_review.append(section)
+            requests.append({"id": section.id, "title": section.title or section.id, "content": content})
+    if not to_review:
+        return updates
+
+    agent = Reviewer()
+    budget = state.get("budget")
+    max_chunks = budget.context_chunks(3) if budget is not None else 3
+    writer_contexts = {s.id: state.get("section_context", {}).get(s.id, "") for s in to_review}
+    extra_retrieval = bool(state.get("review_retrieval"))
+    results = {r.section_id: r for r in agent.review_batch(state["profile"], requests, max_chunks=max_chunks,
+                                                           writer_contexts=writer_contexts, extra_retrieval=extra_retrieval)}
+    llm_calls = 1
+
+    for section, request in zip(to_review, requests):
+        result = results.get(section.id)
+        if result is None:
+            print(f"[{state['repo_name']}] Batch review missing '{section.id}', reviewing it individually.")
+            result = agent.review(state["profile"], section.id, request["content"], max_chunks=max_chunks,
+                                  writer_context=writer_contexts[section.id], extra_retrieval=extra_retrieval)
+            llm_calls += 1
+        merge_updates(updates, apply_review(section.id, result, state))
+
+    # Per-section review would have re-sent the template and profile for every
+    # section; estimate what sharing them saved.
+    answered = len(to_review) - (llm_calls - 1)
+    overhead = count_tokens(agent.prompt_template) + count_tokens(state["profile"].model_dump_json())
+    merge_updates(updates, {"run_stats": {
+        "review_llm_calls": llm_calls,
+        "batch_review_calls_saved": max(answered - 1, 0),
+        "batch_review_prompt_tokens_saved": max(answered - 1, 0) * overhead,
+        "review_searches_saved": 0 if extra_retrieval else sum(1 for c in writer_contexts.values() if c),
+    }})
+    return updates
+
 def aggregator_node(state: WorkflowState):
     agent = Aggregator()
+    deadline = state.get("deadline")
+    wound_down = deadline is not None and deadline.wound_down_at is not None
     sections = {}
     for s in state["plan"].sections:
         if s.id in state["sections_content"]:
+            # After a deadline wind-down only keep approved sections and those
+            # written in the final wave; drafts that failed review are dropped.
+            if wound_down and state["section_status"].get(s.id) == "fail":
+                continue
             sections[s.title] = state["sections_content"][s.id]
             
-    final_md = agent.aggregate(sections)
+    # Fall back to deterministic assembly if the aggregation call (prompt plus a
+    # README-sized completion) would overrun the token budget.
+    budget = state.get("budget")
+    deterministic = budget is not None and not budget.fits(json.dumps(sections), completion_ratio=1.0)
+    # Likewise if the deadline has already passed
+    deterministic = deterministic or (deadline is not None and deadline.expired())
+    final_md = agent.aggregate(sections, deterministic=deterministic)
     
     output_dir = os.path.join(os.getcwd(), "generated_readmes")
     os.makedirs(output_dir, exist_ok=True)
@@ -201,6 +511,8 @@ def aggregator_node(state: WorkflowState):
 
 
 def route_orchestrator(state: WorkflowState):
+    from langgraph.graph import END
+
     decision = state["decision"].decision
     if decision == "PROFILE":
         return "profiler"
@@ -217,39 +529,99 @@ def route_orchestrator(state: WorkflowState):
 
 
 
-workflow = StateGraph(WorkflowState)
+def build_workflow():
+    """Builds the (uncompiled) orchestrator StateGraph."""
+    from langgraph.graph import StateGraph, END, START
 
-workflow.add_node("orchestrator", orchestrator_node)
-workflow.add_node("profiler", profiler_node)
-workflow.add_node("planner", planner_node)
-workflow.add_node("core_writer", core_writer_node)
-workflow.add_node("optional_writer", optional_writer_node)
-workflow.add_node("reviewer", reviewer_node)
-workflow.add_node("aggregator", aggregator_node)
+    workflow = StateGraph(WorkflowState)
 
-workflow.add_edge(START, "orchestrator")
-workflow.add_edge("profiler", "orchestrator")
-workflow.add_edge("planner", "orchestrator")
-workflow.add_edge("core_writer", "orchestrator")
-workflow.add_edge("optional_writer", "orchestrator")
-workflow.add_edge("reviewer", "orchestrator")
-workflow.add_edge("aggregator", END)
+    workflow.add_node("orchestrator", orchestrator_node)
+    workflow.add_node("profiler", profiler_node)
+    workflow.add_node("planner", planner_node)
+    workflow.add_node("core_writer", core_writer_node)
+    workflow.add_node("optional_writer", optional_writer_node)
+    workflow.add_node("batch_writer", batch_writer_node)
+    workflow.add_node("reviewer", reviewer_node)
+    workflow.add_node("batch_reviewer", batch_reviewer_node)
+    workflow.add_node("aggregator", aggregator_node)
 
-workflow.add_conditional_edges(
-    "orchestrator",
-    route_orchestrator,
-    ["profiler", "planner", "core_writer", "optional_writer", "reviewer", "aggregator"]
-)
+    workflow.add_edge(START, "orchestrator")
+    workflow.add_edge("profiler", "orchestrator")
+    workflow.add_edge("planner", "orchestrator")
+    workflow.add_edge("core_writer", "orchestrator")
+    workflow.add_edge("optional_writer", "orchestrator")
+    workflow.add_edge("batch_writer", "orchestrator")
+    workflow.add_edge("reviewer", "orchestrator")
+    workflow.add_edge("batch_reviewer", "orchestrator")
+    workflow.add_edge("aggregator", END)
+
+    workflow.add_conditional_edges(
+        "orchestrator",
+        route_orchestrator,
+        ["profiler", "planner", "core_writer", "optional_writer", "batch_writer", "reviewer", "batch_reviewer", "aggregator"]
+    )
+    return workflow
+
+@lru_cache(maxsize=1)
+def get_app():
+    """Compiles the workflow on first use and caches the result."""
+    return build_workflow().compile()
+
+def __getattr__(name: str):
+    # Keeps `from src.workflows.main import app` working without compiling
+    # the graph at import time.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def summarize_sections(state: Dict[str, Any]) -> Dict[str, int]:
+    """Counts planned sections by their final outcome."""
+    status = state.get("section_status") or {}
+    content = state.get("sections_content") or {}
+    return {
+        "sections_planned": len(status),
+        "sections_approved": sum(1 for v in status.values() if v == "pass"),
+        "sections_unreviewed": sum(1 for v in status.values() if v == "review_pending"),
+        "sections_failed": sum(1 for v in status.values() if v == "fail"),
+        "sections_missing": sum(1 for k in status if k not in content),
+    }
 
-app = workflow.compile()
+def load_plan(plan_path: str) -> ReadmePlan:
+    """Loads and validates a ReadmePlan JSON file."""
+    with open(plan_path, "r") as f:
+        plan_data = json.load(f)
+    return ReadmePlan(**plan_data)
 
 if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Orchestrator V2 for README Generation")
-    parser.add_argument("--repo_name", type=str, required=True, help="Name of the repository directory in data/repositories")
+    parser.add_argument("--repo_name", type=str, help="Name of the repository directory in data/repositories")
     parser.add_argument("--plan", type=str, help="Path to a JSON file containing the ReadmePlan")
+    parser.add_argument("--validate-plan", action="store_true", help="Only validate the --plan file and exit")
+    parser.add_argument("--token-budget", type=int, help="Maximum LLM tokens (prompt + completion) to spend on this repository")
+    parser.add_argument("--cost-budget", type=float, help="Maximum estimated LLM cost in USD to spend on this repository")
+    parser.add_argument("--deadline", type=float, help="Wall-clock deadline in seconds; the run winds down as it approaches")
+    parser.add_argument("--batch-writing", action="store_true", help="Write core and optional sections in one call per group instead of one call per section")
+    parser.add_argument("--batch-review", action="store_true", help="Review short sections together in one call; long sections are still reviewed individually")
+    parser.add_argument("--no-review-fastpath", action="store_true", help="Always send failed sections back to the writer, even when the reviewer supplied a minor fix")
+    parser.add_argument("--review-retrieval", action="store_true", help="Let the reviewer run its own verification search in addition to the context the writer retrieved")
     
     args = parser.parse_args()
+
+    if args.validate_plan:
+        if not args.plan:
+            parser.error("--validate-plan requires --plan")
+        try:
+            plan = load_plan(args.plan)
+        except Exception as e:
+            print(f"Invalid plan {args.plan}: {e}")
+            sys.exit(1)
+        enabled = [s.id for s in plan.sections if s.enabled]
+        print(f"Plan OK: {len(enabled)} enabled sections: {enabled}")
+        sys.exit(0)
+
+    if not args.repo_name:
+        parser.error("--repo_name is required")
     
     repo_name = args.repo_name
     repo_path = os.path.join(os.getcwd(), "data", "repositories", repo_name)
@@ -269,10 +641,7 @@ if __name__ == "__main__":
             sys.exit(1)
             
         try:
-            with open(args.plan, "r") as f:
-                plan_data = json.load(f)
-            
-            initial_plan = ReadmePlan(**plan_data)
+            initial_plan = load_plan(args.plan)
             
             initial_section_status = {s.id: "pending" for s in initial_plan.sections if s.enabled}
             print(f" Loaded User Plan with {len(initial_section_status)} sections.")
@@ -289,19 +658,40 @@ if __name__ == "__main__":
         "sections_content": {},
         "section_status": initial_section_status,
         "review_feedback": {},
-        "section_retries": {}
+        "section_retries": {},
+        "budget": None,
+        "deadline": None,
+        "batch_writing": args.batch_writing,
+        "batch_review": args.batch_review,
+        "run_stats": {},
+        "review_fastpath": not args.no_review_fastpath,
+        "fastpath_sections": {},
+        "section_context": {},
+        "review_retrieval": args.review_retrieval
     }
+
+    callbacks = []
+    if args.token_budget or args.cost_budget:
+        budget = TokenBudget(max_tokens=args.token_budget, max_cost=args.cost_budget)
+        initial_state["budget"] = budget
+        callbacks.append(budget)
     
     print("Starting Orchestrator ...")
     print(f"Repository: {repo_name}")
     print(f"Path: {repo_path}")
     if initial_plan:
         print("Mode: User-Provided Plan (Skipping Planner)")
+    if context_path(repo_name) == "whole_repo":
+        print("Context: small repository, whole-file context (no vector search)")
     
     start_time = time.time()
+    if args.deadline:
+        initial_state["deadline"] = Deadline(args.deadline, start=start_time)
     token_cb = TokenCountingCallback()
+    callbacks.append(token_cb)
     
-    for event in app.stream(initial_state, config={"callbacks": [token_cb]}):
+    final_state = initial_state
+    for final_state in get_app().stream(initial_state, config={"callbacks": callbacks}, stream_mode="values"):
         pass
             
     end_time = time.time()
@@ -314,6 +704,17 @@ if __name__ == "__main__":
         "prompt_tokens": token_cb.prompt_tokens,
         "completion_tokens": token_cb.completion_tokens,
     }
+
+    # Extended per-run details (budget, ...) go to a JSONL file so the CSV
+    # keeps its established columns.
+    run_metadata = dict(report)
+    run_metadata["context_path"] = context_path(repo_name)
+    run_metadata.update(summarize_sections(final_state))
+    run_metadata.update(final_state.get("run_stats") or {})
+    if initial_state["budget"] is not None:
+        run_metadata.update(initial_state["budget"].report())
+    if initial_state["deadline"] is not None:
+        run_metadata.update(initial_state["deadline"].report())
     
     output_dir = os.path.join(os.getcwd(), "generated-readmes-token-stats")
     os.makedirs(output_dir, exist_ok=True)
@@ -333,6 +734,19 @@ if __name__ == "__main__":
         print(f"Performance Report appended to: {report_path}")
         print(f"Time Taken: {duration:.2f}s")
         print(f"Total Tokens: {token_cb.total_tokens}")
+        if initial_state["deadline"] is not None:
+            print(f"Deadline: {args.deadline:.0f}s ({'met' if not initial_state['deadline'].expired() else 'missed'})")
+        counts = summarize_sections(final_state)
+        print(f"Sections: {counts['sections_approved']} approved, {counts['sections_unreviewed']} unreviewed, "
+              f"{counts['sections_failed']} failed, {counts['sections_missing']} missing of {counts['sections_planned']}")
         print("-" * 30)
     except Exception as e:
         print(f"Error writing to CSV: {e}")
+
+    metadata_path = os.path.join(output_dir, "run_metadata.jsonl")
+    try:
+        with open(metadata_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run_metadata) + "\n")
+        print(f"Run metadata appended to: {metadata_path}")
+    except Exception as e:
+        print(f"Error writing run metadata: {e}")